@@ -102,11 +102,16 @@ import common  # noqa: E402 — must be after TESTING block patches okama
 from common.stale_callbacks import register_stale_callback_guard  # noqa: E402
 from common.seo import register_seo_head  # noqa: E402
 from common.auth import init_auth  # noqa: E402
+from common.cache_sweeper import start_sweeper  # noqa: E402
+from common.series_store import install_series_store  # noqa: E402
 
 common.cache.init_app(server)  # centralised; previously called per-controls-file
 register_stale_callback_guard(server)  # stale post-deploy clients get 204, not 500
 register_seo_head(server)  # per-page <title>/canonical/og:image in static HTML for crawlers
 init_auth(server)  # personal cabinet: session auth, SQLite user DB, /cabinet guard, /logout
+if os.environ.get("TESTING") != "1":
+    start_sweeper()  # object-cache expiry + disk budget off the request path
+    install_series_store()  # per-symbol okama responses shared by all cached objects
 
 app.layout = html.Div(
     [
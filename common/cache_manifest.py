@@ -0,0 +1,220 @@
+"""SQLite manifest of the object cache: one row per pickle in cache-directory.
+
+Cache filenames only partially describe an entry (long keys fall back to a hash)
+and carry no size, build-time or usage history. The manifest records, per cache
+key: obj_type, the key params (JSON), bytes, build_ms, hits, created (the pickle
+mtime), expires (``inf`` for entries that never expire) and last_access. The
+sweeper expires and evicts by querying it instead of scanning the directory.
+
+The database lives next to the pickles and is shared by all workers (WAL mode,
+a short-lived connection per operation, so it is fork- and thread-safe). Hits
+are buffered in-process and written in batches, and at interpreter exit: a
+cache hit must not pay for a SQLite write.
+"""
+
+import atexit
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    cache_key TEXT PRIMARY KEY,
+    obj_type TEXT NOT NULL,
+    params TEXT,
+    bytes INTEGER NOT NULL,
+    build_ms REAL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL,
+    expires REAL
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+CREATE INDEX IF NOT EXISTS entries_created ON entries (created);
+"""
+
+_HIT_FLUSH_SECONDS = 5.0
+_HIT_FLUSH_MAX_PENDING = 100
+
+logger = logging.getLogger("object_cache")
+
+
+class CacheManifest:
+    def __init__(self, path: Path):
+        self.path = path
+        self._initialized = False
+        self._pending_hits: dict[str, list[float]] = {}  # cache_key -> [hits, last_access]
+        self._pending_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=5, isolation_level=None)
+        try:
+            if not self._initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(entries)")}
+                if "expires" not in columns:
+                    conn.execute("ALTER TABLE entries ADD COLUMN expires REAL")
+                self._initialized = True
+            yield conn
+        finally:
+            conn.close()
+
+    def record_store(
+        self,
+        cache_key: str,
+        obj_type: str,
+        params: dict[str, Any] | None,
+        size: int,
+        build_ms: float | None,
+        created: float,
+        expires: float | None = None,
+    ) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO entries "
+                "(cache_key, obj_type, params, bytes, build_ms, hits, created, last_access, expires) "
+                "VALUES (?, ?, ?, ?, ?, 0, ?, ?, ?) "
+                "ON CONFLICT (cache_key) DO UPDATE SET obj_type = excluded.obj_type, params = excluded.params, "
+                "bytes = excluded.bytes, build_ms = excluded.build_ms, created = excluded.created, "
+                "last_access = excluded.last_access, expires = excluded.expires",
+                (
+                    cache_key,
+                    obj_type,
+                    json.dumps(params, sort_keys=True, default=str) if params is not None else None,
+                    size,
+                    build_ms,
+                    created,
+                    created,
+                    expires,
+                ),
+            )
+
+    def record_hit(self, cache_key: str, when: float | None = None) -> None:
+        """Count a hit; written to SQLite in batches (see flush_hits)."""
+        when = when or time.time()
+        with self._pending_lock:
+            pending = self._pending_hits.setdefault(cache_key, [0, when])
+            pending[0] += 1
+            pending[1] = max(pending[1], when)
+            due = (
+                len(self._pending_hits) >= _HIT_FLUSH_MAX_PENDING
+                or time.monotonic() - self._last_flush >= _HIT_FLUSH_SECONDS
+            )
+        if due:
+            self.flush_hits()
+
+    def flush_hits(self) -> None:
+        with self._pending_lock:
+            pending, self._pending_hits = self._pending_hits, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE entries SET hits = hits + ?, last_access = MAX(last_access, ?) WHERE cache_key = ?",
+                [(hits, last_access, cache_key) for cache_key, (hits, last_access) in pending.items()],
+            )
+
+    def _flush_hits_at_exit(self) -> None:
+        """Write the buffered hits when the worker exits; never raises."""
+        if not self.path.exists():
+            return
+        try:
+            self.flush_hits()
+        except (sqlite3.Error, OSError) as exc:
+            logger.warning("Cache manifest update failed at exit: %s", exc)
+
+    def remove(self, cache_keys: list[str]) -> None:
+        if not cache_keys:
+            return
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM entries WHERE cache_key = ?", [(key,) for key in cache_keys])
+
+    def expired_keys(self, created_before: float, expired_before: float) -> list[str]:
+        """Entries whose expiry is before ``expired_before``; without one, created before ``created_before``."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT cache_key FROM entries WHERE expires < ? OR (expires IS NULL AND created < ?)",
+                (expired_before, created_before),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def entries_by_access(self) -> list[tuple[float, str, str, int, float]]:
+        """(last_access, obj_type, cache_key, bytes, created), least recently accessed first."""
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT last_access, obj_type, cache_key, bytes, created FROM entries ORDER BY last_access"
+            ).fetchall()
+
+    def get(self, cache_key: str) -> dict[str, Any] | None:
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM entries WHERE cache_key = ?", (cache_key,)).fetchone()
+        if row is None:
+            return None
+        entry = dict(row)
+        entry["params"] = json.loads(entry["params"]) if entry["params"] else None
+        return entry
+
+    def usage_by_type(self) -> dict[str, dict[str, float]]:
+        """Per obj_type: files, bytes, hits and mean build_ms."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT obj_type, COUNT(*), SUM(bytes), SUM(hits), AVG(build_ms) FROM entries GROUP BY obj_type"
+            ).fetchall()
+        return {
+            obj_type: {"files": files, "bytes": size, "hits": hits, "avg_build_ms": avg_build_ms}
+            for obj_type, files, size, hits, avg_build_ms in rows
+        }
+
+    def reconcile(self, files: list[tuple[float, str, str, int, float]], scan_started: float) -> tuple[int, int]:
+        """Sync the manifest with a directory scan of (last_access, obj_type, cache_key, bytes, mtime).
+
+        Adds rows (without params/build_ms) for pickles written outside
+        get_or_create or before the manifest existed, and drops rows whose file
+        is gone (e.g. removed by hand on deploy). The scan takes no lock, so rows
+        created after ``scan_started`` are kept even when the scan missed their
+        file. Returns (added, dropped).
+        """
+        on_disk = {
+            cache_key: (last_access, obj_type, size, mtime) for last_access, obj_type, cache_key, size, mtime in files
+        }
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            known = dict(conn.execute("SELECT cache_key, created FROM entries").fetchall())
+            missing = [key for key, created in known.items() if key not in on_disk and created < scan_started]
+            added = [
+                (key, obj_type, size, mtime, last_access)
+                for key, (last_access, obj_type, size, mtime) in on_disk.items()
+                if key not in known
+            ]
+            conn.executemany("DELETE FROM entries WHERE cache_key = ?", [(key,) for key in missing])
+            conn.executemany(
+                "INSERT INTO entries (cache_key, obj_type, bytes, created, last_access) VALUES (?, ?, ?, ?, ?)",
+                added,
+            )
+            conn.execute("COMMIT")
+        return len(added), len(missing)
+
+
+_manifests: dict[Path, CacheManifest] = {}
+_manifests_lock = threading.Lock()
+
+
+def get_manifest(path: Path) -> CacheManifest:
+    """Process-wide manifest instance for ``path`` (keeps one hit buffer per database)."""
+    with _manifests_lock:
+        manifest = _manifests.get(path)
+        if manifest is None:
+            manifest = _manifests[path] = CacheManifest(path)
+            atexit.register(manifest._flush_hits_at_exit)
+        return manifest
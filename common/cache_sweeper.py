@@ -0,0 +1,99 @@
+"""Background sweeper for the object cache (cache-directory).
+
+Expiry and the disk budget used to be enforced from get_or_create, so whichever
+callback hit an old cleanup marker paid for a full directory scan. The sweeper
+moves that work off the request path:
+
+- in the app: ``start_sweeper()`` (called from app.py, except under
+  ``TESTING=1``) runs a daemon thread per worker; the marker/lock in
+  ``cleanup_expired_files`` lets only one worker on the host sweep per
+  interval;
+- standalone (cron / systemd timer, or with the thread disabled via
+  ``OKAMA_CACHE_SWEEPER=off``)::
+
+      poetry run python -m common.cache_sweeper --once
+
+``--stats`` prints per-type usage from the cache manifest.
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import threading
+
+from common import object_cache, series_store
+
+logger = logging.getLogger("object_cache")
+
+# Pause between directory-scan batches: the sweep shares the host with live workers.
+_PAUSE_SECONDS = 0.05
+
+_sweeper: "CacheSweeper | None" = None
+_sweeper_lock = threading.Lock()
+
+
+class CacheSweeper(threading.Thread):
+    def __init__(self, interval_seconds: float = object_cache.SWEEP_INTERVAL_SECONDS):
+        super().__init__(name="object-cache-sweeper", daemon=True)
+        self.interval_seconds = interval_seconds
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        # Jittered start: workers forked together should not race for the sweep lock.
+        delay = random.uniform(0, min(self.interval_seconds, 60))  # noqa: S311
+        while not self._stop_event.wait(delay):
+            sweep_once()
+            delay = self.interval_seconds
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+
+def sweep_once(force: bool = False) -> None:
+    """Run one incremental sweep pass; errors are logged, never raised."""
+    try:
+        object_cache.cleanup_expired_files(_force=force, pause_seconds=_PAUSE_SECONDS)
+    except Exception:
+        logger.exception("Object cache sweep failed")
+    try:
+        removed = series_store.get_series_store().purge()
+        if removed:
+            logger.info("series_purge removed=%d", removed)
+    except Exception:
+        logger.exception("Series store purge failed")
+
+
+def start_sweeper() -> CacheSweeper | None:
+    """Start the per-process sweeper thread once; no-op when disabled by env."""
+    global _sweeper
+    if os.environ.get("OKAMA_CACHE_SWEEPER", "on") == "off":
+        return None
+    with _sweeper_lock:
+        if _sweeper is None or not _sweeper.is_alive():
+            _sweeper = CacheSweeper()
+            _sweeper.start()
+    return _sweeper
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Sweep expired and over-budget object-cache pickles.")
+    parser.add_argument("--once", action="store_true", help="run a single pass and exit (for cron/timers)")
+    parser.add_argument("--force", action="store_true", help="ignore the cross-worker sweep interval marker")
+    parser.add_argument("--stats", action="store_true", help="print per-type usage from the manifest and exit")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    if args.stats:
+        print(json.dumps(object_cache.cache_stats(), indent=2, sort_keys=True))
+        return
+    if args.once:
+        sweep_once(force=args.force)
+        return
+    sweeper = CacheSweeper()
+    sweeper.start()
+    sweeper.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Server-side storage of the chart data behind the "Download data" buttons.
+
+The Portfolio, Compare and Benchmark Submit callbacks used to serialize the
+full chart frame (every Monte Carlo path included) to JSON for a
+``*-store-chart-data`` dcc.Store, and the browser kept it in session storage
+only to post it back when Download is pressed. The frame is now kept in the
+shared Flask cache under a random per-request key and the store holds that
+key only; the export callback resolves it. If the cache cannot take the frame,
+the JSON is stored as before, and load_chart_data accepts both forms (the
+session storage of an open tab may still hold the JSON).
+"""
+
+import io
+import logging
+import uuid
+
+import pandas as pd
+
+from common import cache
+
+HANDLE_PREFIX = "chart-data:"
+# Long enough for an open tab; an expired handle just makes Download a no-op.
+CHART_DATA_TIMEOUT = 24 * 3600
+
+
+def store_chart_data(df: pd.DataFrame, handle: str | None = None) -> str:
+    """Keep ``df`` server-side and return the handle for the page's chart-data store.
+
+    A later stage of the same request passes the handle of the earlier one to
+    overwrite its frame rather than leave it behind for CHART_DATA_TIMEOUT.
+    """
+    if not handle or not handle.startswith(HANDLE_PREFIX):
+        handle = f"{HANDLE_PREFIX}{uuid.uuid4().hex}"
+    try:
+        stored = cache.set(handle, df, timeout=CHART_DATA_TIMEOUT)
+    except Exception:
+        logging.exception("Chart data cache is unavailable, storing the JSON in the browser")
+        stored = False
+    if not stored:
+        return df.to_json(orient="split", default_handler=str)
+    return handle
+
+
+def load_chart_data(data: str | None) -> pd.DataFrame | None:
+    """The frame behind a chart-data store value (handle or JSON); None if empty or expired."""
+    if not data:
+        return None
+    if not data.startswith(HANDLE_PREFIX):
+        return pd.read_json(io.StringIO(data), convert_axes=False, orient="split")
+    df = cache.get(data)
+    if df is None:
+        logging.info(f"Chart data {data} has expired")
+        return None
+    if isinstance(df.index, pd.PeriodIndex):
+        # Same "YYYY-MM" labels as the JSON store used to give the sheet.
+        df = df.set_axis(df.index.astype(str))
+    return df
@@ -4,7 +4,9 @@ Spinner shown under a page's Submit button while the main data callback runs.
 The chart itself is wrapped in dcc.Loading, but on mobile the chart sits below
 the fold (tables push it down), so that spinner is invisible when Submit is
 pressed. Each page places this hidden spinner right under its Submit button and
-toggles it via the main callback's `running` argument.
+toggles it via the main callback's `running` argument. When the callback runs
+through the job queue (common.job_queue), its progress messages are shown in
+the spinner's `<spinner_id>-progress` slot.
 """
 
 import dash_bootstrap_components as dbc
@@ -15,7 +17,7 @@ from dash.dependencies import Output
 def create_submit_spinner(spinner_id: str) -> html.Div:
     """Hidden spinner div; reveal it with `submit_spinner_running(spinner_id)`."""
     return html.Div(
-        dbc.Spinner(color="primary"),
+        [dbc.Spinner(color="primary"), html.Small(id=f"{spinner_id}-progress", className="ms-2 text-muted")],
         id=spinner_id,
         style={"display": "none"},
         className="pt-2",
@@ -0,0 +1,93 @@
+"""Optional job-queue execution for the heavy Submit/Find callbacks.
+
+Portfolio Submit (Monte Carlo forecast), Find max withdrawal and the Efficient
+Frontier Submit can run for seconds. By default they run inline in the web
+worker, as every other callback. With ``OKAMA_JOB_QUEUE=diskcache`` they become
+Dash background callbacks: the request returns at once, the job runs in its own
+process (``dash.DiskcacheManager``, job state under cache-directory) and the
+browser polls for the result, so the worker threads stay free for the cheap
+callbacks (input gating, links, toggles). Pressing Submit again while a job
+runs terminates the old job (Dash sends it along with the new request), and
+``report_progress`` stages are shown under the page's Submit spinner.
+
+The manager needs ``pip install "dash[diskcache]"``; it is not a hard
+dependency because the default mode does not use it.
+"""
+
+import contextvars
+import functools
+import os
+from typing import Callable
+
+import dash
+from dash.dependencies import Output
+
+from common import cache_directory
+
+_MODE_ENV = "OKAMA_JOB_QUEUE"
+_JOBS_DIR = ".job-queue"
+# Finished job results are read once by the polling browser; drop the rest after a day.
+JOB_RESULT_EXPIRE_SECONDS = 24 * 3600
+
+_set_progress: contextvars.ContextVar[Callable | None] = contextvars.ContextVar("job_set_progress", default=None)
+
+
+@functools.cache
+def get_job_manager() -> dash.DiskcacheManager | None:
+    """Background callback manager for the configured mode; None runs heavy callbacks inline."""
+    mode = os.environ.get(_MODE_ENV, "off")
+    if mode == "off" or os.environ.get("TESTING") == "1":
+        return None
+    if mode != "diskcache":
+        raise ValueError(f"{_MODE_ENV} must be 'off' or 'diskcache', got {mode!r}")
+    import diskcache
+
+    return dash.DiskcacheManager(
+        diskcache.Cache(os.path.join(cache_directory, _JOBS_DIR)), expire=JOB_RESULT_EXPIRE_SECONDS
+    )
+
+
+def report_progress(message: str) -> None:
+    """Show ``message`` under the Submit spinner of the running job; no-op when run inline."""
+    set_progress = _set_progress.get()
+    if set_progress is not None:
+        set_progress(message)
+
+
+def progress_output(spinner_id: str) -> Output:
+    """Progress text slot of a create_submit_spinner(spinner_id) spinner."""
+    return Output(f"{spinner_id}-progress", "children")
+
+
+def heavy_callback(*args, progress_spinner: str | None = None, **kwargs):
+    """``dash.callback`` that runs through the job queue when one is configured.
+
+    With no manager this is exactly ``callback(*args, **kwargs)``. Otherwise the
+    callback is registered as a background callback; ``progress_spinner`` names
+    the submit spinner whose progress slot receives report_progress messages.
+    The decorated function itself is returned unchanged (tests call it directly).
+    """
+
+    def decorator(func):
+        manager = get_job_manager()
+        if manager is None:
+            dash.callback(*args, **kwargs)(func)
+            return func
+        if progress_spinner is None:
+            dash.callback(*args, background=True, manager=manager, **kwargs)(func)
+            return func
+
+        @functools.wraps(func)
+        def job(set_progress, *values):
+            token = _set_progress.set(set_progress)
+            try:
+                return func(*values)
+            finally:
+                _set_progress.reset(token)
+
+        dash.callback(*args, background=True, manager=manager, progress=progress_output(progress_spinner), **kwargs)(
+            job
+        )
+        return func
+
+    return decorator
@@ -1,3 +1,66 @@
+import dash
+from dash.dependencies import Input, Output
+
+# Client-side twin of adopt_small_screens for register_screen_adaptation. The
+# mobile branch stashes the desktop legend, margin and y axes in layout.meta
+# (DESKTOP_LAYOUT_META) so that the desktop branch can restore them.
+_ADAPT_JS = """
+function(figure, screen) {
+    var noUpdate = [dash_clientside.no_update, dash_clientside.no_update];
+    if (!figure || !screen) return noUpdate;
+    var layout = Object.assign({}, figure.layout);
+    var meta = Object.assign({}, layout.meta);
+    var stash = meta.desktop_layout;
+    var axes = Object.keys(layout).filter(function (key) { return /^yaxis\\d*$/.test(key); });
+    if (axes.indexOf("yaxis") < 0) axes.push("yaxis");
+    var config;
+    if (screen.in_width >= 800) {
+        if (!stash) return noUpdate;
+        ["legend", "margin"].forEach(function (key) {
+            if (stash[key] === undefined) delete layout[key]; else layout[key] = stash[key];
+        });
+        layout.margin = Object.assign({}, layout.margin, {pad: 3});
+        axes.forEach(function (key) {
+            var axis = Object.assign({}, layout[key]);
+            var saved = (stash.axes || {})[key] || {};
+            ["title", "visible", "ticklabelposition"].forEach(function (prop) {
+                if (saved[prop] === undefined) delete axis[prop]; else axis[prop] = saved[prop];
+            });
+            layout[key] = axis;
+        });
+        delete meta.desktop_layout;
+        config = {displayModeBar: true, displaylogo: false};
+    } else {
+        if (!stash) {
+            stash = {legend: layout.legend, margin: layout.margin, axes: {}};
+            axes.forEach(function (key) {
+                var axis = layout[key] || {};
+                stash.axes[key] = {title: axis.title, visible: axis.visible, ticklabelposition: axis.ticklabelposition};
+            });
+            meta.desktop_layout = JSON.parse(JSON.stringify(stash));
+        }
+        var legend = Object.assign({}, layout.legend, {
+            orientation: "h", yanchor: "bottom", yref: "container", y: 0, xanchor: "left", xref: "container", x: 0
+        });
+        legend.title = Object.assign({}, legend.title, {side: "top"});
+        layout.legend = legend;
+        layout.margin = Object.assign({}, layout.margin, {l: 0, r: 0, t: 40, b: 24, pad: 0});
+        axes.forEach(function (key) {
+            var axis = Object.assign({}, layout[key], {visible: true, ticklabelposition: "inside"});
+            axis.title = Object.assign({}, axis.title, {standoff: 0});
+            delete axis.title.text;
+            layout[key] = axis;
+        });
+        config = {displayModeBar: false, displaylogo: false};
+    }
+    if (Object.keys(meta).length) layout.meta = meta; else delete layout.meta;
+    if (JSON.stringify(layout) === JSON.stringify(figure.layout)) return noUpdate;
+    return [Object.assign({}, figure, {layout: layout}), config];
+}
+"""
+DESKTOP_LAYOUT_META = "desktop_layout"
+
+
 def is_small_screen(screen: dict | None) -> bool:
     """True when the client viewport is narrower than the mobile breakpoint."""
     return bool(screen and screen["in_width"] < 800)
@@ -8,6 +71,7 @@ def adopt_small_screens(fig, screen: dict):
     Change Figure and Graph config for small screens.
     """
     if is_small_screen(screen):
+        _stash_desktop_layout(fig)
         fig.update_layout(
             # Legend below the chart: "container" ref pins it to the bottom edge
             # and lets plotly auto-expand the margin so it never overlaps the plot.
@@ -40,3 +104,41 @@ def adopt_small_screens(fig, screen: dict):
         )
         config = {"displayModeBar": True, "displaylogo": False}
     return fig, config
+
+
+def _stash_desktop_layout(fig) -> None:
+    """Keep the desktop legend, margin and y axes in layout.meta for the client-side desktop branch."""
+    layout = fig.layout.to_plotly_json()
+    meta = dict(layout.get("meta") or {})
+    if DESKTOP_LAYOUT_META in meta:
+        return
+    axes = {key: value for key, value in layout.items() if key.startswith("yaxis")}
+    axes.setdefault("yaxis", {})
+    meta[DESKTOP_LAYOUT_META] = {
+        **{key: layout[key] for key in ("legend", "margin") if key in layout},
+        "axes": {
+            key: {prop: axis.get(prop) for prop in ("title", "visible", "ticklabelposition") if prop in axis}
+            for key, axis in axes.items()
+        },
+    }
+    fig.update_layout(meta=meta)
+
+
+def register_screen_adaptation(graph_id: str) -> None:
+    """
+    Apply the small-screen layout to the ``graph_id`` figure in the browser.
+
+    Data callbacks read the screen info as State: they run on Submit only and
+    adapt the figure they build. This client-side callback re-applies the layout
+    for the current screen whenever the figure or the screen info changes (a
+    figure computed before the screen info arrived on the first page load, a
+    resize or rotation either way), without a server trip.
+    """
+    dash.clientside_callback(
+        _ADAPT_JS,
+        Output(graph_id, "figure", allow_duplicate=True),
+        Output(graph_id, "config", allow_duplicate=True),
+        Input(graph_id, "figure"),
+        Input("store", "data"),
+        prevent_initial_call=True,
+    )
@@ -1,16 +1,27 @@
 import fcntl
 import hashlib
 import logging
+import math
+import mmap
 import os
 import pickle
+import sqlite3
+import struct
 import tempfile
+import threading
 import time
-from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Any, Callable, TypeVar
+from stat import S_ISDIR, S_IWGRP, S_IWOTH
+from typing import Any, Callable, Iterator, TypeVar
 
 import okama
 
+from common.cache_manifest import CacheManifest, get_manifest
+
 T = TypeVar("T")
 
 logger = logging.getLogger("object_cache")
@@ -26,10 +37,128 @@ TTL_ASSET_LIST = 7 * 24 * 3600
 TTL_PORTFOLIO = 7 * 24 * 3600
 TTL_EFFICIENT_FRONTIER = 30 * 24 * 3600
 
+# Calendar-aware expiry for objects built from okama's monthly bars. An entry
+# built after its last_date month was published covers a closed range and never
+# expires (the disk budget still evicts it). Any other entry (last_date=None or
+# the current month) expires when the next monthly bar is published, rather than
+# after ttl_seconds. A month's bar counts as published
+# MONTHLY_PUBLICATION_LAG_DAYS after the month ends (UTC). Types not listed here,
+# and calls without a last_date param, keep the plain TTL.
+CALENDAR_EXPIRY_TYPES = frozenset({"portfolio", "assetlist", "ef"})
+MONTHLY_PUBLICATION_LAG_DAYS = 2
+
 _CLEANUP_INTERVAL_SECONDS = 24 * 3600
 
+# Expiry and the disk budget are enforced by a background sweeper
+# (common/cache_sweeper.py), never inside a callback. The directory scan is
+# incremental: it can pause after every _SWEEP_BATCH_SIZE entries.
+SWEEP_INTERVAL_SECONDS = 600
+_SWEEP_BATCH_SIZE = 500
+
+# Single-flight: concurrent misses on one key (a shared link going viral) wait
+# for the worker already building it instead of each calling okama. Bounded,
+# so a hung builder degrades to duplicate work rather than a stuck request.
+_BUILD_WAIT_SECONDS = 60
+_BUILD_POLL_SECONDS = 0.1
+_MISS = object()
+
+# Stale-while-revalidate, opt-in per obj_type: within this many seconds past the
+# TTL an expired entry is still served immediately while a background thread
+# rebuilds it, so users do not pay the okama fetch at the TTL boundary. Types
+# not listed here (e.g. "ef") keep the blocking rebuild.
+STALE_WHILE_REVALIDATE = {
+    "assetlist": 3 * 24 * 3600,
+    "portfolio": 3 * 24 * 3600,
+}
+
+
+def _env_bytes(name: str, default: int) -> int:
+    """Byte count from the environment; a malformed value is logged and the default kept."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning("Ignoring %s=%r: not an integer byte count, using %d", name, value, default)
+        return default
+
+
+# Disk budget for cache-directory, enforced by evicting the least recently
+# accessed pickles. Types listed in CACHE_TYPE_QUOTAS are first trimmed to their
+# own share of the budget, so large EF pickles (full_frontier=True) cannot push
+# out cheap AssetLists; the global budget then applies across all types.
+CACHE_MAX_BYTES = _env_bytes("OKAMA_OBJECT_CACHE_MAX_BYTES", 4 * 1024**3)
+CACHE_TYPE_QUOTAS = {
+    "ef": 0.5,
+    "portfolio": 0.3,
+    "assetlist": 0.15,
+}
+
+# Entries are indexed in a SQLite manifest next to the pickles (see
+# common/cache_manifest.py): hits, last access, size and build time per key.
+# Sweeps expire and evict from the manifest; the full directory scan only runs
+# every _RECONCILE_INTERVAL_SECONDS to pick up files it does not know about.
+_MANIFEST_NAME = ".object-cache-manifest.sqlite3"
+_RECONCILE_INTERVAL_SECONDS = 24 * 3600
+
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="object-cache-refresh")
+_refreshing: set[str] = set()
+_refreshing_lock = threading.Lock()
+
 _cache_dir = Path(__file__).parent.parent / "cache-directory"
 
+# Every gunicorn worker keeps its own _lru_load, so without a shared tier each
+# worker reads the same pickle from disk on its first hit. The shared tier is a
+# directory on tmpfs (/dev/shm): the first worker to load an entry publishes its
+# bytes there and the others mmap them instead of touching cache-directory.
+# OKAMA_OBJECT_CACHE_SHM_DIR overrides the location; an empty value disables it.
+_SHM_DIR_ENV = "OKAMA_OBJECT_CACHE_SHM_DIR"
+_SHM_MAX_OBJECT_BYTES = 64 * 1024 * 1024
+
+
+def _resolve_shm_dir() -> Path | None:
+    configured = os.environ.get(_SHM_DIR_ENV)
+    if configured is not None:
+        path = Path(configured) if configured else None
+    elif os.environ.get("TESTING") == "1" or not Path("/dev/shm").is_dir():
+        path = None
+    else:
+        path = Path("/dev/shm") / f"okama-dash-object-cache-{os.getuid()}"
+    return _private_dir(path) if path is not None else None
+
+
+def _private_dir(path: Path) -> Path | None:
+    """``path`` as a directory only this user can write to, else None (shared tier disabled).
+
+    Entries in the shared tier are unpickled, so a directory another local user
+    created or can write to would let them run code in the web workers.
+    """
+    try:
+        path.mkdir(mode=0o700, parents=True, exist_ok=True)
+        st = path.lstat()
+    except OSError as exc:
+        logger.warning("Shared cache directory %s is unusable, shared tier disabled: %s", path, exc)
+        return None
+    if not S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & (S_IWGRP | S_IWOTH):
+        logger.warning("Shared cache directory %s is not private to this user, shared tier disabled", path)
+        return None
+    return path
+
+
+_shm_dir = _resolve_shm_dir()
+
+# Entries holding NumPy/pandas data (Portfolio, EfficientFrontier, AssetList)
+# are stored as a pickle-5 stream whose array buffers are written out-of-band:
+#   header (magic, buffer count, stream length, buffer lengths) | stream | buffers
+# with every section 64-byte aligned. Loading mmaps the file copy-on-write and
+# hands the buffer slices to pickle.loads, so the return/price matrices become
+# arrays over the mapped pages instead of being copied out of the stream.
+# Objects without array buffers stay plain pickles; both load transparently.
+_OOB_MAGIC = b"OKOB"
+_OOB_HEADER = struct.Struct("<4sIQ")
+_OOB_ALIGN = 64
+
 
 def _data_source_token() -> str:
     """
@@ -50,7 +179,47 @@ def get_okama_version() -> str:
     return okama.__version__
 
 
+# Key canonicalization: equivalent requests from different pages must map to one
+# entry. Weights are quantized to _WEIGHT_DECIMALS (0.3333333 == 0.33333334),
+# dates are reduced to months with an open-ended last_date resolved to the
+# current month, empty values and integral floats are normalized, and params
+# equal to the okama constructor default for the obj_type are dropped.
+_WEIGHT_DECIMALS = 6
+_PARAM_DEFAULTS: dict[str, dict[str, Any]] = {
+    "portfolio": {"inflation": True, "rebal": "month"},
+    "assetlist": {"inflation": True},
+}
+
+
+def _canonical_value(value: Any) -> Any:
+    if isinstance(value, str) and not value:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _canonical_params(obj_type: str, cache_key_params: dict[str, Any]) -> dict[str, Any]:
+    params = {key: _canonical_value(value) for key, value in cache_key_params.items()}
+    for key in ("first_date", "last_date"):
+        if params.get(key) is not None:
+            month = _month_of(params[key])
+            params[key] = f"{month[0]:04d}-{month[1]:02d}" if month else params[key]
+    if "last_date" in params and params["last_date"] is None:
+        params["last_date"] = _publication_period(time.time())
+    for key in ("abs_dev", "rel_dev"):
+        if not params.get(key):
+            params[key] = None  # 0 and "" both mean "no deviation band"
+    if params.get("weights"):
+        params["weights"] = [round(float(w), _WEIGHT_DECIMALS) for w in params["weights"]]
+    for key, default in _PARAM_DEFAULTS.get(obj_type, {}).items():
+        if params.get(key) == default:
+            params[key] = None
+    return params
+
+
 def _build_cache_key(obj_type: str, cache_key_params: dict[str, Any]) -> str:
+    cache_key_params = _canonical_params(obj_type, cache_key_params)
     symbols = list(cache_key_params.get("symbols", []))
     weights = cache_key_params.get("weights")
 
@@ -87,14 +256,14 @@ def _build_cache_key(obj_type: str, cache_key_params: dict[str, Any]) -> str:
     return name
 
 
-def _atomic_write(file_path: Path, obj: Any) -> None:
+def _atomic_write_bytes(file_path: Path, data: bytes) -> None:
     file_path.parent.mkdir(parents=True, exist_ok=True)
     tmp_path = None
     try:
         fd_int, tmp_path_str = tempfile.mkstemp(dir=str(file_path.parent), suffix=".tmp", prefix=".cache-")
         tmp_path = Path(tmp_path_str)
         with os.fdopen(fd_int, "wb") as f:
-            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.write(data)
         tmp_path.rename(file_path)
         tmp_path = None
     except Exception:
@@ -103,58 +272,393 @@ def _atomic_write(file_path: Path, obj: Any) -> None:
         raise
 
 
-def _safe_load(file_path: Path) -> Any:
+def _aligned(offset: int) -> int:
+    return -(-offset // _OOB_ALIGN) * _OOB_ALIGN
+
+
+def _dumps(obj: Any) -> bytes | bytearray:
+    buffers: list[pickle.PickleBuffer] = []
+    stream = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    if not buffers:
+        return stream
+    raw = [buffer.raw() for buffer in buffers]
+    out = bytearray(_OOB_HEADER.pack(_OOB_MAGIC, len(raw), len(stream)))
+    out += struct.pack(f"<{len(raw)}Q", *(view.nbytes for view in raw))
+    for chunk in (stream, *raw):
+        out += bytes(_aligned(len(out)) - len(out))
+        out += chunk
+    return out
+
+
+def _loads(data: bytes | mmap.mmap) -> Any:
+    view = memoryview(data)
+    if view[: len(_OOB_MAGIC)] != _OOB_MAGIC:
+        return pickle.loads(view)  # noqa: S301
+    _, count, stream_len = _OOB_HEADER.unpack_from(view)
+    sizes = struct.unpack_from(f"<{count}Q", view, _OOB_HEADER.size)
+    offset = _aligned(_OOB_HEADER.size + 8 * count)
+    stream = view[offset : offset + stream_len]
+    offset += stream_len
+    buffers = []
+    for size in sizes:
+        offset = _aligned(offset)
+        buffers.append(view[offset : offset + size])
+        offset += size
+    if offset > len(view):
+        raise EOFError(f"Truncated cache entry: {offset} > {len(view)} bytes")
+    return pickle.loads(stream, buffers=buffers)  # noqa: S301
+
+
+def _atomic_write(file_path: Path, obj: Any) -> None:
+    _atomic_write_bytes(file_path, _dumps(obj))
+
+
+def _map_file(f) -> bytes | mmap.mmap:
+    """Copy-on-write mapping of an open cache file: arrays loaded from it stay writable."""
+    if os.fstat(f.fileno()).st_size == 0:
+        return b""
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+
+def _read_locked(file_path: Path) -> bytes | mmap.mmap:
+    with open(file_path, "rb") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_SH)
+        try:
+            return _map_file(f)
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _key_digest(cache_key: str) -> str:
+    # Hashed: cache keys may already be 255 bytes long, with no room for a suffix.
+    # Names sidecar files (shared tier, single-flight lock) derived from a key.
+    return hashlib.sha256(cache_key.encode("utf-8")).hexdigest()[:32]
+
+
+def _shm_entry_path(cache_key: str, mtime_ns: int) -> Path | None:
+    """Shared-tier location of one version (disk mtime) of a cache entry."""
+    if _shm_dir is None:
+        return None
+    return _shm_dir / f"{_key_digest(cache_key)}.{mtime_ns}"
+
+
+def _shm_load(shm_path: Path) -> Any:
+    """Load straight from the mmap'd tmpfs page cache shared by all workers."""
+    with open(shm_path, "rb") as f:
+        return _loads(_map_file(f))
+
+
+def _shm_publish(cache_key: str, shm_path: Path, data: bytes | mmap.mmap) -> None:
+    """Make ``data`` available to the other workers; best effort, never raises."""
+    if len(data) > _SHM_MAX_OBJECT_BYTES:
+        return
     try:
-        with open(file_path, "rb") as f:
-            fcntl.flock(f.fileno(), fcntl.LOCK_SH)
-            try:
-                return pickle.load(f)  # noqa: S301
-            finally:
-                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
-    except (pickle.UnpicklingError, EOFError, ModuleNotFoundError) as exc:
+        _atomic_write_bytes(shm_path, data)
+        # Only the current disk version is worth keeping in RAM.
+        for stale in shm_path.parent.glob(f"{_key_digest(cache_key)}.*"):
+            if stale != shm_path and not stale.name.endswith(".tmp"):
+                stale.unlink(missing_ok=True)
+    except OSError as exc:
+        logger.warning("Shared cache publish failed for %s: %s", cache_key, exc)
+
+
+def _load_entry(cache_key: str, mtime_ns: int) -> Any:
+    """Load one cache entry: shared tier first, then the pickle on disk."""
+    shm_path = _shm_entry_path(cache_key, mtime_ns)
+    if shm_path is not None:
+        try:
+            obj = _shm_load(shm_path)
+            logger.debug("cache_shm_hit key=%s", cache_key)
+            return obj
+        except FileNotFoundError:
+            pass
+        except (pickle.UnpicklingError, EOFError, ValueError, OSError, struct.error) as exc:
+            logger.warning("Corrupt shared cache entry %s: %s. Removing.", shm_path, exc)
+            shm_path.unlink(missing_ok=True)
+
+    file_path = _cache_dir / cache_key
+    data = _read_locked(file_path)
+    try:
+        obj = _loads(data)
+    except (pickle.UnpicklingError, EOFError, ModuleNotFoundError, ValueError, struct.error) as exc:
         logger.warning("Corrupt cache file %s: %s. Removing.", file_path, exc)
         file_path.unlink(missing_ok=True)
         raise FileNotFoundError(f"Removed corrupt cache: {file_path}") from exc
+    if shm_path is not None:
+        _shm_publish(cache_key, shm_path, data)
+    return obj
 
 
 @lru_cache(maxsize=64)
 def _lru_load(cache_key: str, mtime_ns: int) -> Any:
-    del mtime_ns
-    return _safe_load(_cache_dir / cache_key)
+    return _load_entry(cache_key, mtime_ns)
 
 
-def get_or_create(
-    obj_type: str,
-    constructor_fn: Callable[[], T],
-    cache_key_params: dict[str, Any],
-    ttl_seconds: int,
-) -> tuple[T, str]:
-    cleanup_expired_files()
+def _manifest() -> CacheManifest:
+    return get_manifest(_cache_dir / _MANIFEST_NAME)
 
-    cache_key = _build_cache_key(obj_type, cache_key_params)
-    file_path = _cache_dir / cache_key
 
+def _record_access(cache_key: str) -> None:
+    """Count a hit and refresh last_access (the LRU key) in the manifest; never raises."""
+    try:
+        _manifest().record_hit(cache_key)
+    except (sqlite3.Error, OSError) as exc:
+        logger.warning("Cache manifest update failed for %s: %s", cache_key, exc)
+
+
+def _publication_time(year: int, month: int) -> float:
+    """When the monthly bar for ``year``-``month`` is available from okama."""
+    year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return datetime(year, month, 1, tzinfo=timezone.utc).timestamp() + MONTHLY_PUBLICATION_LAG_DAYS * 24 * 3600
+
+
+def _previous_month(year: int, month: int) -> tuple[int, int]:
+    return (year - 1, 12) if month == 1 else (year, month - 1)
+
+
+def _next_publication(after: float) -> float:
+    moment = datetime.fromtimestamp(after, timezone.utc)
+    boundary = _publication_time(*_previous_month(moment.year, moment.month))
+    return boundary if boundary > after else _publication_time(moment.year, moment.month)
+
+
+def _last_publication(before: float) -> float:
+    """The latest monthly publication boundary at or before ``before``."""
+    moment = datetime.fromtimestamp(before, timezone.utc)
+    previous_month = _previous_month(moment.year, moment.month)
+    boundary = _publication_time(*previous_month)
+    return boundary if boundary <= before else _publication_time(*_previous_month(*previous_month))
+
+
+def _publication_period(now: float) -> str:
+    """Month an open-ended last_date stands for in keys.
+
+    It rolls over at the monthly publication boundary, together with the calendar
+    expiry of open-ended entries, not on the 1st: a new key before the new bar
+    is published would only force an extra cold rebuild.
+    """
+    moment = datetime.fromtimestamp(now - MONTHLY_PUBLICATION_LAG_DAYS * 24 * 3600, timezone.utc)
+    return f"{moment.year:04d}-{moment.month:02d}"
+
+
+def _month_of(value: Any) -> tuple[int, int] | None:
+    try:
+        year, month = str(value)[:7].split("-")
+        return int(year), int(month)
+    except ValueError:
+        return None
+
+
+def _expires_at(obj_type: str, cache_key_params: dict[str, Any], ttl_seconds: int, created: float) -> float:
+    """Expiry timestamp of an entry built at ``created`` (``math.inf`` for closed ranges)."""
+    if obj_type not in CALENDAR_EXPIRY_TYPES or "last_date" not in cache_key_params:
+        return created + ttl_seconds
+    month = _month_of(cache_key_params["last_date"]) if cache_key_params["last_date"] else None
+    if month is not None and _publication_time(*month) <= created:
+        return math.inf
+    return _next_publication(created)
+
+
+def _entry_mtime(cache_key: str) -> float | None:
+    try:
+        return (_cache_dir / cache_key).stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+
+def _load_if_fresh(
+    obj_type: str,
+    cache_key: str,
+    expires_at: Callable[[float], float],
+    schedule_refresh: Callable[[], bool] | None = None,
+) -> Any:
+    """Cached object when the entry exists and has not expired, else ``_MISS``.
+
+    ``expires_at`` maps the entry's mtime to its expiry timestamp. With
+    ``schedule_refresh`` given, an entry expired less than the obj_type's
+    STALE_WHILE_REVALIDATE grace ago is returned as well, after scheduling its rebuild.
+    """
+    file_path = _cache_dir / cache_key
     try:
         stat = file_path.stat()
-        age = time.time() - stat.st_mtime
-        if age < ttl_seconds:
+        now = time.time()
+        age = now - stat.st_mtime
+        expiry = expires_at(stat.st_mtime)
+        if now < expiry:
             obj = _lru_load(cache_key, stat.st_mtime_ns)
+            _record_access(cache_key)
             logger.info("cache_hit obj_type=%s key=%s age=%.0fs", obj_type, cache_key, age)
-            return obj, cache_key
+            return obj
+        grace = STALE_WHILE_REVALIDATE.get(obj_type, 0) if schedule_refresh else 0
+        if now < expiry + grace:
+            obj = _lru_load(cache_key, stat.st_mtime_ns)
+            _record_access(cache_key)
+            refresh = "scheduled" if schedule_refresh() else "in_progress"
+            logger.info("cache_hit obj_type=%s key=%s age=%.0fs stale=1 refresh=%s", obj_type, cache_key, age, refresh)
+            return obj
         else:
             logger.info("cache_expired obj_type=%s key=%s age=%.0fs", obj_type, cache_key, age)
     except FileNotFoundError:
         pass
     except Exception as exc:
         logger.warning("Cache load failed for %s: %s", cache_key, exc)
+    return _MISS
 
+
+def _build_and_store(
+    obj_type: str,
+    cache_key: str,
+    constructor_fn: Callable[[], T],
+    cache_key_params: dict[str, Any] | None = None,
+    expires_at: Callable[[float], float] | None = None,
+) -> T:
+    file_path = _cache_dir / cache_key
+    start = time.perf_counter()
     obj = constructor_fn()
+    build_ms = (time.perf_counter() - start) * 1000
 
     try:
         _atomic_write(file_path, obj)
-        logger.info("cache_store obj_type=%s key=%s size=%d", obj_type, cache_key, file_path.stat().st_size)
+        stat = file_path.stat()
+        logger.info("cache_store obj_type=%s key=%s size=%d build=%.0fms", obj_type, cache_key, stat.st_size, build_ms)
     except Exception as exc:
         logger.warning("Cache write failed for %s: %s", cache_key, exc)
+        return obj
+    try:
+        _manifest().record_store(
+            cache_key,
+            obj_type,
+            cache_key_params,
+            stat.st_size,
+            build_ms,
+            stat.st_mtime,
+            expires_at(stat.st_mtime) if expires_at else None,
+        )
+    except (sqlite3.Error, OSError) as exc:
+        logger.warning("Cache manifest update failed for %s: %s", cache_key, exc)
+    return obj
+
+
+def _schedule_refresh(
+    obj_type: str,
+    cache_key: str,
+    constructor_fn: Callable[[], Any],
+    expires_at: Callable[[float], float],
+    cache_key_params: dict[str, Any] | None = None,
+) -> bool:
+    """Queue a background rebuild of a stale entry; False when one is already queued."""
+    with _refreshing_lock:
+        if cache_key in _refreshing:
+            return False
+        _refreshing.add(cache_key)
+    try:
+        _refresh_executor.submit(_refresh_entry, obj_type, cache_key, constructor_fn, expires_at, cache_key_params)
+    except RuntimeError:
+        # Executor shut down (interpreter exit): keep serving the stale entry.
+        with _refreshing_lock:
+            _refreshing.discard(cache_key)
+        return False
+    return True
+
+
+def _refresh_entry(
+    obj_type: str,
+    cache_key: str,
+    constructor_fn: Callable[[], Any],
+    expires_at: Callable[[float], float],
+    cache_key_params: dict[str, Any] | None = None,
+) -> None:
+    start = time.perf_counter()
+    try:
+        with _single_flight(cache_key):
+            mtime = _entry_mtime(cache_key)
+            if mtime is not None and time.time() < expires_at(mtime):
+                # Another worker refreshed the entry while we waited for the lock.
+                return
+            _build_and_store(obj_type, cache_key, constructor_fn, cache_key_params, expires_at)
+        logger.info(
+            "cache_refresh obj_type=%s key=%s took=%.0fms", obj_type, cache_key, (time.perf_counter() - start) * 1000
+        )
+    except Exception as exc:
+        logger.warning("Cache refresh failed for %s: %s", cache_key, exc)
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(cache_key)
+
+
+@contextmanager
+def _single_flight(cache_key: str) -> Iterator[bool]:
+    """Hold the cross-process build lock for ``cache_key`` (flock on a ``.building`` sidecar).
+
+    Yields True when another process held the lock first, i.e. the caller should
+    re-check the cache before building. On timeout the caller proceeds without
+    the lock. Sidecars are left in place: unlinking a flock file races with
+    processes that already opened it; cleanup_expired_files() sweeps old ones.
+    """
+    lock_path = _cache_dir / f".{_key_digest(cache_key)}.building"
+    try:
+        _cache_dir.mkdir(parents=True, exist_ok=True)
+        fd = os.open(str(lock_path), os.O_CREAT | os.O_RDWR, 0o644)
+    except OSError as exc:
+        logger.warning("Build lock unavailable for %s: %s", cache_key, exc)
+        yield False
+        return
+    waited = False
+    acquired = False
+    try:
+        deadline = time.monotonic() + _BUILD_WAIT_SECONDS
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                acquired = True
+                os.utime(fd)  # keeps an active sidecar out of the cleanup sweep
+                break
+            except BlockingIOError:
+                if not waited:
+                    logger.info("cache_wait key=%s", cache_key)
+                waited = True
+                if time.monotonic() >= deadline:
+                    logger.warning("cache_wait_timeout key=%s after %ds", cache_key, _BUILD_WAIT_SECONDS)
+                    break
+                time.sleep(_BUILD_POLL_SECONDS)
+        yield waited
+    finally:
+        if acquired:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def get_or_create(
+    obj_type: str,
+    constructor_fn: Callable[[], T],
+    cache_key_params: dict[str, Any],
+    ttl_seconds: int,
+) -> tuple[T, str]:
+    """Cached object for ``cache_key_params`` (built with ``constructor_fn`` on a miss) and its cache key.
+
+    ``ttl_seconds`` is replaced by calendar-aware expiry for CALENDAR_EXPIRY_TYPES
+    called with a last_date param.
+    """
+    cache_key = _build_cache_key(obj_type, cache_key_params)
+    expires_at = partial(_expires_at, obj_type, cache_key_params, ttl_seconds)
+
+    obj = _load_if_fresh(
+        obj_type,
+        cache_key,
+        expires_at,
+        schedule_refresh=lambda: _schedule_refresh(obj_type, cache_key, constructor_fn, expires_at, cache_key_params),
+    )
+    if obj is not _MISS:
+        return obj, cache_key
+
+    with _single_flight(cache_key) as waited:
+        if waited:
+            obj = _load_if_fresh(obj_type, cache_key, expires_at)
+            if obj is not _MISS:
+                logger.info("cache_coalesced obj_type=%s key=%s", obj_type, cache_key)
+                return obj, cache_key
+
+        obj = _build_and_store(obj_type, cache_key, constructor_fn, cache_key_params, expires_at)
 
     return obj, cache_key
 
@@ -165,43 +669,232 @@ def load_cached(cache_key: str) -> Any:
     return _lru_load(cache_key, stat.st_mtime_ns)
 
 
-def _should_skip_cleanup(marker: Path, lock_file: Path) -> bool:
-    if marker.exists() and time.time() - marker.stat().st_mtime < _CLEANUP_INTERVAL_SECONDS:
+def entry_version(cache_key: str) -> int:
+    """mtime_ns of the cached pickle: changes whenever the entry is rebuilt under the same key."""
+    return (_cache_dir / cache_key).stat().st_mtime_ns
+
+
+def _should_skip_cleanup(marker: Path, lock_file: Path, interval: int = _CLEANUP_INTERVAL_SECONDS) -> bool:
+    if marker.exists() and time.time() - marker.stat().st_mtime < interval:
         return True
     try:
         lock_fd = os.open(str(lock_file), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
         os.close(lock_fd)
     except FileExistsError:
+        # A lock outliving the interval belongs to a crashed worker; drop it so
+        # the next call runs instead of the sweep being disabled for good.
+        try:
+            if time.time() - lock_file.stat().st_mtime > interval:
+                lock_file.unlink(missing_ok=True)
+        except FileNotFoundError:
+            pass
         return True
     return False
 
 
-def cleanup_expired_files(max_ttl_seconds: int | None = None, *, _force: bool = False) -> None:
+def cleanup_expired_files(
+    max_ttl_seconds: int | None = None,
+    *,
+    _force: bool = False,
+    pause_seconds: float = 0.0,
+) -> None:
+    """One sweep pass: drop expired pickles, stale sidecars and shared-tier
+    entries, then enforce the disk budget.
+
+    Runs at most once per SWEEP_INTERVAL_SECONDS across all workers (marker +
+    lock file) unless ``_force``. Expired and over-budget entries come from the
+    manifest; the directory is rescanned into it once per
+    _RECONCILE_INTERVAL_SECONDS, on ``_force``, or when the manifest is
+    unusable. ``pause_seconds`` makes that scan yield between batches; the
+    background sweeper passes a non-zero value.
+    """
     max_ttl = max_ttl_seconds or max(TTL_ASSET_LIST, TTL_PORTFOLIO, TTL_EFFICIENT_FRONTIER)
     _cache_dir.mkdir(parents=True, exist_ok=True)
 
     marker = _cache_dir / ".object-cache-cleanup"
     lock_file = _cache_dir / ".object-cache-cleanup.lock"
 
-    if not _force and _should_skip_cleanup(marker, lock_file):
+    if not _force and _should_skip_cleanup(marker, lock_file, interval=SWEEP_INTERVAL_SECONDS):
         return
 
     try:
         threshold = time.time() - max_ttl
-        removed = 0
-        cv_pattern = f"cv={CACHE_FORMAT_VERSION}"
-        for path in _cache_dir.glob("*.pkl"):
-            if cv_pattern not in path.name:
-                continue
-            try:
-                if path.stat().st_mtime < threshold:
-                    path.unlink(missing_ok=True)
-                    removed += 1
-            except FileNotFoundError:
-                continue
-        if removed:
-            logger.info("cache_cleanup removed=%d", removed)
+        entries = _manifest_entries(_force, pause_seconds)
+        expired = _expired_keys(entries, threshold)
+        for cache_key in expired:
+            (_cache_dir / cache_key).unlink(missing_ok=True)
+            _discard_shm_entries(cache_key)
+        if expired:
+            _forget_entries(sorted(expired))
+            logger.info("cache_cleanup removed=%d", len(expired))
+            entries = [entry for entry in entries if entry[2] not in expired]
+        _cleanup_build_locks()
+        _cleanup_shm_dir(threshold)
+        _apply_disk_budget(entries, CACHE_MAX_BYTES)
         marker.touch()
     finally:
         if not _force:
             lock_file.unlink(missing_ok=True)
+
+
+def _manifest_entries(rescan: bool, pause_seconds: float = 0.0) -> list[tuple[float, str, str, int, float]]:
+    """Entries as (last_access, obj_type, cache_key, size, mtime), oldest access first.
+
+    Read from the manifest, after syncing it with a directory scan when ``rescan``
+    is set or the last scan is older than _RECONCILE_INTERVAL_SECONDS. Falls back
+    to the plain scan when the manifest cannot be used.
+    """
+    marker = _cache_dir / ".object-cache-reconcile"
+    try:
+        manifest = _manifest()
+        manifest.flush_hits()
+        if rescan or not marker.exists() or time.time() - marker.stat().st_mtime >= _RECONCILE_INTERVAL_SECONDS:
+            scan_started = time.time()
+            added, dropped = manifest.reconcile(_scan_entries(pause_seconds), scan_started)
+            marker.touch()
+            if added or dropped:
+                logger.info("cache_manifest_reconcile added=%d dropped=%d", added, dropped)
+        return manifest.entries_by_access()
+    except sqlite3.Error as exc:
+        logger.warning("Cache manifest unavailable, scanning the directory: %s", exc)
+        return _scan_entries(pause_seconds)
+
+
+def _expired_keys(entries: list[tuple[float, str, str, int, float]], threshold: float) -> set[str]:
+    """Entries past their recorded expiry (plus the longest stale-while-revalidate
+    grace), or, with no recorded expiry, built before ``threshold``.
+
+    Closed-range entries (expiry ``inf``) are never returned. Without a usable
+    manifest only the ``threshold`` rule applies.
+    """
+    try:
+        grace = max(STALE_WHILE_REVALIDATE.values(), default=0)
+        return set(_manifest().expired_keys(threshold, time.time() - grace))
+    except sqlite3.Error:
+        return {entry[2] for entry in entries if entry[4] < threshold}
+
+
+def _forget_entries(cache_keys: list[str]) -> None:
+    try:
+        _manifest().remove(cache_keys)
+    except (sqlite3.Error, OSError) as exc:
+        logger.warning("Cache manifest update failed: %s", exc)
+
+
+def _cleanup_build_locks() -> None:
+    """Drop single-flight sidecars no build has touched for a cleanup interval."""
+    threshold = time.time() - _CLEANUP_INTERVAL_SECONDS
+    for lock_path in _cache_dir.glob(".*.building"):
+        try:
+            if lock_path.stat().st_mtime < threshold:
+                lock_path.unlink(missing_ok=True)
+        except FileNotFoundError:
+            continue
+
+
+def _cleanup_shm_dir(threshold: float) -> None:
+    """Drop shared-tier entries not republished since ``threshold``."""
+    if _shm_dir is None or not _shm_dir.is_dir():
+        return
+    for path in _shm_dir.iterdir():
+        try:
+            if path.stat().st_mtime < threshold:
+                path.unlink(missing_ok=True)
+        except FileNotFoundError:
+            continue
+
+
+def _obj_type_from_name(name: str) -> str:
+    # _build_cache_key always starts the filename with "<obj_type>-".
+    return name.split("-", 1)[0]
+
+
+def _scan_entries(pause_seconds: float = 0.0) -> list[tuple[float, str, str, int, float]]:
+    """(last_access, obj_type, cache_key, size, mtime) for every current-version pickle, oldest access first.
+
+    Streams the directory with os.scandir, pausing ``pause_seconds`` after every
+    _SWEEP_BATCH_SIZE entries, so a sweep over tens of thousands of files never
+    monopolizes the disk.
+    """
+    entries = []
+    cv_pattern = f"cv={CACHE_FORMAT_VERSION}"
+    with os.scandir(_cache_dir) as it:
+        for index, dir_entry in enumerate(it, start=1):
+            if pause_seconds and index % _SWEEP_BATCH_SIZE == 0:
+                time.sleep(pause_seconds)
+            name = dir_entry.name
+            if not name.endswith(".pkl") or cv_pattern not in name:
+                continue
+            try:
+                stat = dir_entry.stat()
+            except FileNotFoundError:
+                continue
+            last_access = max(stat.st_atime, stat.st_mtime)
+            entries.append((last_access, _obj_type_from_name(name), name, stat.st_size, stat.st_mtime))
+    entries.sort(key=lambda entry: entry[0])
+    return entries
+
+
+def _discard_shm_entries(cache_key: str) -> None:
+    if _shm_dir is None or not _shm_dir.is_dir():
+        return
+    for path in _shm_dir.glob(f"{_key_digest(cache_key)}.*"):
+        path.unlink(missing_ok=True)
+
+
+def enforce_disk_budget(max_bytes: int | None = None) -> dict[str, int]:
+    """Evict least recently accessed pickles until per-type quotas and the total budget hold.
+
+    Rescans the directory into the manifest first. Returns the remaining usage
+    in bytes per obj_type; also logged as ``cache_usage``.
+    """
+    return _apply_disk_budget(_manifest_entries(rescan=True), max_bytes or CACHE_MAX_BYTES)
+
+
+def cache_stats() -> dict[str, dict[str, float]]:
+    """Per obj_type files, bytes, hits and mean build_ms, from the manifest."""
+    manifest = _manifest()
+    manifest.flush_hits()
+    return manifest.usage_by_type()
+
+
+def _apply_disk_budget(entries: list[tuple[float, str, str, int, float]], budget: int) -> dict[str, int]:
+    usage: dict[str, int] = {}
+    for _, obj_type, _, size, _ in entries:
+        usage[obj_type] = usage.get(obj_type, 0) + size
+
+    evicted: set[str] = set()
+
+    def _evict(obj_type: str, cache_key: str, size: int) -> None:
+        (_cache_dir / cache_key).unlink(missing_ok=True)
+        _discard_shm_entries(cache_key)
+        evicted.add(cache_key)
+        usage[obj_type] -= size
+
+    for obj_type, share in CACHE_TYPE_QUOTAS.items():
+        quota = int(budget * share)
+        for _, entry_type, cache_key, size, _ in entries:
+            if usage.get(obj_type, 0) <= quota:
+                break
+            if entry_type == obj_type:
+                _evict(entry_type, cache_key, size)
+
+    for _, entry_type, cache_key, size, _ in entries:
+        if sum(usage.values()) <= budget:
+            break
+        if cache_key not in evicted:
+            _evict(entry_type, cache_key, size)
+
+    _forget_entries(sorted(evicted))
+
+    total = sum(usage.values())
+    per_type = " ".join(f"{obj_type}={size}" for obj_type, size in sorted(usage.items()))
+    logger.info(
+        "cache_usage total=%d budget=%d files=%d evicted=%d %s",
+        total,
+        budget,
+        len(entries) - len(evicted),
+        len(evicted),
+        per_type,
+    )
+    return usage
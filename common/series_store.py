@@ -0,0 +1,186 @@
+"""Symbol-level store of raw okama API responses, shared by every okama constructor.
+
+The object cache is keyed on whole objects, so Portfolio, AssetList, EF,
+url-portfolio, Inflation and Rate objects that share 11 of 12 tickers still
+download all 12 series again. okama fetches every time series (ror, close,
+adjusted close, dividends, NAV, macro) and symbol info through
+``okama.api.api_methods.API.connect``; ``install_series_store()`` wraps it so
+each response is kept per (endpoint, symbol, dates, period) in a SQLite store
+under cache-directory. A new ticker combination then only downloads the
+tickers no worker has fetched within SERIES_TTL_SECONDS. Currency conversion
+series (``<PAIR>.FX``) go through the same path. Open-ended responses fetched
+before the latest monthly publication boundary are not served, so a rebuild
+after the boundary always sees the new monthly bar.
+
+Responses are the CSV/JSON text okama parses, stored zlib-compressed. Errors are
+never stored, and any store failure falls back to the live API.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+from okama import settings
+from okama.api import api_methods
+
+from common import object_cache
+
+logger = logging.getLogger("object_cache")
+
+# Shorter than the object TTLs: a stale-while-revalidate rebuild of a Portfolio
+# must see the new month's data, not a week-old copy of the series.
+SERIES_TTL_SECONDS = 24 * 3600
+_STORE_NAME = ".series-store.sqlite3"
+
+_CACHED_ENDPOINTS = frozenset(
+    {
+        api_methods.API.endpoint_ror,
+        api_methods.API.endpoint_adjusted_close,
+        api_methods.API.endpoint_close,
+        api_methods.API.endpoint_dividends,
+        api_methods.API.endpoint_nav,
+        api_methods.API.endpoint_macro,
+        api_methods.API.endpoint_symbol,
+    }
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    endpoint TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    first_date TEXT NOT NULL,
+    last_date TEXT NOT NULL,
+    period TEXT NOT NULL,
+    body BLOB NOT NULL,
+    fetched REAL NOT NULL,
+    PRIMARY KEY (endpoint, symbol, first_date, last_date, period)
+);
+CREATE INDEX IF NOT EXISTS responses_fetched ON responses (fetched);
+"""
+
+_ResponseKey = tuple[str, str, str, str, str]
+
+
+class SeriesStore:
+    def __init__(self, path: Path):
+        self.path = path
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=5, isolation_level=None)
+        try:
+            if not self._initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                self._initialized = True
+            yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: _ResponseKey, max_age: float = SERIES_TTL_SECONDS) -> str | None:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT body, fetched FROM responses WHERE endpoint = ? AND symbol = ? AND first_date = ? "
+                "AND last_date = ? AND period = ? AND fetched >= ?",
+                (*key, now - max_age),
+            ).fetchone()
+        if row is None:
+            return None
+        body, fetched = row
+        if not _is_settled(key[3], fetched) and fetched < object_cache._last_publication(now):
+            # Fetched before the latest monthly bar was published: an object rebuilt
+            # from it would be calendar-fresh until next month without that bar.
+            return None
+        return zlib.decompress(body).decode("utf-8")
+
+    def put(self, key: _ResponseKey, body: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*key, zlib.compress(body.encode("utf-8")), time.time()),
+            )
+
+    def purge(self, max_age: float = SERIES_TTL_SECONDS) -> int:
+        """Drop responses older than ``max_age``; returns the number removed."""
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM responses WHERE fetched < ?", (time.time() - max_age,)).rowcount
+
+
+def _is_settled(last_date: str, fetched: float) -> bool:
+    """Whether a response ending at ``last_date`` already held its last monthly bar when fetched."""
+    month = object_cache._month_of(last_date) if last_date else None
+    return month is not None and object_cache._publication_time(*month) <= fetched
+
+
+_stores: dict[Path, SeriesStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_series_store() -> SeriesStore:
+    path = object_cache._cache_dir / _STORE_NAME
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = SeriesStore(path)
+        return store
+
+
+def _date_param(value: str | pd.Timestamp | None) -> str:
+    if isinstance(value, pd.Timestamp):
+        return value.strftime("%Y-%m-%d")
+    return value or ""
+
+
+def install_series_store() -> bool:
+    """Route okama's API.connect through the store (idempotent); no-op when disabled by env."""
+    if os.environ.get("OKAMA_SERIES_STORE", "on") == "off":
+        return False
+    api = api_methods.API
+    if getattr(api.connect, "_series_store", False):
+        return True
+    fetch = api.connect.__func__
+
+    def connect(
+        cls,
+        endpoint: str = api.endpoint_ror,
+        symbol: str = settings.default_ticker,
+        first_date: str | pd.Timestamp | None = None,
+        last_date: str | pd.Timestamp | None = None,
+        period: str = "d",
+    ) -> str:
+        if endpoint not in _CACHED_ENDPOINTS:
+            return fetch(cls, endpoint, symbol, first_date, last_date, period)
+        key = (endpoint, symbol, _date_param(first_date), _date_param(last_date), period)
+        store = get_series_store()
+        try:
+            body = store.get(key)
+        except sqlite3.Error as exc:
+            logger.warning("Series store read failed for %s: %s", symbol, exc)
+            body = None
+        if body is not None:
+            logger.debug("series_hit endpoint=%s symbol=%s", endpoint, symbol)
+            return body
+        start = time.perf_counter()
+        body = fetch(cls, endpoint, symbol, first_date, last_date, period)
+        logger.info(
+            "series_fetch endpoint=%s symbol=%s took=%.0fms", endpoint, symbol, (time.perf_counter() - start) * 1000
+        )
+        try:
+            store.put(key, body)
+        except sqlite3.Error as exc:
+            logger.warning("Series store write failed for %s: %s", symbol, exc)
+        return body
+
+    connect._series_store = True
+    api.connect = classmethod(connect)
+    return True
@@ -14,7 +14,7 @@ def get_namespaces() -> list[str]:
 
 
 MONTHS_PER_YEAR = 12
-MC_EF_MAX = 1000  # Max points in Monte-Carlo simulation in Efficient Frontier
+MC_EF_MAX = 100_000  # Max points in Monte-Carlo simulation in Efficient Frontier
 MC_PORTFOLIO_MAX = 500  # Max wealth time series in Monte-Carlo simulation in Portfolio
 MC_PORTFOLIO_YEARS_MAX = 50  # Max forecast period (years) in Portfolio Monte-Carlo simulation
 MC_PORTFOLIO_BUDGET = 15_000  # Max simulations × forecast years per Portfolio request
@@ -170,7 +170,7 @@ def get_or_create_url_portfolio(pf_def: dict, *, ccy: str, first_date: str, last
             "first_date": first_date,
             "last_date": last_date,
             "pf": pf_cache_token(pf_def),
-            "purpose": "url_portfolio",
+            "inflation": False,
         },
         ttl_seconds=TTL_PORTFOLIO,
     )
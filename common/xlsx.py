@@ -4,6 +4,8 @@ import dash.exceptions
 import pandas as pd
 from dash import dcc
 
+from common.chart_store import load_chart_data
+
 
 def json_to_download_xlsx_object(json_data):
     """
@@ -14,3 +16,13 @@ def json_to_download_xlsx_object(json_data):
     df = pd.read_json(io.StringIO(json_data), convert_axes=False, orient="split")
     download_excel_object = dcc.send_data_frame(df.to_excel, "okama.xlsx", sheet_name="okama_data")
     return download_excel_object
+
+
+def chart_data_to_download_xlsx_object(data):
+    """
+    Convert a chart-data store value (common.chart_store handle or json) to object for dcc.Download.
+    """
+    df = load_chart_data(data)
+    if df is None:
+        raise dash.exceptions.PreventUpdate
+    return dcc.send_data_frame(df.to_excel, "okama.xlsx", sheet_name="okama_data")
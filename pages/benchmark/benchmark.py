@@ -13,9 +13,10 @@ import okama as ok
 import common.settings as settings
 from common.object_cache import get_or_create, TTL_ASSET_LIST
 import common.update_style
+from common.chart_store import store_chart_data
 from common.chart_helpers import add_last_value_annotations, annual_bar_figure
 from common.html_elements.submit_spinner import submit_spinner_running
-from common.mobile_screens import adopt_small_screens
+from common.mobile_screens import adopt_small_screens, register_screen_adaptation
 import plotly.graph_objects as go
 from pages.benchmark.cards_benchmark.benchmark_chart import card_graf_benchmark
 from pages.benchmark.cards_benchmark.benchmark_controls import benchmark_card_controls
@@ -85,7 +86,7 @@ def layout(
     Output("benchmark-graph", "config"),
     Output("benchmark-store-chart-data", "data"),
     # user screen info
-    Input("store", "data"),
+    State("store", "data"),
     # main Inputs
     Input("benchmark-submit-button", "n_clicks"),
     State("select-benchmark", "value"),
@@ -150,15 +151,18 @@ def update_graf_benchmark(
             ttl_seconds=TTL_ASSET_LIST,
         )
         fig, df_data = get_benchmark_figure(al_object, plot_type, expanding_rolling, rolling_window)
-        json_data = df_data.to_json(orient="split", default_handler=str)
+        chart_data = store_chart_data(df_data)
         fig, config = adopt_small_screens(fig, screen)
-        return fig, config, json_data
+        return fig, config, chart_data
     except Exception as e:
         alert_fig = go.Figure()
         alert_fig.add_annotation(text=str(e), showarrow=False, font={"color": "red", "size": 14})
         return alert_fig, {}, None
 
 
+register_screen_adaptation("benchmark-graph")
+
+
 def get_benchmark_figure(
     al_object: ok.AssetList, plot_type: str, expanding_rolling: str, rolling_window: int
 ) -> typing.Tuple[plotly.graph_objects.Figure, pd.DataFrame]:
@@ -1,7 +1,7 @@
 import dash_bootstrap_components as dbc
 from dash import dcc, callback, html, Input, Output, State
 
-from common.xlsx import json_to_download_xlsx_object
+from common.xlsx import chart_data_to_download_xlsx_object
 
 card_graf_benchmark = dbc.Card(
     dbc.CardBody(
@@ -42,5 +42,5 @@ card_graf_benchmark = dbc.Card(
     State("benchmark-store-chart-data", "data"),
     prevent_initial_call=True,
 )
-def pf_download_excel(n_clicks, json_data):
-    return json_to_download_xlsx_object(json_data)
+def pf_download_excel(n_clicks, chart_data):
+    return chart_data_to_download_xlsx_object(chart_data)
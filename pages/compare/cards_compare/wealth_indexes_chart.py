@@ -3,7 +3,7 @@ import dash_daq as daq
 from dash import dcc, html, callback
 from dash.dependencies import Input, Output, State
 
-from common.xlsx import json_to_download_xlsx_object
+from common.xlsx import chart_data_to_download_xlsx_object
 
 card_graf_compare = dbc.Card(
     dbc.CardBody(
@@ -75,5 +75,5 @@ card_graf_compare = dbc.Card(
     State("al-store-chart-data", "data"),
     prevent_initial_call=True,
 )
-def pf_download_excel(n_clicks, json_data):
-    return json_to_download_xlsx_object(json_data)
+def pf_download_excel(n_clicks, chart_data):
+    return chart_data_to_download_xlsx_object(chart_data)
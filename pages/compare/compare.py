@@ -17,6 +17,7 @@ import okama as ok
 import common.settings as settings
 from common.object_cache import get_or_create, TTL_ASSET_LIST
 import common.update_style
+from common.chart_store import store_chart_data
 from common.chart_helpers import (
     add_inflation_trace,
     add_crisis_rectangles,
@@ -36,7 +37,7 @@ from common.url_portfolio import (
 import plotly.graph_objects as go
 
 from common.html_elements.submit_spinner import submit_spinner_running
-from common.mobile_screens import adopt_small_screens
+from common.mobile_screens import adopt_small_screens, register_screen_adaptation
 from pages.compare.cards_compare.asset_list_controls import card_controls
 from pages.compare.cards_compare.assets_info import card_assets_info
 from pages.compare.cards_compare.compare_description import card_compare_description
@@ -96,7 +97,7 @@ def layout(
     Output(component_id="al-describe-table", component_property="children"),
     Output(component_id="al-store-chart-data", component_property="data"),
     # user screen info
-    Input(component_id="store", component_property="data"),
+    State(component_id="store", component_property="data"),
     # main Inputs
     Input(component_id="al-submit-button", component_property="n_clicks"),
     # Logarithmic scale button
@@ -151,6 +152,9 @@ def update_graf_compare(
         return go.Figure(), {}, alert, None
 
 
+register_screen_adaptation("al-wealth-indexes")
+
+
 def _update_graf_compare_inner(
     screen, log_on, selected_symbols, ccy, fd_value, ld_value, plot_type, inflation_on, rolling_window, pf_def=None
 ):
@@ -183,7 +187,7 @@ def _update_graf_compare_inner(
     )
     log_scale = log_on if plot_type in ("wealth", "cumulative_return") else False
     fig, df_data = get_al_figure(al_object, plot_type, inflation_on, rolling_window, log_scale)
-    json_data = df_data.to_json(orient="split", default_handler=str)
+    chart_data = store_chart_data(df_data)
     if plot_type == "wealth":
         fig.update_yaxes(title_text="Wealth Index")
     elif plot_type == "cumulative_return":
@@ -221,7 +225,7 @@ def _update_graf_compare_inner(
     )
     # Asset List describe() risk-return statistics
     statistics_ag_grid = get_al_statistics_table(al_object)
-    return fig, config, statistics_ag_grid, json_data
+    return fig, config, statistics_ag_grid, chart_data
 
 
 def get_al_statistics_table(al_object):
@@ -39,11 +39,20 @@ card_ef_find_weights = dbc.Card(
                                     dbc.Row(
                                         [
                                             dbc.Col(
-                                                dbc.Input(
-                                                    id="ef-find-portfolio-input",
-                                                    placeholder="Rate of return (Format XX.XX)",
-                                                    type="number",
-                                                ),
+                                                [
+                                                    dbc.Input(
+                                                        id="ef-find-portfolio-input",
+                                                        placeholder="Rate of return (Format XX.XX)",
+                                                        type="number",
+                                                    ),
+                                                    # Off: the answer is interpolated along the frontier points.
+                                                    dbc.Switch(
+                                                        label="Exact optimization",
+                                                        value=False,
+                                                        id="ef-find-exact-switch",
+                                                        class_name="pt-2",
+                                                    ),
+                                                ],
                                                 lg=4,
                                                 md=4,
                                                 sm=12,
@@ -122,6 +131,7 @@ card_ef_find_weights = dbc.Card(
                 ]
             ),
             dcc.Store(id="ef_portfolio_file_name"),
+            dcc.Store(id="ef-find-portfolio-refine"),
         ]
     ),
     class_name="mb-3",
@@ -25,7 +25,7 @@ def build_portfolio_card(
 
     stats: (label, formatted value) pairs, e.g. ("CAGR", "30.40%").
     weights: per-asset weights in percent, aligned with symbols; None renders
-    the note instead of the allocation block.
+    the note instead of the allocation block, otherwise the note follows it.
     """
     header_children = [html.Span(title, className="pf-card-title")]
     if badge:
@@ -50,6 +50,8 @@ def build_portfolio_card(
         blocks.append(html.P(note, className="pf-note text-muted"))
     else:
         blocks.append(_build_allocation(symbols, weights))
+        if note:
+            blocks.append(html.P(note, className="pf-note text-muted"))
     return html.Div(blocks, className="pf-card")
 
 
@@ -1,4 +1,5 @@
 import inspect
+import logging
 
 import numpy as np
 import okama as ok
@@ -7,13 +8,19 @@ from common import cache, settings
 from common.object_cache import (
     TTL_EFFICIENT_FRONTIER,
     TTL_PORTFOLIO,
+    entry_version,
     get_okama_version,
     get_or_create,
     load_cached,
 )
 
 CACHE_TIMEOUT = 2592000
-DERIVED_CACHE_VERSION = f"ef-derived-v1-okv={get_okama_version()}"
+DERIVED_CACHE_VERSION = f"ef-derived-v2-okv={get_okama_version()}"
+EF_METADATA_VERSION = "ef-meta-v2"
+# Find targets are rounded to the card's precision (0.01%): nearby targets share one optimization.
+TARGET_DECIMALS = 4
+# A frontier point whose CAGR rounds to the target is the minimize_risk answer itself.
+FRONTIER_POINT_TOLERANCE = 0.5 * 10**-TARGET_DECIMALS
 
 # The Efficient Frontier is always computed without inflation (the page has no
 # inflation control). This is the single source for that setting: both the
@@ -65,6 +72,124 @@ def load_ef_object(file_name: str) -> ok.EfficientFrontier:
     return load_cached(file_name)
 
 
+def ef_rebalancing_period(ef_object) -> str | None:
+    """Rebalancing period the frontier was computed with, for backtest links.
+
+    Falls back to None (link omits rebal) for cached EF pickles created before
+    the rebalancing_strategy era or with an older okama lacking the kwarg.
+    """
+    strategy = getattr(ef_object, "rebalancing_strategy", None)
+    return getattr(strategy, "period", None)
+
+
+def ef_metadata(ef_object: ok.EfficientFrontier) -> dict:
+    """The fields of a frontier the click, find and CAGR range callbacks use.
+
+    Those callbacks only need the universe, the link parameters and the CAGR
+    range; the record spares them unpickling the whole EfficientFrontier.
+    """
+    ef_points = ef_object.ef_points
+    cagr_range = None
+    frontier = None
+    if "CAGR" in ef_points.columns:
+        cagr_range = [float(ef_points["CAGR"].min()), float(ef_points["CAGR"].max())]
+        frontier = _min_risk_frontier(ef_points, list(ef_object.symbols))
+    return {
+        "symbols": list(ef_object.symbols),
+        "currency": ef_object.currency,
+        "first_date": ef_object.first_date.strftime("%Y-%m"),
+        "last_date": ef_object.last_date.strftime("%Y-%m"),
+        "rebalancing_period": ef_rebalancing_period(ef_object),
+        "cagr_range": cagr_range,
+        "frontier": frontier,
+    }
+
+
+def _min_risk_frontier(ef_points, symbols: list[str]) -> dict[str, list[float]] | None:
+    """The minimize_risk points of ef_points, by increasing CAGR.
+
+    With full_frontier okama appends maximized-risk points after the global
+    max CAGR point; they are not what minimize_risk returns and are dropped.
+    """
+    if ef_points.empty:
+        return None
+    left_part = ef_points.iloc[: int(np.argmax(ef_points["CAGR"].to_numpy())) + 1].sort_values("CAGR")
+    columns = [column for column in ("Risk", "Mean return", "CAGR", *symbols) if column in left_part.columns]
+    return {column: left_part[column].astype(float).tolist() for column in columns}
+
+
+def nearest_frontier_point(metadata: dict, target_value: float) -> dict[str, float] | None:
+    """The frontier point within FRONTIER_POINT_TOLERANCE of the target CAGR, if any.
+
+    Frontier points are minimize_risk results, so such a point answers Find
+    exactly and no optimization is needed.
+    """
+    frontier = metadata.get("frontier")
+    if not frontier:
+        return None
+    cagr = np.asarray(frontier["CAGR"])
+    nearest = int(np.argmin(np.abs(cagr - target_value)))
+    if abs(cagr[nearest] - target_value) > FRONTIER_POINT_TOLERANCE:
+        return None
+    return {column: values[nearest] for column, values in frontier.items()}
+
+
+def interpolate_ef_portfolio(metadata: dict, target_value: float) -> dict[str, float] | None:
+    """minimize_risk(target_value) estimated from the frontier points of ``metadata``.
+
+    Risk, mean return and weights are interpolated linearly between the two
+    frontier points around the target, which is instant; the keys are those
+    of the minimize_risk result. None outside the frontier's CAGR range.
+    """
+    frontier = metadata.get("frontier")
+    if not frontier:
+        return None
+    cagr = np.asarray(frontier["CAGR"])
+    if not cagr[0] <= target_value <= cagr[-1]:
+        return None
+    return {
+        column: target_value if column == "CAGR" else float(np.interp(target_value, cagr, values))
+        for column, values in frontier.items()
+    }
+
+
+def _ef_metadata_key(file_name: str) -> str | None:
+    """Record key of the pickle now under ``file_name`` (None if it is gone).
+
+    Keyed like the MC results cache (pickle version included): a frontier
+    rebuilt under the same file name gets a new record.
+    """
+    try:
+        return f"{EF_METADATA_VERSION}:{file_name}:{entry_version(file_name)}"
+    except FileNotFoundError:
+        return None
+
+
+def store_ef_metadata(file_name: str, ef_object: ok.EfficientFrontier) -> dict:
+    """Write the ef_metadata record of the cached frontier ``file_name`` and return it."""
+    metadata = ef_metadata(ef_object)
+    key = _ef_metadata_key(file_name)
+    if key is None:
+        return metadata
+    try:
+        cache.set(key, metadata, timeout=CACHE_TIMEOUT)
+    except Exception:
+        logging.exception("EF metadata cache is unavailable")
+    return metadata
+
+
+def read_ef_metadata(file_name: str) -> dict | None:
+    """The ef_metadata record stored for ``file_name``; None if missing or the cache is down."""
+    key = _ef_metadata_key(file_name)
+    if key is None:
+        return None
+    try:
+        return cache.get(key)
+    except Exception:
+        logging.exception("EF metadata cache is unavailable")
+        return None
+
+
 def get_portfolio_point(
     symbols: list[str],
     weights_percent: list[float],
@@ -102,7 +227,7 @@ def get_portfolio_point(
             "first_date": first_date,
             "last_date": last_date,
             "rebal": rebalancing_period,
-            "purpose": "ef_point",
+            "inflation": EF_INFLATION,
         },
         ttl_seconds=TTL_PORTFOLIO,
     )
@@ -24,17 +24,33 @@ from pages.efficient_frontier.cards_efficient_frontier.ef_find_weights import ca
 from pages.efficient_frontier.cards_efficient_frontier.ef_portfolio_card import build_portfolio_card
 
 from common.html_elements.submit_spinner import submit_spinner_running
-from common.mobile_screens import adopt_small_screens, is_small_screen
-from pages.efficient_frontier.prepare_ef_plot import prepare_transition_map, prepare_ef, compact_ef_for_small_screens
+from common.job_queue import heavy_callback, report_progress
+from common.mobile_screens import adopt_small_screens, is_small_screen, register_screen_adaptation
+from pages.efficient_frontier.prepare_ef_plot import (
+    cloud_weights_handle,
+    compact_ef_for_small_screens,
+    lookup_cloud_weights,
+    prepare_ef,
+    prepare_transition_map,
+)
 from pages.efficient_frontier.ef_cache import (
+    TARGET_DECIMALS,
     get_minimized_risk_portfolio,
     get_or_create_ef_object,
     get_portfolio_point,
+    interpolate_ef_portfolio,
     load_ef_object,
+    nearest_frontier_point,
+    read_ef_metadata,
+    store_ef_metadata,
 )
 
 logger = logging.getLogger(__name__)
 
+# Find portfolio: notes on the interpolated card (while refine_found_portfolio runs, or without it).
+REFINING_NOTE = "Approximate: interpolated along the frontier, the exact optimization is running."
+APPROXIMATE_NOTE = "Approximate: interpolated between the two nearest frontier points."
+
 dash.register_page(
     __name__,
     path="/",
@@ -127,6 +143,7 @@ def layout(tickers=None, first_date=None, last_date=None, ccy=None, rebal=None,
                         ),
                         html.Div(id="ef-selected-portfolio"),
                         dcc.Store(id="ef-trace-names"),
+                        dcc.Store(id="ef-cloud-weights"),
                     ],
                     style={"display": "none"},
                     id="ef-portfolio-data-row",
@@ -173,15 +190,16 @@ def layout(tickers=None, first_date=None, last_date=None, ccy=None, rebal=None,
     return page
 
 
-@callback(
+@heavy_callback(
     Output(component_id="ef-graf", component_property="figure"),
     Output(component_id="ef-transition-map-graf", component_property="figure"),
     Output(component_id="ef-graf", component_property="config"),
     Output(component_id="ef-transition-map-graf", component_property="config"),
     Output(component_id="ef_portfolio_file_name", component_property="data"),  # save ef file name to session
     Output(component_id="ef-trace-names", component_property="data"),  # trace names for the click badge
+    Output(component_id="ef-cloud-weights", component_property="data"),  # MC / grid weights handles for clicks
     # Inputs
-    Input(component_id="store", component_property="data"),
+    State(component_id="store", component_property="data"),
     # Main input for EF
     Input(component_id="ef-submit-button-state", component_property="n_clicks"),
     State(component_id="ef-symbols-list", component_property="value"),
@@ -204,6 +222,7 @@ def layout(tickers=None, first_date=None, last_date=None, ccy=None, rebal=None,
     # Show the spinner under the Submit button while computing (the chart's
     # own dcc.Loading spinner is below the fold on mobile).
     running=submit_spinner_running("ef-submit-spinner"),
+    progress_spinner="ef-submit-spinner",
     prevent_initial_call=True,
 )
 def update_ef_cards(
@@ -229,6 +248,7 @@ def update_ef_cards(
     if not symbols:
         raise dash.exceptions.PreventUpdate
     try:
+        report_progress("Loading assets data...")
         ef_object, ef_file_name = get_or_create_ef_object(
             symbols=symbols,
             ccy=ccy,
@@ -236,6 +256,8 @@ def update_ef_cards(
             last_date=ld_value,
             rebalancing_period=rebalancing_period,
         )
+        # Click, Find and the CAGR range read this record instead of unpickling the frontier.
+        store_ef_metadata(ef_file_name, ef_object)
         grid_step = None
         effective_n_monte_carlo = 0
         if sim_mode == "Grid":
@@ -255,6 +277,7 @@ def update_ef_cards(
         ef_options["url_portfolio"] = _url_portfolio_point_payload(
             url_portfolio, symbols, ccy, fd_value, ld_value, rebalancing_period
         )
+        report_progress("Computing the efficient frontier...")
         ef = ef_object.ef_points * 100
 
         fig1 = prepare_ef(ef, ef_object, ef_options, ef_cache_key=ef_file_name)
@@ -265,21 +288,37 @@ def update_ef_cards(
         fig1, config1 = adopt_small_screens(fig1, screen)
         fig2, config2 = adopt_small_screens(fig2, screen)
         trace_names = [getattr(trace, "name", "") or "" for trace in fig1.data]
-        return fig1, fig2, config1, config2, ef_file_name, trace_names
+        cloud_weights = [cloud_weights_handle(trace) for trace in fig1.data]
+        return fig1, fig2, config1, config2, ef_file_name, trace_names, cloud_weights
     except Exception as e:
         alert_fig = go.Figure()
         alert_fig.add_annotation(text=str(e), showarrow=False, font={"color": "red", "size": 14})
-        return alert_fig, go.Figure(), {}, {}, None, []
+        return alert_fig, go.Figure(), {}, {}, None, [], []
 
 
-def _ef_rebalancing_period(ef_object) -> str | None:
-    """Rebalancing period the frontier was computed with, for backtest links.
+register_screen_adaptation("ef-graf")
+register_screen_adaptation("ef-transition-map-graf")
 
-    Falls back to None (link omits rebal) for cached EF pickles created before
-    the rebalancing_strategy era or with an older okama lacking the kwarg.
-    """
-    strategy = getattr(ef_object, "rebalancing_strategy", None)
-    return getattr(strategy, "period", None)
+
+def _load_ef_metadata(file_name: str) -> dict:
+    """ef_metadata of the cached frontier: the record written at Submit, else read from the pickle."""
+    metadata = read_ef_metadata(file_name)
+    if metadata is None:
+        metadata = store_ef_metadata(file_name, load_ef_object(file_name))
+    return metadata
+
+
+def _portfolio_link(metadata: dict, weights_percent: list[float]) -> str:
+    """Backtest link for a portfolio of the frontier described by ``metadata``."""
+    return common.create_link.create_link(
+        href="/portfolio/",
+        tickers_list=metadata["symbols"],
+        ccy=metadata["currency"],
+        first_date=metadata["first_date"],
+        last_date=metadata["last_date"],
+        weights_list=common.math.round_list(weights_percent, 2),
+        rebal=metadata["rebalancing_period"],
+    )
 
 
 @callback(
@@ -292,8 +331,9 @@ def _ef_rebalancing_period(ef_object) -> str | None:
     State(component_id="ef_portfolio_file_name", component_property="data"),
     State(component_id="risk-free-rate-option", component_property="value"),
     State(component_id="ef-trace-names", component_property="data"),
+    State(component_id="ef-cloud-weights", component_property="data"),
 )
-def display_click_data(clickData, n_click, symbols, file_name, rf_rate, trace_names):
+def display_click_data(clickData, n_click, symbols, file_name, rf_rate, trace_names, cloud_weights=None):
     """
     Render the Selected portfolio card for the clicked chart point.
     """
@@ -312,6 +352,8 @@ def display_click_data(clickData, n_click, symbols, file_name, rf_rate, trace_na
     badge = _trace_badge(point_data, trace_names)
 
     weights_list = point_data.get("customdata")
+    if weights_list is None:
+        weights_list = _cloud_point_weights(point_data, cloud_weights)
     if weights_list is None or len(weights_list) != len(symbols):
         card = build_portfolio_card(
             stats=stats,
@@ -323,17 +365,7 @@ def display_click_data(clickData, n_click, symbols, file_name, rf_rate, trace_na
         return card, None
 
     card = build_portfolio_card(stats=stats, symbols=symbols, weights=weights_list, badge=badge)
-    weights_for_link = common.math.round_list(weights_list, 2)
-    ef_object = load_ef_object(file_name)
-    link = common.create_link.create_link(
-        href="/portfolio/",
-        tickers_list=ef_object.symbols,
-        ccy=ef_object.currency,
-        first_date=ef_object.first_date.strftime("%Y-%m"),
-        last_date=ef_object.last_date.strftime("%Y-%m"),
-        weights_list=weights_for_link,
-        rebal=_ef_rebalancing_period(ef_object),
-    )
+    link = _portfolio_link(_load_ef_metadata(file_name), weights_list)
     return card, link
 
 
@@ -355,6 +387,18 @@ def _point_stats(ror: float, risk: float, rf_rate: float | None) -> list[tuple[s
     return stats
 
 
+def _cloud_point_weights(point_data: dict, cloud_weights: list | None) -> list[float] | None:
+    """Weights of a clicked Monte Carlo / grid point, looked up server-side.
+
+    Point clouds carry no customdata (see _add_point_cloud_trace): the clicked
+    curve number selects the cloud's weights handle and the point number its row.
+    """
+    curve_number = point_data.get("curveNumber")
+    if not cloud_weights or curve_number is None or not 0 <= curve_number < len(cloud_weights):
+        return None
+    return lookup_cloud_weights(cloud_weights[curve_number], point_data.get("pointNumber"))
+
+
 def _trace_badge(point_data: dict, trace_names: list | None) -> str | None:
     """Trace name for the badge, resolved from the clicked curve number."""
     curve_number = point_data.get("curveNumber")
@@ -403,57 +447,94 @@ def show_transition_map_row(n_clicks, style, tr_map_option):
 @callback(
     Output("ef-find-portfolio-output", "children"),
     Output("ef-backtest-optimized-potfolio-button", "href"),
+    Output("ef-find-portfolio-refine", "data"),
     # Target return & ef file name
     Input(component_id="ef-find-portfolio-button", component_property="n_clicks"),
     State(component_id="ef-find-portfolio-input", component_property="value"),
     State(component_id="ef_portfolio_file_name", component_property="data"),
     State(component_id="risk-free-rate-option", component_property="value"),
+    State(component_id="ef-find-exact-switch", component_property="value"),
 )
-def find_portfolio(n_clicks, ror, file_name, rf_rate):
+def find_portfolio(n_clicks, ror, file_name, rf_rate, refine_exact=False):
     """
-    Find optimized portfolio weights by rate of return and render the card.
+    Render the portfolio for the target rate of return at once from the cached
+    frontier points.
+
+    A frontier point at the target is the exact answer. Otherwise the weights
+    are interpolated, and the exact optimization is requested only with the
+    "Exact optimization" switch on, or when the target is outside the points.
     """
     if n_clicks == 0 or file_name is None:
         raise dash.exceptions.PreventUpdate
-    ef_object = load_ef_object(file_name)
-    no_solution = html.P("No solution was found.", className="text-muted")
+    metadata = _load_ef_metadata(file_name)
+    target_value = round(ror / 100.0, TARGET_DECIMALS)
+    frontier_point = nearest_frontier_point(metadata, target_value)
+    if frontier_point is not None:
+        card, link = _optimized_portfolio_output(frontier_point, metadata, rf_rate)
+        return card, link, None
+    refine = {"file_name": file_name, "target": target_value}
+    approximate_portfolio = interpolate_ef_portfolio(metadata, target_value)
+    if approximate_portfolio is None:
+        # Outside the interpolated range only the optimizer can tell.
+        return html.P("Optimizing...", className="text-muted"), None, refine
+    if not refine_exact:
+        card, link = _optimized_portfolio_output(approximate_portfolio, metadata, rf_rate, note=APPROXIMATE_NOTE)
+        return card, link, None
+    card, link = _optimized_portfolio_output(approximate_portfolio, metadata, rf_rate, note=REFINING_NOTE)
+    return card, link, refine
+
+
+@heavy_callback(
+    Output("ef-find-portfolio-output", "children", allow_duplicate=True),
+    Output("ef-backtest-optimized-potfolio-button", "href", allow_duplicate=True),
+    Input(component_id="ef-find-portfolio-refine", component_property="data"),
+    State(component_id="risk-free-rate-option", component_property="value"),
+    prevent_initial_call=True,
+)
+def refine_found_portfolio(refine, rf_rate):
+    """
+    Replace the interpolated Find answer with the exact minimize_risk optimization.
+    """
+    if not refine:
+        raise dash.exceptions.PreventUpdate
+    metadata = _load_ef_metadata(refine["file_name"])
     try:
-        target_value = ror / 100.0
-        optimized_portfolio = get_minimized_risk_portfolio(file_name, target_value)
+        optimized_portfolio = get_minimized_risk_portfolio(refine["file_name"], refine["target"])
+    except (RecursionError, RuntimeError):
+        # okama raises RuntimeError when no portfolio reaches the target CAGR
+        return _no_solution(), None
+    return _optimized_portfolio_output(optimized_portfolio, metadata, rf_rate)
 
-        mean_return = optimized_portfolio.get("Mean return")
-        cagr = optimized_portfolio.get("CAGR")
-        risk = optimized_portfolio.get("Risk")
 
-        asset_weights = {
-            ticker: optimized_portfolio[ticker] for ticker in ef_object.symbols if ticker in optimized_portfolio
-        }
-        if not asset_weights and "Weights" in optimized_portfolio:
-            asset_weights = dict(zip(ef_object.symbols, optimized_portfolio["Weights"], strict=True))
-        if not asset_weights:
-            return no_solution, None
+def _no_solution() -> html.P:
+    return html.P("No solution was found.", className="text-muted")
 
-        weights_percent = [w * 100 for w in asset_weights.values()]
-        card = build_portfolio_card(
-            stats=_optimized_stats(mean_return, cagr, risk, rf_rate),
-            symbols=list(asset_weights),
-            weights=weights_percent,
-            title="Optimized portfolio",
-        )
-        weights_for_link = common.math.round_list(weights_percent, 2)
-        link = common.create_link.create_link(
-            href="/portfolio/",
-            tickers_list=ef_object.symbols,
-            ccy=ef_object.currency,
-            first_date=ef_object.first_date.strftime("%Y-%m"),
-            last_date=ef_object.last_date.strftime("%Y-%m"),
-            weights_list=weights_for_link,
-            rebal=_ef_rebalancing_period(ef_object),
-        )
-        return card, link
-    except (RecursionError, RuntimeError):
-        # okama raises RuntimeError when no portfolio reaches the target CAGR
-        return no_solution, None
+
+def _optimized_portfolio_output(
+    optimized_portfolio: dict, metadata: dict, rf_rate: float | None, note: str | None = None
+) -> tuple:
+    """Card and backtest link for a minimize_risk result (exact or interpolated)."""
+    mean_return = optimized_portfolio.get("Mean return")
+    cagr = optimized_portfolio.get("CAGR")
+    risk = optimized_portfolio.get("Risk")
+
+    asset_weights = {
+        ticker: optimized_portfolio[ticker] for ticker in metadata["symbols"] if ticker in optimized_portfolio
+    }
+    if not asset_weights and "Weights" in optimized_portfolio:
+        asset_weights = dict(zip(metadata["symbols"], optimized_portfolio["Weights"], strict=True))
+    if not asset_weights:
+        return _no_solution(), None
+
+    weights_percent = [w * 100 for w in asset_weights.values()]
+    card = build_portfolio_card(
+        stats=_optimized_stats(mean_return, cagr, risk, rf_rate),
+        symbols=list(asset_weights),
+        weights=weights_percent,
+        title="Optimized portfolio",
+        note=note,
+    )
+    return card, _portfolio_link(metadata, weights_percent)
 
 
 def _optimized_stats(
@@ -487,10 +568,8 @@ def show_max_min_return(n_clicks, file_name):
     """
     if n_clicks == 0 or file_name is None:
         raise dash.exceptions.PreventUpdate
-    ef_object = load_ef_object(file_name)
-    ef_points = ef_object.ef_points
-    if "CAGR" not in ef_points.columns:
+    cagr_range = _load_ef_metadata(file_name)["cagr_range"]
+    if cagr_range is None:
         raise dash.exceptions.PreventUpdate
-    min_ror = ef_points["CAGR"].min()
-    max_ror = ef_points["CAGR"].max()
+    min_ror, max_ror = cagr_range
     return f"Portfolios CAGR range: {min_ror * 100:.2f} - {max_ror * 100:.2f}%"
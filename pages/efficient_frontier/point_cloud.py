@@ -0,0 +1,110 @@
+"""Vectorized Risk/CAGR of the EF Monte Carlo and grid portfolio clouds.
+
+okama's ``get_monte_carlo`` and ``get_grid_portfolios`` build the rebalanced
+return series of every weight vector one at a time (``Rebalance.return_ror_ts_ef``).
+That series is linear in the weights within a rebalancing period: with
+``G`` the growth of each asset since the start of its period, the portfolio
+grows by ``G @ w`` inside the period and is rebalanced to ``w`` at the next
+one. ``G`` is computed once per universe; a batch of weight vectors is then
+scored with one matrix product, and the period-end values chain the periods
+together exactly as okama does. Risk and CAGR are the same statistics okama
+takes from the series (annualized monthly std, compounded CAGR), not an
+approximation, so the results match okama to floating point.
+
+Unbounded random weights are drawn as okama draws them (one uniform matrix,
+normalized by row) without its per-row Series; bounded and grid weights come
+from okama's generators. The frames have okama's layout: Risk, CAGR and one
+weight column per symbol.
+
+Threshold rebalancing (``abs_deviation``/``rel_deviation``) makes the
+rebalancing dates depend on the weights, which breaks the linearity above, so
+such strategies are rejected rather than scored as calendar rebalancing.
+"""
+
+import numpy as np
+import okama as ok
+import pandas as pd
+from okama import settings as okama_settings
+from okama.common.helpers import helpers
+
+MONTHS_PER_YEAR = 12
+# Month x portfolio cells scored per matrix product (bounds the temporary arrays).
+_MAX_CELLS = 2**22
+
+
+class _RebalancedGrowth:
+    """Within-period asset growth of a universe, the part shared by every weight vector."""
+
+    def __init__(self, assets_ror: pd.DataFrame, period: str):
+        growth_factors = 1.0 + assets_ror
+        if period == "none":
+            # Never rebalanced: one period spanning the whole history.
+            period_ids = np.zeros(len(assets_ror), dtype=int)
+        else:
+            grouper = pd.Grouper(freq=okama_settings.grouper_frequency_mapping[period], convention="start")
+            period_ids = assets_ror.groupby(grouper).ngroup().to_numpy()
+        self.growth = growth_factors.groupby(period_ids).cumprod().to_numpy(dtype=float)
+        self.period_ids = period_ids
+        # Row of the last month of each period (ids are 0..n-1 in chronological order).
+        self.period_ends = np.flatnonzero(np.r_[period_ids[1:] != period_ids[:-1], True])
+
+    def risk_cagr(self, weights: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Annualized risk and CAGR of each row of ``weights`` (portfolios x assets)."""
+        n_months = self.growth.shape[0]
+        chunk = max(1, _MAX_CELLS // n_months)
+        risk = np.empty(len(weights))
+        cagr = np.empty(len(weights))
+        for start in range(0, len(weights), chunk):
+            batch = weights[start : start + chunk]
+            within_period = self.growth @ batch.T  # months x portfolios
+            period_growth = within_period[self.period_ends]
+            multipliers = np.vstack([np.ones((1, len(batch))), np.cumprod(period_growth, axis=0)[:-1]])
+            wealth = multipliers[self.period_ids] * within_period
+            # Monthly returns and their std, in place: these months x portfolios arrays dominate the cost.
+            ror = np.empty_like(wealth)
+            ror[0] = wealth[0]
+            np.divide(wealth[1:], wealth[:-1], out=ror[1:])
+            ror -= 1.0
+            mean_return = ror.mean(axis=0)
+            ror -= mean_return
+            risk_monthly = np.sqrt(np.einsum("ij,ij->j", ror, ror) / (n_months - 1))
+            risk[start : start + chunk] = helpers.Float.annualize_risk(risk_monthly, mean_return)
+            cagr[start : start + chunk] = wealth[-1] ** (MONTHS_PER_YEAR / n_months) - 1.0
+        if n_months < MONTHS_PER_YEAR:
+            cagr[:] = np.nan  # okama's Frame.get_cagr: undefined below a year
+        return risk, cagr
+
+
+def score_portfolios(ef_object: ok.EfficientFrontier, weights: np.ndarray) -> pd.DataFrame:
+    """Risk, CAGR and weights of the rebalanced portfolios of ``ef_object`` given by the rows of ``weights``."""
+    strategy = ef_object.rebalancing_strategy
+    if strategy.abs_deviation is not None or strategy.rel_deviation is not None:
+        raise ValueError("Point clouds support calendar rebalancing only, not abs_deviation/rel_deviation bands")
+    assets_ror = ef_object.assets_ror
+    weights = np.asarray(weights, dtype=float).reshape(-1, assets_ror.shape[1])
+    growth = _RebalancedGrowth(assets_ror, strategy.period)
+    risk, cagr = growth.risk_cagr(weights)
+    points = pd.DataFrame(weights, columns=list(assets_ror.columns))
+    points.insert(0, "CAGR", cagr)
+    points.insert(0, "Risk", risk)
+    return points
+
+
+def get_monte_carlo(ef_object: ok.EfficientFrontier, n: int) -> pd.DataFrame:
+    """``ef_object.get_monte_carlo(n)``, vectorized."""
+    n_assets = ef_object.assets_ror.shape[1]
+    if ef_object.bounds is None:
+        # helpers.Float.get_random_weights without the bounds: same draw, no Series of rows.
+        random_numbers = np.random.rand(n, n_assets)
+        weights = random_numbers / random_numbers.sum(axis=1, keepdims=True)
+    else:
+        weights = list(helpers.Float.get_random_weights(n, n_assets, ef_object.bounds))
+    return score_portfolios(ef_object, weights)
+
+
+def get_grid_portfolios(ef_object: ok.EfficientFrontier, step: float, max_points: int) -> pd.DataFrame:
+    """``ef_object.get_grid_portfolios(step, max_points)``, vectorized."""
+    weights = helpers.Float.get_grid_weights(
+        w_shape=ef_object.assets_ror.shape[1], step=step, bounds=ef_object.bounds, max_points=max_points
+    )
+    return score_portfolios(ef_object, list(weights))
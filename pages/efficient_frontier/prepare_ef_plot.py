@@ -1,6 +1,16 @@
+import hashlib
 import inspect
 import itertools
-
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Iterator
+
+import dash
 import numpy as np
 import okama
 import pandas as pd
@@ -9,10 +19,19 @@ from plotly import graph_objects as go
 import plotly.express as px
 
 from common import cache
-from common.object_cache import load_cached as load_ef_object
+from common.object_cache import get_okama_version, load_cached as load_ef_object
+from common.series_store import install_series_store
 from common.settings import GRID_POINT_BUDGET
+from pages.efficient_frontier import point_cloud
 from pages.efficient_frontier.ef_cache import CACHE_TIMEOUT, DERIVED_CACHE_VERSION
 
+# Pair frontiers do not depend on the rest of the universe: a cache entry per pair.
+PAIR_CACHE_VERSION = f"ef-pair-v1-okv={get_okama_version()}"
+_PAIR_WORKERS_ENV = "OKAMA_EF_PAIR_WORKERS"
+# Point cloud weights are cached apart from the cloud data, this many rows per
+# entry, so a click reads one small entry instead of the whole cloud.
+CLOUD_WEIGHTS_CHUNK = 1000
+
 
 def _normalize_plot_types(plot_type) -> list[str]:
     if plot_type is None:
@@ -78,28 +97,7 @@ def _get_cached_return_values(payload: dict, return_type: str) -> list[float]:
 @cache.memoize(timeout=CACHE_TIMEOUT)
 def _get_pairwise_frontier_data_cached(cache_version: str, ef_cache_key: str) -> list[dict]:
     del cache_version
-    ef_object = load_ef_object(ef_cache_key)
-    pairwise_frontiers = []
-    for pair_assets in itertools.combinations(ef_object.asset_obj_dict.values(), 2):
-        pair_symbols = [asset.symbol for asset in pair_assets]
-        pair_ef_object = _make_pairwise_ef_object(
-            ef_object=ef_object,
-            pair_assets=list(pair_assets),
-        )
-        pair_ef = pair_ef_object.ef_points * 100
-        pair_asset_columns = _get_asset_columns(pair_ef, pair_ef_object)
-        pair_weights = pair_ef[pair_asset_columns].to_numpy()
-        weights_array = _expand_weights_to_full_universe(pair_weights, pair_asset_columns, ef_object.symbols)
-        pairwise_frontiers.append(
-            {
-                "name": " / ".join(pair_symbols),
-                "risk": pair_ef["Risk"].tolist(),
-                "mean_return": _get_column_values(pair_ef, ("Mean return", "Return", "CAGR")),
-                "cagr": _get_column_values(pair_ef, ("CAGR", "Return", "Mean return")),
-                "weights": weights_array.tolist(),
-            }
-        )
-    return pairwise_frontiers
+    return _build_pairwise_frontiers(load_ef_object(ef_cache_key))
 
 
 def _get_pairwise_frontier_data(ef_cache_key: str) -> list[dict]:
@@ -172,16 +170,18 @@ def _get_monte_carlo_data_cached(
     n_monte_carlo: int,
     return_type: str,
 ) -> dict:
-    del cache_version
     ef_object = load_ef_object(ef_cache_key)
-    df = ef_object.get_monte_carlo(n=n_monte_carlo) * 100
+    df = point_cloud.get_monte_carlo(ef_object, n=n_monte_carlo) * 100
     mc_asset_columns = _get_asset_columns(df, ef_object)
-    weights_array = df[mc_asset_columns].to_numpy() if mc_asset_columns else None
+    weights_key = None
+    if mc_asset_columns:
+        weights_key = _cloud_weights_key("mc", cache_version, ef_cache_key, n_monte_carlo, return_type)
+        _store_cloud_weights(weights_key, df[mc_asset_columns].to_numpy())
     return {
         "risk": df["Risk"].tolist(),
         "mean_return": _get_column_values(df, ("Mean return", "Return", "CAGR")),
         "cagr": _get_column_values(df, ("CAGR", "Return", "Mean return")),
-        "weights": weights_array.tolist() if weights_array is not None else None,
+        "weights_key": weights_key,
     }
 
 
@@ -201,16 +201,18 @@ def _get_grid_portfolios_data_cached(
     step: float,
     return_type: str,
 ) -> dict:
-    del cache_version
     ef_object = load_ef_object(ef_cache_key)
-    df = ef_object.get_grid_portfolios(step=step, max_points=GRID_POINT_BUDGET) * 100
+    df = point_cloud.get_grid_portfolios(ef_object, step=step, max_points=GRID_POINT_BUDGET) * 100
     grid_asset_columns = _get_asset_columns(df, ef_object)
-    weights_array = df[grid_asset_columns].to_numpy() if grid_asset_columns else None
+    weights_key = None
+    if grid_asset_columns:
+        weights_key = _cloud_weights_key("grid", cache_version, ef_cache_key, step, return_type)
+        _store_cloud_weights(weights_key, df[grid_asset_columns].to_numpy())
     return {
         "risk": df["Risk"].tolist(),
         "mean_return": _get_column_values(df, ("Mean return", "Return", "CAGR")),
         "cagr": _get_column_values(df, ("CAGR", "Return", "Mean return")),
-        "weights": weights_array.tolist() if weights_array is not None else None,
+        "weights_key": weights_key,
     }
 
 
@@ -218,6 +220,72 @@ def _get_grid_portfolios_data(ef_cache_key: str, step: float, return_type: str)
     return _get_grid_portfolios_data_cached(DERIVED_CACHE_VERSION, ef_cache_key, step, return_type)
 
 
+def _cloud_weights_key(*params) -> str:
+    return "ef-cloud-weights:" + hashlib.sha256(repr(params).encode()).hexdigest()
+
+
+def _store_cloud_weights(weights_key: str, weights: np.ndarray) -> None:
+    """Cache the weight rows of a point cloud in CLOUD_WEIGHTS_CHUNK-row entries."""
+    chunks = {
+        f"{weights_key}:{number}": weights[start : start + CLOUD_WEIGHTS_CHUNK].copy()
+        for number, start in enumerate(range(0, len(weights), CLOUD_WEIGHTS_CHUNK))
+    }
+    try:
+        cache.set_many(chunks, timeout=CACHE_TIMEOUT)
+    except Exception:
+        logging.exception("Point cloud cache is unavailable")
+
+
+def _add_point_cloud_trace(fig: go.Figure, x, y, weights_source: dict | None, hovertemplate: str, name: str) -> None:
+    """Monte Carlo / grid cloud: one WebGL trace, weights kept server-side.
+
+    A cloud can hold up to MC_EF_MAX points. SVG markers with per-point weights
+    in customdata make the figure megabytes of JSON and stall the browser, so
+    the points go to Scattergl as typed arrays and the weights stay in the
+    cache (_store_cloud_weights); the trace meta carries their key
+    (weights_source) and display_click_data resolves the clicked point with
+    lookup_cloud_weights.
+    """
+    fig.add_trace(
+        go.Scattergl(
+            x=np.asarray(x, dtype=float),
+            y=np.asarray(y, dtype=float),
+            hovertemplate=hovertemplate,
+            mode="markers",
+            marker={"size": 4},
+            name=name,
+            meta={"weights": weights_source} if weights_source is not None else None,
+        )
+    )
+
+
+def cloud_weights_handle(trace) -> dict | None:
+    """Weights source of a point cloud trace (None for other traces)."""
+    meta = getattr(trace, "meta", None)
+    return meta.get("weights") if isinstance(meta, dict) else None
+
+
+def lookup_cloud_weights(handle: dict | None, point_number: int | None) -> list[float] | None:
+    """Weights of point ``point_number`` of a point cloud; None if unknown or expired.
+
+    Reads only the cached chunk holding the point, never recomputing it on a
+    miss: a new Monte Carlo draw would not be the portfolio that was clicked.
+    A handle from a page rendered before a deploy may not match this format.
+    """
+    weights_key = handle.get("key") if isinstance(handle, dict) else None
+    if not isinstance(weights_key, str) or not isinstance(point_number, int) or point_number < 0:
+        return None
+    chunk_number, row = divmod(point_number, CLOUD_WEIGHTS_CHUNK)
+    try:
+        chunk = cache.get(f"{weights_key}:{chunk_number}")
+    except Exception:
+        logging.exception("Point cloud cache is unavailable")
+        return None
+    if chunk is None or row >= len(chunk):
+        return None
+    return chunk[row].tolist()
+
+
 def _add_monte_carlo_trace(
     fig: go.Figure,
     ef_object: okama.EfficientFrontier,
@@ -226,28 +294,20 @@ def _add_monte_carlo_trace(
     hovertemplate: str,
     ef_cache_key: str | None,
 ) -> None:
+    weights_source = None
     if ef_cache_key:
         mc_data = _get_monte_carlo_data(ef_cache_key, ef_options["n_monte_carlo"], return_type)
         mc_x = mc_data["risk"]
         mc_y = _get_cached_return_values(mc_data, return_type)
-        weights_array = mc_data["weights"]
+        if mc_data["weights_key"] is not None:
+            weights_source = {"key": mc_data["weights_key"]}
     else:
-        df = ef_object.get_monte_carlo(n=ef_options["n_monte_carlo"]) * 100
+        # Uncached frontier: nothing to look the weights up in later.
+        df = point_cloud.get_monte_carlo(ef_object, n=ef_options["n_monte_carlo"]) * 100
         mc_y_column = _resolve_return_column(df, return_type)
-        mc_asset_columns = _get_asset_columns(df, ef_object)
-        weights_array = df[mc_asset_columns].to_numpy().tolist() if mc_asset_columns else None
-        mc_x = df["Risk"].tolist()
-        mc_y = df[mc_y_column].tolist()
-    fig.add_trace(
-        go.Scatter(
-            x=mc_x,
-            y=mc_y,
-            customdata=weights_array,
-            hovertemplate=hovertemplate,
-            mode="markers",
-            name="Monte-Carlo Simulation",
-        )
-    )
+        mc_x = df["Risk"].to_numpy()
+        mc_y = df[mc_y_column].to_numpy()
+    _add_point_cloud_trace(fig, mc_x, mc_y, weights_source, hovertemplate, name="Monte-Carlo Simulation")
 
 
 def _add_grid_portfolios_trace(
@@ -258,28 +318,21 @@ def _add_grid_portfolios_trace(
     hovertemplate: str,
     ef_cache_key: str | None,
 ) -> None:
+    weights_source = None
     if ef_cache_key:
         grid_data = _get_grid_portfolios_data(ef_cache_key, ef_options["grid_step"], return_type)
         grid_x = grid_data["risk"]
         grid_y = _get_cached_return_values(grid_data, return_type)
-        weights_array = grid_data["weights"]
+        if grid_data["weights_key"] is not None:
+            weights_source = {"key": grid_data["weights_key"]}
     else:
-        df = ef_object.get_grid_portfolios(step=ef_options["grid_step"], max_points=GRID_POINT_BUDGET) * 100
-        grid_y_column = _resolve_return_column(df, return_type)
-        grid_asset_columns = _get_asset_columns(df, ef_object)
-        weights_array = df[grid_asset_columns].to_numpy().tolist() if grid_asset_columns else None
-        grid_x = df["Risk"].tolist()
-        grid_y = df[grid_y_column].tolist()
-    fig.add_trace(
-        go.Scatter(
-            x=grid_x,
-            y=grid_y,
-            customdata=weights_array,
-            hovertemplate=hovertemplate,
-            mode="markers",
-            name="Grid portfolios",
+        df = (
+            point_cloud.get_grid_portfolios(ef_object, step=ef_options["grid_step"], max_points=GRID_POINT_BUDGET) * 100
         )
-    )
+        grid_y_column = _resolve_return_column(df, return_type)
+        grid_x = df["Risk"].to_numpy()
+        grid_y = df[grid_y_column].to_numpy()
+    _add_point_cloud_trace(fig, grid_x, grid_y, weights_source, hovertemplate, name="Grid portfolios")
 
 
 def _to_string_list(text) -> list[str]:
@@ -319,9 +372,9 @@ def _collect_x_values(fig: go.Figure) -> list[float]:
         trace_x = getattr(trace, "x", None)
         if trace_x is None:
             continue
-        for value in np.asarray(trace_x, dtype=object).ravel():
-            if pd.notna(value):
-                x_values.append(float(value))
+        # Vectorized: a point cloud trace holds up to MC_EF_MAX values.
+        values = pd.to_numeric(np.asarray(trace_x, dtype=object).ravel()).astype(float)
+        x_values.extend(values[~np.isnan(values)].tolist())
     return x_values
 
 
@@ -371,9 +424,9 @@ def _update_xaxis_range_for_labels(fig: go.Figure, compact: bool = False) -> go.
         trace_x = getattr(trace, "x", None)
         if trace_x is None:
             continue
-        for value in np.asarray(trace_x, dtype=object).ravel():
-            if pd.notna(value):
-                x_values.append(float(value))
+        # Vectorized: a point cloud trace holds up to MC_EF_MAX values.
+        values = pd.to_numeric(np.asarray(trace_x, dtype=object).ravel()).astype(float)
+        x_values.extend(values[~np.isnan(values)].tolist())
 
     if not x_values:
         return fig
@@ -461,10 +514,8 @@ def _expand_weights_to_full_universe(
     return expanded_weights
 
 
-def _make_pairwise_ef_object(
-    ef_object: okama.EfficientFrontier,
-    pair_assets: list,
-) -> okama.EfficientFrontier:
+def _pair_ef_kwargs(ef_object: okama.EfficientFrontier) -> dict:
+    """EfficientFrontier settings of the universe, shared by each of its pair frontiers."""
     ef_kwargs = {
         "ccy": ef_object.currency,
         "first_date": ef_object.first_date,
@@ -476,7 +527,115 @@ def _make_pairwise_ef_object(
     ef_signature = inspect.signature(okama.EfficientFrontier)
     if "rebalancing_strategy" in ef_signature.parameters and hasattr(ef_object, "rebalancing_strategy"):
         ef_kwargs["rebalancing_strategy"] = ef_object.rebalancing_strategy
-    return okama.EfficientFrontier(assets=pair_assets, **ef_kwargs)
+    return ef_kwargs
+
+
+def _pair_cache_key(pair_symbols: list[str], ef_kwargs: dict) -> str:
+    strategy = ef_kwargs.get("rebalancing_strategy")
+    rebalancing = None if strategy is None else (strategy.period, strategy.abs_deviation, strategy.rel_deviation)
+    params = (
+        PAIR_CACHE_VERSION,
+        tuple(sorted(pair_symbols)),
+        ef_kwargs["ccy"],
+        str(ef_kwargs["first_date"]),
+        str(ef_kwargs["last_date"]),
+        ef_kwargs["inflation"],
+        ef_kwargs["n_points"],
+        repr(rebalancing),
+    )
+    return "ef-pair:" + hashlib.sha256(repr(params).encode()).hexdigest()
+
+
+def _compute_pair_frontier(pair_assets: list, ef_kwargs: dict) -> dict:
+    """Frontier of one pair of assets, weights in the pair's own column order (pool task)."""
+    pair_ef_object = okama.EfficientFrontier(assets=pair_assets, **ef_kwargs)
+    pair_ef = pair_ef_object.ef_points * 100
+    pair_asset_columns = _get_asset_columns(pair_ef, pair_ef_object)
+    return {
+        "columns": pair_asset_columns,
+        "risk": pair_ef["Risk"].tolist(),
+        "mean_return": _get_column_values(pair_ef, ("Mean return", "Return", "CAGR")),
+        "cagr": _get_column_values(pair_ef, ("CAGR", "Return", "Mean return")),
+        "weights": pair_ef[pair_asset_columns].to_numpy().tolist(),
+    }
+
+
+def _app_is_main() -> bool:
+    """Whether the Dash app is the __main__ module (``python app.py``), which spawn children re-run."""
+    return isinstance(getattr(sys.modules["__main__"], "app", None), dash.Dash)
+
+
+@contextmanager
+def _pair_executor(n_pairs: int) -> Iterator[ProcessPoolExecutor | None]:
+    """Process pool for one batch of pair frontiers, shut down once the batch is done.
+
+    None computes them in the request thread: the default, as spawning the pool
+    costs a few interpreter starts per request. OKAMA_EF_PAIR_WORKERS of 2 or more
+    opts in, except under the dev server, where every child would build the app.
+    """
+    workers = min(int(os.environ.get(_PAIR_WORKERS_ENV, 1)), n_pairs)
+    if workers < 2 or os.environ.get("TESTING") == "1" or _app_is_main():
+        yield None
+        return
+    # spawn: the web worker runs threads (object-cache refresh, sweeper), unsafe to fork.
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn"), initializer=install_series_store
+    ) as executor:
+        yield executor
+
+
+def _compute_pair_frontiers(pairs: list[list], ef_kwargs: dict) -> list[dict]:
+    with _pair_executor(len(pairs)) as executor:
+        if executor is not None:
+            try:
+                return list(executor.map(_compute_pair_frontier, pairs, itertools.repeat(ef_kwargs)))
+            except BrokenProcessPool:
+                logging.exception("Pair frontier pool is broken, computing in place")
+    return [_compute_pair_frontier(pair_assets, ef_kwargs) for pair_assets in pairs]
+
+
+def _get_cached_pair_frontiers(keys: list[str]) -> list[dict | None]:
+    try:
+        return list(cache.get_many(*keys))
+    except Exception:
+        logging.exception("Pair frontier cache is unavailable")
+        return [None] * len(keys)
+
+
+def _build_pairwise_frontiers(ef_object: okama.EfficientFrontier) -> list[dict]:
+    """Pairwise plot data: the two-asset frontier of every pair of the universe.
+
+    Each pair frontier is cached on its own (pair symbols, currency, dates,
+    rebalancing, number of points), so universes sharing a pair reuse it.
+    The missing pairs are optimized in the request thread, or in parallel in a
+    per-request process pool of OKAMA_EF_PAIR_WORKERS processes when set.
+    """
+    ef_kwargs = _pair_ef_kwargs(ef_object)
+    pairs = [list(pair_assets) for pair_assets in itertools.combinations(ef_object.asset_obj_dict.values(), 2)]
+    pair_symbols = [[asset.symbol for asset in pair_assets] for pair_assets in pairs]
+    keys = [_pair_cache_key(symbols, ef_kwargs) for symbols in pair_symbols]
+    frontiers = _get_cached_pair_frontiers(keys)
+    missing = [index for index, frontier in enumerate(frontiers) if frontier is None]
+    if missing:
+        computed = _compute_pair_frontiers([pairs[index] for index in missing], ef_kwargs)
+        for index, frontier in zip(missing, computed, strict=True):
+            frontiers[index] = frontier
+        try:
+            cache.set_many({keys[index]: frontiers[index] for index in missing}, timeout=CACHE_TIMEOUT)
+        except Exception:
+            logging.exception("Pair frontier cache is unavailable")
+    return [
+        {
+            "name": " / ".join(symbols),
+            "risk": frontier["risk"],
+            "mean_return": frontier["mean_return"],
+            "cagr": frontier["cagr"],
+            "weights": _expand_weights_to_full_universe(
+                np.asarray(frontier["weights"], dtype=float), frontier["columns"], ef_object.symbols
+            ).tolist(),
+        }
+        for symbols, frontier in zip(pair_symbols, frontiers, strict=True)
+    ]
 
 
 def prepare_pairwise_ef(
@@ -490,26 +649,7 @@ def prepare_pairwise_ef(
     if ef_cache_key:
         pairwise_frontiers = _get_pairwise_frontier_data(ef_cache_key)
     else:
-        pairwise_frontiers = []
-        for pair_assets in itertools.combinations(ef_object.asset_obj_dict.values(), 2):
-            pair_symbols = [asset.symbol for asset in pair_assets]
-            pair_ef_object = _make_pairwise_ef_object(
-                ef_object=ef_object,
-                pair_assets=list(pair_assets),
-            )
-            pair_ef = pair_ef_object.ef_points * 100
-            pair_asset_columns = _get_asset_columns(pair_ef, pair_ef_object)
-            pair_weights = pair_ef[pair_asset_columns].to_numpy()
-            weights_array = _expand_weights_to_full_universe(pair_weights, pair_asset_columns, ef_object.symbols)
-            pairwise_frontiers.append(
-                {
-                    "name": " / ".join(pair_symbols),
-                    "risk": pair_ef["Risk"].tolist(),
-                    "mean_return": _get_column_values(pair_ef, ("Mean return", "Return", "CAGR")),
-                    "cagr": _get_column_values(pair_ef, ("CAGR", "Return", "Mean return")),
-                    "weights": weights_array.tolist(),
-                }
-            )
+        pairwise_frontiers = _build_pairwise_frontiers(ef_object)
     for pair_data in pairwise_frontiers:
         fig.add_trace(
             go.Scatter(
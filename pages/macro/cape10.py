@@ -9,7 +9,7 @@ from dash import callback, dcc, html
 from dash.dependencies import Input, Output, State
 
 from common.html_elements.copy_link_div import create_copy_link_div
-from common.mobile_screens import adopt_small_screens
+from common.mobile_screens import adopt_small_screens, register_screen_adaptation
 from common.object_cache import TTL_EFFICIENT_FRONTIER, get_or_create
 from common.parse_query import make_list_from_string
 from pages.macro import macro_objects
@@ -150,7 +150,7 @@ def layout(tickers=None, first_date=None, last_date=None, plot=None, **kwargs):
     Output("cape-chart", "figure"),
     Output("cape-chart", "config"),
     Output("cape-store-chart-data", "data"),
-    Input("store", "data"),
+    State("store", "data"),
     Input("cape-series", "value"),
     Input("cape-plot-type", "value"),
 )
@@ -203,3 +203,4 @@ def update_cape_link(n_clicks, href, symbols, plot_type):
 
 
 register_macro_download("cape")
+register_screen_adaptation("cape-chart")
@@ -16,7 +16,7 @@ from common.html_elements.grid_export import (
     percent_column_formats,
     rowdata_to_xlsx_download,
 )
-from common.mobile_screens import adopt_small_screens
+from common.mobile_screens import adopt_small_screens, register_screen_adaptation
 from common.parse_query import make_list_from_string
 from pages.macro import macro_objects
 from pages.macro.cards_macro.eng.inflation_description_txt import inflation_description_text
@@ -278,7 +278,7 @@ def layout(tickers=None, first_date=None, last_date=None, plot=None, rates=None,
     Output("infl-pp-cards", "children"),
     Output("infl-store-chart-data", "data"),
     Output("infl-describe-table", "children"),
-    Input("store", "data"),
+    State("store", "data"),
     # Reactive page: every control is an Input — changing any of them
     # recalculates immediately, and the missing prevent_initial_call renders
     # the chart on page load. There is no Submit button.
@@ -366,3 +366,4 @@ def export_inflation_stats(n_clicks, row_data):
 register_date_validation("infl-first-date")
 register_date_validation("infl-last-date")
 register_macro_download("infl")
+register_screen_adaptation("infl-chart")
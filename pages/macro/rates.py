@@ -14,7 +14,7 @@ from dash import callback, dcc, html
 from dash.dependencies import Input, Output, State
 
 from common.html_elements.copy_link_div import create_copy_link_div
-from common.mobile_screens import adopt_small_screens
+from common.mobile_screens import adopt_small_screens, register_screen_adaptation
 from common.object_cache import TTL_EFFICIENT_FRONTIER, get_or_create
 from common.parse_query import make_list_from_string
 from pages.macro import macro_objects
@@ -196,7 +196,7 @@ def layout(tickers=None, plot=None, **kwargs):
     Output("rates-chart", "figure"),
     Output("rates-chart", "config"),
     Output("rates-store-chart-data", "data"),
-    Input("store", "data"),
+    State("store", "data"),
     Input("rates-series", "value"),
     Input("rates-plot-type", "value"),
 )
@@ -260,3 +260,4 @@ def update_rates_link(n_clicks, href, symbols, plot):
 
 
 register_macro_download("rates")
+register_screen_adaptation("rates-chart")
@@ -23,7 +23,7 @@ from common.html_elements.grid_export import (
     percent_column_formats,
     rowdata_to_xlsx_download,
 )
-from common.mobile_screens import adopt_small_screens
+from common.mobile_screens import adopt_small_screens, register_screen_adaptation
 from common.parse_query import make_list_from_string
 from pages.macro import macro_objects
 from pages.macro.cards_macro.eng.real_estate_description_txt import real_estate_description_text
@@ -195,7 +195,7 @@ def _price_series(symbols: list[str], ccy: str, fd: str | None, ld: str | None)
     Output("re-chart", "config"),
     Output("re-store-chart-data", "data"),
     Output("re-describe-table", "children"),
-    Input("store", "data"),
+    State("store", "data"),
     # Reactive page: every control is an Input — changing any of them
     # recalculates immediately, and the missing prevent_initial_call renders
     # the chart on page load. There is no Submit button.
@@ -289,5 +289,6 @@ def export_re_stats(n_clicks, row_data):
 
 
 register_macro_download("re")
+register_screen_adaptation("re-chart")
 register_date_validation("re-first-date")
 register_date_validation("re-last-date")
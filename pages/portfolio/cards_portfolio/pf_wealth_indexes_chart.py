@@ -3,7 +3,7 @@ from dash.dependencies import Input, Output, State
 import dash_bootstrap_components as dbc
 import dash_daq as daq
 
-from common.xlsx import json_to_download_xlsx_object
+from common.xlsx import chart_data_to_download_xlsx_object
 
 card_graf_portfolio = dbc.Card(
     dbc.CardBody(
@@ -17,9 +17,20 @@ card_graf_portfolio = dbc.Card(
                                 dbc.Row(
                                     [
                                         dbc.Col(
+                                            # fan chart / every simulated path
+                                            html.Div(
+                                                daq.BooleanSwitch(
+                                                    id="pf-mc-all-paths-switch",
+                                                    on=False,
+                                                    label="All MC paths",
+                                                    labelPosition="bottom",
+                                                ),
+                                                id="pf-mc-all-paths-switch-div",
+                                                hidden=True,
+                                            ),
                                             lg=2,
                                             md=2,
-                                            sm=0,
+                                            sm=12,
                                         ),
                                         dbc.Col(
                                             # logarithmic scale button
@@ -48,6 +59,8 @@ card_graf_portfolio = dbc.Card(
                                                             external_link=False,
                                                         ),
                                                         dcc.Store(id="pf-store-chart-data", storage_type="session"),
+                                                        # Deferred MC forecast request (progressive rendering).
+                                                        dcc.Store(id="pf-forecast-request"),
                                                         dcc.Download(id="pf-download-dataframe-xlsx"),
                                                     ],
                                                     style={"textAlign": "center"},
@@ -77,5 +90,5 @@ card_graf_portfolio = dbc.Card(
     State("pf-store-chart-data", "data"),
     prevent_initial_call=True,
 )
-def pf_download_excel(n_clicks, json_data):
-    return json_to_download_xlsx_object(json_data)
+def pf_download_excel(n_clicks, chart_data):
+    return chart_data_to_download_xlsx_object(chart_data)
@@ -1,6 +1,6 @@
 """Display options section (Plot type / Include Inflation / Rolling Window) and
-the callbacks that toggle the rolling-window input, the inflation switch and the
-log-scale switch by the selected plot type."""
+the callbacks that toggle the rolling-window input, the inflation switch, the
+log-scale switch and the MC all-paths switch by the selected plot type."""
 
 from typing import Tuple
 
@@ -151,3 +151,14 @@ def update_inflation_switch(plot_options: str, inflation_switch_value) -> Tuple[
 )
 def show_log_scale_switch(n_clicks, plot_type: str):
     return plot_type not in ("wealth",)
+
+
+@callback(
+    Output("pf-mc-all-paths-switch-div", "hidden"),
+    Input(component_id="pf-submit-button", component_property="n_clicks"),
+    State(component_id="pf-plot-option", component_property="value"),
+    State(component_id="pf-monte-carlo-number", component_property="value"),
+)
+def show_mc_all_paths_switch(n_clicks, plot_type: str, n_monte_carlo) -> bool:
+    """The fan chart / all paths switch only applies to a Monte Carlo forecast."""
+    return plot_type != "wealth" or n_monte_carlo in (0, None)
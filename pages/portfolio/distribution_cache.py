@@ -0,0 +1,103 @@
+"""Derived cache of the rate-of-return distribution fits of a portfolio.
+
+The Distribution plot (fitted PDFs and goodness-of-fit tests) and the Monte
+Carlo parameter form (fitted parameters, Student's t df for a VaR level) all
+fit scipy distributions to ``pf.ror``; optimize_df_for_students alone takes
+seconds. The fits depend on the portfolio returns only, so they are memoized
+per returns fingerprint, fit kind and argument (distribution or VaR level).
+Submits that differ in cash flow or display options, and the parameter form's
+own ror-only portfolio, share the fits of the same returns; a portfolio
+rebuilt with a new month of data has new returns and is refitted.
+"""
+
+import hashlib
+
+import okama as ok
+import pandas as pd
+from okama.common.helpers.helpers import Frame
+
+# .fit for the PDF overlay only (see the scipy note in portfolio.py).
+from scipy.stats import lognorm, norm, t
+
+from common import cache
+from common.object_cache import get_okama_version
+
+CACHE_TIMEOUT = 2592000
+DISTRIBUTION_CACHE_VERSION = f"pf-distribution-v2-okv={get_okama_version()}"
+
+
+def fit_pdf_parameters(pf_object: ok.Portfolio, _argument=None) -> dict[str, tuple]:
+    """scipy fits of the monthly returns for the Distribution plot PDF curves."""
+    data = pf_object.ror
+    # The lognormal is fitted on gross returns (1 + r) with floc=0, the same basis
+    # as the KS test (okama Frame.kstest_series): monthly returns are sign-mixed.
+    return {
+        "t": tuple(t.fit(data)),
+        "norm": tuple(norm.fit(data)),
+        "lognorm": tuple(lognorm.fit(data + 1.0, floc=0)),
+    }
+
+
+def compute_distribution_stats(pf_object: ok.Portfolio, _argument=None) -> dict:
+    """Distribution moments and goodness-of-fit tests for the portfolio's monthly
+    rate of return, computed through okama's Frame helpers instead of scipy.stats
+    directly.
+
+    Frame wraps scipy in a version-safe way: kstest_series passes a frozen-distribution
+    CDF, sidestepping the scipy 1.18 ks_1samp/ndtr regression, and fits the lognormal
+    on gross returns (1 + r) with floc=0 so sign-mixed monthly returns are handled
+    correctly. Expanding skewness/kurtosis need >= 12 observations; for a shorter
+    series they are reported as NaN.
+    """
+    data = pf_object.ror.dropna()
+    skew_series = Frame.skewness(data)
+    kurt_series = Frame.kurtosis(data)
+    return {
+        "mean": data.mean(),
+        "std": data.std(),
+        "skewness": skew_series.iloc[-1] if not skew_series.empty else float("nan"),
+        "kurtosis": kurt_series.iloc[-1] if not kurt_series.empty else float("nan"),
+        "jarque_bera": Frame.jarque_bera_series(data),
+        "kstest": {
+            "Normal": Frame.kstest_series(data, distr="norm"),
+            "Lognormal": Frame.kstest_series(data, distr="lognorm"),
+            "Student's T": Frame.kstest_series(data, distr="t"),
+        },
+    }
+
+
+def fit_mc_parameters(pf_object: ok.Portfolio, distribution: str) -> tuple:
+    """okama's fitted Monte Carlo parameters for ``distribution``, rounded for the form."""
+    pf_object.dcf.mc.distribution = distribution
+    return tuple(round(float(p), 6) for p in pf_object.dcf.mc.get_parameters_for_distribution())
+
+
+def optimize_students_df(pf_object: ok.Portfolio, var_level: int) -> float:
+    """Student's t df matching the empirical VaR/CVaR at ``var_level``."""
+    pf_object.dcf.mc.distribution = "t"
+    return round(float(pf_object.dcf.mc.optimize_df_for_students(var_level)), 6)
+
+
+FITS = {
+    "pdf": fit_pdf_parameters,
+    "stats": compute_distribution_stats,
+    "mc_parameters": fit_mc_parameters,
+    "students_df": optimize_students_df,
+}
+
+
+def ror_fingerprint(pf_object: ok.Portfolio) -> str:
+    """Digest of the monthly returns (dates and values, not the series name): the ror identity."""
+    row_hashes = pd.util.hash_pandas_object(pf_object.ror, index=True).to_numpy()
+    return hashlib.sha256(row_hashes.tobytes()).hexdigest()[:32]
+
+
+@cache.memoize(timeout=CACHE_TIMEOUT, args_to_ignore=["pf_object"])
+def _get_fit_cached(cache_version: str, ror_key: str, kind: str, argument, pf_object: ok.Portfolio):
+    del cache_version, ror_key
+    return FITS[kind](pf_object, argument)
+
+
+def get_distribution_fit(pf_object: ok.Portfolio, kind: str, argument=None):
+    """FITS[kind](pf_object, argument), memoized for the returns of ``pf_object``."""
+    return _get_fit_cached(DISTRIBUTION_CACHE_VERSION, ror_fingerprint(pf_object), kind, argument, pf_object)
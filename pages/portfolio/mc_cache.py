@@ -0,0 +1,152 @@
+import copy
+import warnings
+
+import numpy as np
+import okama as ok
+import pandas as pd
+
+from common import cache
+from common.object_cache import entry_version, get_okama_version, load_cached
+
+CACHE_TIMEOUT = 2592000
+MC_CACHE_VERSION = f"pf-mc-v3-okv={get_okama_version()}"
+
+# Percentiles shown in the MC forecast statistics tables: (quantile, ordinal suffix).
+PERCENTILES = [(1, "st"), (5, "th"), (25, "th"), (50, "th"), (75, "th"), (95, "th"), (99, "th")]
+# Example paths drawn over the fan chart bands.
+FAN_SAMPLE_PATHS = 10
+
+
+def percentile_labels() -> list[str]:
+    return [f"{q}{suffix} percentile" for q, suffix in PERCENTILES]
+
+
+def mc_fan_frame(paths: pd.DataFrame) -> pd.DataFrame:
+    """Monthly PERCENTILES of the MC wealth paths, one column per percentile.
+
+    One np.percentile call over the path axis; a path that is NaN after its
+    first zero (nullified for drawing) counts as a balance of 0 from then on.
+    """
+    values = np.nan_to_num(paths.to_numpy(dtype=float), nan=0.0)
+    bands = np.percentile(values, [q for q, _ in PERCENTILES], axis=1)
+    return pd.DataFrame(bands.T, index=paths.index, columns=percentile_labels())
+
+
+def mc_sample_paths(paths: pd.DataFrame) -> pd.DataFrame:
+    """FAN_SAMPLE_PATHS paths spread evenly over the simulated ones."""
+    columns = np.unique(np.linspace(0, paths.shape[1] - 1, min(FAN_SAMPLE_PATHS, paths.shape[1])).astype(int))
+    return paths.iloc[:, columns].copy()
+
+
+def describe_mc_series(series: dict[str, pd.Series]) -> dict[str, dict]:
+    """Per series: PERCENTILES values, min, max, mean, std and the sample size.
+
+    The series (one value per path) are stacked into one matrix, so all
+    percentiles come from a single vectorized np.nanpercentile call. NaN (an
+    undefined IRR) is skipped, as Series.quantile/std do.
+    """
+    matrix = np.vstack([values.to_numpy(dtype=float) for values in series.values()])
+    with warnings.catch_warnings():
+        # A row with no defined value (all-NaN IRR) yields NaN statistics.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        percentiles = np.nanpercentile(matrix, [q for q, _ in PERCENTILES], axis=1)
+        mins, maxs = np.nanmin(matrix, axis=1), np.nanmax(matrix, axis=1)
+        means, stds = np.nanmean(matrix, axis=1), np.nanstd(matrix, axis=1, ddof=1)
+    counts = np.count_nonzero(~np.isnan(matrix), axis=1)
+    return {
+        name: {
+            "percentiles": percentiles[:, row].tolist(),
+            "min": float(mins[row]),
+            "max": float(maxs[row]),
+            "mean": float(means[row]),
+            "std": float(stds[row]),
+            "count": int(counts[row]),
+        }
+        for row, name in enumerate(series)
+    }
+
+
+def compute_mc_results(pf_object: ok.Portfolio) -> dict:
+    """Every Monte Carlo output the Portfolio page shows, from one simulation.
+
+    pf.dcf must already carry the forecast state (initial investment and MC
+    parameters). monte_carlo_wealth caches the simulated paths on the dcf
+    object, so survival period and IRR below reuse the same path matrix; the
+    table statistics of all three sections are derived here in one pass.
+
+    The path matrix itself is not part of the bundle, only what the page draws
+    from it: the fan chart percentiles, the example paths and one value per
+    path (final FV and PV wealth, survival period, IRR) for the histograms.
+    """
+    wealth_fv = pf_object.dcf.monte_carlo_wealth(discounting="fv", include_negative_values=False)
+    results = {
+        "fan": mc_fan_frame(wealth_fv),
+        "sample_paths": mc_sample_paths(wealth_fv),
+        "wealth_fv": wealth_fv.iloc[-1, :],
+        "wealth_pv": pf_object.dcf.monte_carlo_wealth(discounting="pv", include_negative_values=False).iloc[-1, :],
+        "survival_period": pf_object.dcf.monte_carlo_survival_period(threshold=0),
+        "irr": pf_object.dcf.monte_carlo_irr(),
+    }
+    results["stats"] = describe_mc_series(
+        {
+            "survival_period": results["survival_period"],
+            "wealth_fv": results["wealth_fv"],
+            "wealth_pv": results["wealth_pv"],
+            "irr": results["irr"],
+        }
+    )
+    return results
+
+
+@cache.memoize(timeout=CACHE_TIMEOUT)
+def _get_mc_results_cached(
+    cache_version: str,
+    file_name: str,
+    pf_version: int,
+    initial_investment: float,
+    distribution: str,
+    distribution_parameters: tuple | None,
+    years: int,
+    mc_number: int,
+    seed: int | None,
+) -> dict:
+    del cache_version, pf_version
+    # A private copy: the cached Portfolio is shared by every request of this worker.
+    pf_object = copy.deepcopy(load_cached(file_name))
+    pf_object.dcf.cashflow_parameters.initial_investment = initial_investment
+    pf_object.dcf.set_mc_parameters(
+        distribution=distribution,
+        distribution_parameters=distribution_parameters,
+        period=years,
+        mc_number=mc_number,
+        seed=seed,
+    )
+    return compute_mc_results(pf_object)
+
+
+def get_mc_results(
+    file_name: str,
+    initial_investment: float,
+    distribution: str,
+    distribution_parameters: tuple | None,
+    years: int,
+    mc_number: int,
+    seed: int | None = None,
+) -> dict:
+    """Monte Carlo results for the cached portfolio ``file_name``; see compute_mc_results.
+
+    Keyed like the EF derived cache plus the pickle version, so a portfolio
+    rebuilt under the same key (new month of data) never reuses old paths.
+    Raises FileNotFoundError when the pickle has been swept meanwhile.
+    """
+    return _get_mc_results_cached(
+        MC_CACHE_VERSION,
+        file_name,
+        entry_version(file_name),
+        float(initial_investment),
+        distribution,
+        tuple(distribution_parameters) if distribution_parameters is not None else None,
+        years,
+        mc_number,
+        seed,
+    )
@@ -1,3 +1,4 @@
+import inspect
 import logging
 import re
 import time
@@ -17,18 +18,19 @@ import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 # scipy's t/norm/lognorm distribution objects are kept ONLY for the fitted-PDF
-# overlay curves in _get_distribution_figure (.fit + .pdf on a custom x-grid),
-# which okama does not expose. The goodness-of-fit tests (kstest/jarque_bera) and
-# the moments (skewness/kurtosis) go through okama's Frame helpers below — that
-# path is what the scipy 1.18 ks_1samp regression broke; .fit/.pdf are unaffected.
+# overlay curves in _get_distribution_figure (.fit in distribution_cache + .pdf on
+# a custom x-grid), which okama does not expose. The goodness-of-fit tests
+# (kstest/jarque_bera) and the moments (skewness/kurtosis) go through okama's Frame
+# helpers (distribution_cache.compute_distribution_stats) — that path is what the
+# scipy 1.18 ks_1samp regression broke; .fit/.pdf are unaffected.
 from scipy.stats import t, norm, lognorm
-from okama.common.helpers.helpers import Frame
 
 import okama as ok
 
 import common.create_link
 import common.settings as settings
 import common.update_style
+from common.chart_store import store_chart_data
 from common.chart_helpers import (
     add_inflation_trace,
     add_crisis_rectangles,
@@ -39,13 +41,24 @@ from common.chart_helpers import (
     format_points,
 )
 from common.html_elements.submit_spinner import submit_spinner_running
-from common.mobile_screens import adopt_small_screens, is_small_screen
+from common.job_queue import heavy_callback, report_progress
+from common.mobile_screens import adopt_small_screens, is_small_screen, register_screen_adaptation
 from common.object_cache import get_or_create, TTL_PORTFOLIO
 from pages.portfolio.cards_portfolio.portfolio_controls import card_controls
 from pages.portfolio.cards_portfolio.portfolio_description import card_portfolio_description
 from pages.portfolio.cards_portfolio.portfolio_info import card_assets_info
 from pages.portfolio.cards_portfolio.pf_statistics_table import card_table
 from pages.portfolio.cards_portfolio.pf_wealth_indexes_chart import card_graf_portfolio
+from pages.portfolio.distribution_cache import get_distribution_fit
+from pages.portfolio.mc_cache import (
+    PERCENTILES,
+    describe_mc_series,
+    get_mc_results,
+    mc_fan_frame,
+    mc_sample_paths,
+    percentile_labels,
+)
+from pages.portfolio.withdrawal_solver import find_largest_withdrawal, supports_batched_search
 
 dash.register_page(
     __name__,
@@ -68,9 +81,6 @@ def _parse_pair_csv(csv_str):
     return pairs or None
 
 
-# Percentiles shown in the MC forecast statistics tables: (quantile, ordinal suffix).
-PERCENTILES = [(1, "st"), (5, "th"), (25, "th"), (50, "th"), (75, "th"), (95, "th"), (99, "th")]
-
 _MC_DATE_RE = re.compile(r"^\d{4}-\d{2}$")
 
 
@@ -130,6 +140,8 @@ def _build_ror_portfolio(assets, weights, ccy, first_date, last_date, rebal_peri
 
     Distribution fitting needs only ``pf.ror``, which depends on assets, weights,
     dates, currency and rebalancing — not on cash flow or discount rate.
+    Returns (portfolio, object-cache key); the fits are shared with the Submit
+    portfolio of the same returns (distribution_cache).
     """
     assets = [a for a in assets if a is not None]
     weights = [w / 100.0 for w in weights if w is not None]
@@ -147,7 +159,7 @@ def _build_ror_portfolio(assets, weights, ccy, first_date, last_date, rebal_peri
             rebalancing_strategy=rebal_strategy,
         )
 
-    pf_object, _ = get_or_create(
+    return get_or_create(
         obj_type="portfolio",
         constructor_fn=_construct,
         cache_key_params={
@@ -159,11 +171,10 @@ def _build_ror_portfolio(assets, weights, ccy, first_date, last_date, rebal_peri
             "rebal": rebal_period,
             "abs_dev": abs_dev,
             "rel_dev": rel_dev,
-            "purpose": "mc_params",
+            "inflation": True,
         },
         ttl_seconds=TTL_PORTFOLIO,
     )
-    return pf_object
 
 
 def _recompute_df_for_var_level(assets, weights, ccy, fd, ld, rebal, abs_dev, rel_dev, var_level):
@@ -174,13 +185,12 @@ def _recompute_df_for_var_level(assets, weights, ccy, fd, ld, rebal, abs_dev, re
     Timings go to the server log only.
     """
     start = time.perf_counter()
-    pf = _build_ror_portfolio(assets, weights, ccy, fd, ld, rebal, abs_dev, rel_dev)
-    pf.dcf.mc.distribution = "t"
+    pf, _ = _build_ror_portfolio(assets, weights, ccy, fd, ld, rebal, abs_dev, rel_dev)
     if var_level in (None, ""):
-        df = round(float(pf.dcf.mc.get_parameters_for_distribution()[0]), 6)
+        df = get_distribution_fit(pf, "mc_parameters", "t")[0]
         logging.info(f"MC df reset to fitted took {time.perf_counter() - start:.3f} s")
         return df
-    df = round(float(pf.dcf.mc.optimize_df_for_students(int(var_level))), 6)
+    df = get_distribution_fit(pf, "students_df", int(var_level))
     logging.info(f"MC df optimization took {time.perf_counter() - start:.3f} s")
     return df
 
@@ -286,7 +296,7 @@ def layout(
     return page
 
 
-@callback(
+@heavy_callback(
     Output(component_id="pf-wealth-indexes", component_property="figure"),
     Output(component_id="pf-wealth-indexes", component_property="config"),
     Output(component_id="pf-describe-table", component_property="children"),
@@ -296,8 +306,9 @@ def layout(
     Output(component_id="pf-store-chart-data", component_property="data"),
     Output(component_id="pf-error-toast", component_property="is_open"),
     Output(component_id="pf-error-toast", component_property="children"),
+    Output(component_id="pf-forecast-request", component_property="data"),
     # user screen info
-    Input(component_id="store", component_property="data"),
+    State(component_id="store", component_property="data"),
     # main Inputs
     Input(component_id="pf-submit-button", component_property="n_clicks"),
     # logarithmic scale button
@@ -356,6 +367,7 @@ def layout(
     # Show the spinner under the Submit button while computing (the chart's
     # own dcc.Loading spinner is below the fold on mobile).
     running=submit_spinner_running("pf-submit-spinner"),
+    progress_spinner="pf-submit-spinner",
     prevent_initial_call=True,
 )
 def update_graf_portfolio(
@@ -417,7 +429,7 @@ def update_graf_portfolio(
     if trigger == "pf-logarithmic-scale-switch":
         patched_fig = dash.Patch()
         patched_fig["layout"]["yaxis"]["type"] = "log" if log_on else "linear"
-        return (patched_fig,) + (dash.no_update,) * 8
+        return (patched_fig,) + (dash.no_update,) * 9
 
     distribution_parameters_monte_carlo = build_distribution_parameters(
         distribution_monte_carlo,
@@ -430,64 +442,117 @@ def update_graf_portfolio(
         mc_t_scale,
     )
 
+    # Arguments of _update_graf_portfolio_inner; also the request update_pf_forecast runs.
+    inner_args = {
+        "screen": screen,
+        "log_on": log_on,
+        "assets": assets,
+        "weights": weights,
+        "ccy": ccy,
+        "rebalancing_period": rebalancing_period,
+        "rebal_abs_deviation": rebal_abs_deviation,
+        "rebal_rel_deviation": rebal_rel_deviation,
+        "fd_value": fd_value,
+        "ld_value": ld_value,
+        "initial_amount": initial_amount,
+        "discount_rate": discount_rate,
+        "symbol": symbol,
+        "cf_strategy": cf_strategy,
+        "cf_frequency": cf_frequency,
+        "cf_amount": cf_amount,
+        "cf_indexation": cf_indexation,
+        "cf_percentage": cf_percentage,
+        "vds_percentage": vds_percentage,
+        "vds_min_withdrawal": vds_min_withdrawal,
+        "vds_max_withdrawal": vds_max_withdrawal,
+        "vds_adjust_minmax": vds_adjust_minmax,
+        "vds_floor": vds_floor,
+        "vds_ceiling": vds_ceiling,
+        "vds_adjust_fc": vds_adjust_fc,
+        "vds_indexation": vds_indexation,
+        "cwd_amount": cwd_amount,
+        "cwd_indexation": cwd_indexation,
+        "cwd_thresholds": cwd_thresholds,
+        "cwd_reductions": cwd_reductions,
+        "ts_dates": ts_dates,
+        "ts_amounts": ts_amounts,
+        "plot_type": plot_type,
+        "inflation_on": inflation_on,
+        "rolling_window": rolling_window,
+        "n_monte_carlo": n_monte_carlo,
+        "years_monte_carlo": years_monte_carlo,
+        "distribution_monte_carlo": distribution_monte_carlo,
+        "show_backtest": show_backtest,
+        "distribution_parameters_monte_carlo": distribution_parameters_monte_carlo,
+    }
+    # Progressive rendering: with a Monte Carlo forecast on the wealth chart, this
+    # callback returns the backtest (chart + statistics) at once and hands the
+    # forecast to update_pf_forecast through pf-forecast-request.
+    defer_forecast = plot_type == "wealth" and n_monte_carlo != 0
+
     try:
-        result = _update_graf_portfolio_inner(
-            screen,
-            log_on,
-            assets,
-            weights,
-            ccy,
-            rebalancing_period,
-            rebal_abs_deviation,
-            rebal_rel_deviation,
-            fd_value,
-            ld_value,
-            initial_amount,
-            discount_rate,
-            symbol,
-            cf_strategy,
-            cf_frequency,
-            cf_amount,
-            cf_indexation,
-            cf_percentage,
-            vds_percentage,
-            vds_min_withdrawal,
-            vds_max_withdrawal,
-            vds_adjust_minmax,
-            vds_floor,
-            vds_ceiling,
-            vds_adjust_fc,
-            vds_indexation,
-            cwd_amount,
-            cwd_indexation,
-            cwd_thresholds,
-            cwd_reductions,
-            ts_dates,
-            ts_amounts,
-            plot_type,
-            inflation_on,
-            rolling_window,
-            n_monte_carlo,
-            years_monte_carlo,
-            distribution_monte_carlo,
-            show_backtest,
-            distribution_parameters_monte_carlo=distribution_parameters_monte_carlo,
-        )
-        return (*result, False, "")
+        result = _update_graf_portfolio_inner(**inner_args, backtest_only=defer_forecast)
+        # The forecast stage overwrites this stage's chart data under the same handle.
+        forecast_request = {**inner_args, "chart_data": result[-1]} if defer_forecast else None
+        return (*result, False, "", forecast_request)
     except Exception as e:
         logging.exception("Callback error")
-        empty_fig = go.Figure()
-        return (
-            empty_fig,
-            {},
-            dag.AgGrid(),
-            dag.AgGrid(),
-            dag.AgGrid(),
-            dag.AgGrid(),
-            None,
-            True,
-            f"Error: {e}",
-        )
+        return (*_failed_portfolio_outputs(e), None)
+
+
+def _failed_portfolio_outputs(error: Exception) -> tuple:
+    """Chart, tables and chart data cleared, with the error toast open."""
+    return (
+        go.Figure(),
+        {},
+        dag.AgGrid(),
+        dag.AgGrid(),
+        dag.AgGrid(),
+        dag.AgGrid(),
+        None,
+        True,
+        f"Error: {error}",
+    )
+
+
+@heavy_callback(
+    Output(component_id="pf-wealth-indexes", component_property="figure", allow_duplicate=True),
+    Output(component_id="pf-wealth-indexes", component_property="config", allow_duplicate=True),
+    Output(component_id="pf-monte-carlo-statistics", component_property="children", allow_duplicate=True),
+    Output(component_id="pf-monte-carlo-wealth-statistics", component_property="children", allow_duplicate=True),
+    Output(component_id="pf-monte-carlo-cashflow-irr-statistics", component_property="children", allow_duplicate=True),
+    Output(component_id="pf-store-chart-data", component_property="data", allow_duplicate=True),
+    Output(component_id="pf-error-toast", component_property="is_open", allow_duplicate=True),
+    Output(component_id="pf-error-toast", component_property="children", allow_duplicate=True),
+    Input(component_id="pf-forecast-request", component_property="data"),
+    # Full paths on demand: redraws from the cached simulation.
+    Input(component_id="pf-mc-all-paths-switch", component_property="on"),
+    State(component_id="pf-logarithmic-scale-switch", component_property="on"),
+    # Keep the Submit spinner up until the forecast has streamed in.
+    running=submit_spinner_running("pf-submit-spinner"),
+    prevent_initial_call=True,
+)
+def update_pf_forecast(request: dict | None, all_paths: bool, log_on: bool):
+    """Second stage of update_graf_portfolio: the Monte Carlo chart and sections.
+
+    The portfolio comes from the object cache the first stage just filled, and
+    the chart and the three MC sections share one cached simulation
+    (mc_cache), so this stage costs the simulation only; the statistics grid
+    of the first stage is not recomputed. A newer Submit
+    replaces the request, and Dash drops the result of the superseded run.
+    Toggling "All MC paths" re-runs this stage only.
+    """
+    if not request:
+        raise dash.exceptions.PreventUpdate
+    try:
+        return (*_update_pf_forecast_inner(request, log_on, bool(all_paths)), False, "")
+    except Exception as e:
+        logging.exception("Forecast callback error")
+        failed = _failed_portfolio_outputs(e)
+        return (*failed[:2], *failed[3:])
+
+
+register_screen_adaptation("pf-wealth-indexes")
 
 
 @callback(
@@ -585,9 +650,8 @@ def export_pf_cashflow_irr_statistics_xlsx(n_clicks, row_data):
 def _fit_distribution_params(assets, weights, ccy, fd, ld, rebal, abs_dev, rel_dev, distribution):
     """Fit distribution parameters for the active distribution; timing goes to the server log."""
     start = time.perf_counter()
-    pf = _build_ror_portfolio(assets, weights, ccy, fd, ld, rebal, abs_dev, rel_dev)
-    pf.dcf.mc.distribution = distribution
-    params = tuple(round(float(p), 6) for p in pf.dcf.mc.get_parameters_for_distribution())
+    pf, _ = _build_ror_portfolio(assets, weights, ccy, fd, ld, rebal, abs_dev, rel_dev)
+    params = get_distribution_fit(pf, "mc_parameters", distribution)
     logging.info(f"MC parameter estimation took {time.perf_counter() - start:.3f} s")
     return params
 
@@ -680,7 +744,7 @@ def auto_estimate_distribution_parameters(
     return _format_params_output_by_distribution(distribution, params)
 
 
-@callback(
+@heavy_callback(
     Output("pf-cf-find-result", "children"),
     Output("pf-cf-find-result", "className"),
     Output("pf-cf-amount", "value"),
@@ -734,6 +798,7 @@ def auto_estimate_distribution_parameters(
     State(component_id="pf-mc-t-loc", component_property="value"),
     State(component_id="pf-mc-t-scale", component_property="value"),
     running=submit_spinner_running("pf-cf-find-spinner"),
+    progress_spinner="pf-cf-find-spinner",
     prevent_initial_call=True,
 )
 def find_max_withdrawal(
@@ -786,10 +851,12 @@ def find_max_withdrawal(
 ):
     """Search for the largest sustainable withdrawal (issue #22).
 
-    Separate from Submit: each solver evaluation runs a full MC simulation
-    (up to iter_max=20 + 2 boundary evaluations), so the search takes seconds
-    of server compute. Builds the same pf.dcf state the Submit forecast path
-    builds, so Find results match the forecast the user then runs.
+    Separate from Submit: builds the same pf.dcf state the Submit forecast
+    path builds, so Find results match the forecast the user then runs.
+    Amount-based strategies (indexation, cwd) use the batched solver in
+    withdrawal_solver (two simulations in total); percentage-based ones run
+    okama's solver, where each evaluation is a full MC simulation (up to
+    iter_max=20 + 2 boundary evaluations).
     """
     no_fill = (dash.no_update,) * 4
     if cf_strategy == "time_series":
@@ -806,7 +873,8 @@ def find_max_withdrawal(
         mc_t_scale,
     )
     try:
-        pf_object = _build_cached_portfolio(
+        report_progress("Loading portfolio data...")
+        pf_object, _ = _build_cached_portfolio(
             assets=assets,
             weights=weights,
             ccy=ccy,
@@ -861,10 +929,14 @@ def find_max_withdrawal(
                 "ms-2 text-warning",
                 *no_fill,
             )
+        report_progress("Searching for the withdrawal size...")
         solver_kwargs = {"goal": goal, "percentile": int(percentile)}
         if goal == "survival_period":
             solver_kwargs["target_survival_period"] = int(target_sp)
-        result = pf_object.dcf.find_the_largest_withdrawals_size(**solver_kwargs)
+        if supports_batched_search(pf_object.dcf.cashflow_parameters):
+            result = find_largest_withdrawal(pf_object, **solver_kwargs)
+        else:
+            result = pf_object.dcf.find_the_largest_withdrawals_size(**solver_kwargs)
     except ValueError as e:
         return f"Error: {e}", "ms-2 text-danger", *no_fill
     except Exception:
@@ -921,10 +993,10 @@ def _build_cached_portfolio(
     ts_dates,
     ts_amounts,
     inflation_on,
-) -> ok.Portfolio:
+) -> tuple[ok.Portfolio, str]:
     """Normalize form inputs and return the cached ok.Portfolio with its
-    cash-flow strategy assigned. Shared by the Submit and Find callbacks so
-    both build the identical dcf state."""
+    cash-flow strategy assigned, and its object-cache key. Shared by the
+    Submit and Find callbacks so both build the identical dcf state."""
     assets = [i for i in assets if i is not None]
     weights = [i / 100.0 for i in weights if i is not None]
     symbol = symbol.replace(" ", "_")
@@ -999,7 +1071,7 @@ def _build_cached_portfolio(
         )
         return pf
 
-    pf_object, _ = get_or_create(
+    return get_or_create(
         obj_type="portfolio",
         constructor_fn=_construct_portfolio,
         cache_key_params={
@@ -1021,7 +1093,9 @@ def _build_cached_portfolio(
         ttl_seconds=TTL_PORTFOLIO,
     )
 
-    return pf_object
+
+# Keys of an update_pf_forecast request that identify the cached portfolio.
+_PORTFOLIO_PARAMETERS = tuple(inspect.signature(_build_cached_portfolio).parameters)
 
 
 def _update_graf_portfolio_inner(
@@ -1065,8 +1139,20 @@ def _update_graf_portfolio_inner(
     distribution_monte_carlo,
     show_backtest,
     distribution_parameters_monte_carlo=None,
+    backtest_only: bool = False,
+    mc_all_paths: bool = False,
 ):
-    pf_object = _build_cached_portfolio(
+    """Chart, config, statistics grid, the three MC sections and the chart data.
+
+    backtest_only (first stage of progressive rendering) skips the Monte Carlo
+    forecast: the chart shows the backtest and the MC sections are placeholders
+    until update_pf_forecast replaces them. The forecast is drawn as a fan chart
+    unless mc_all_paths asks for every simulated path.
+    """
+    forecast_on = n_monte_carlo != 0 and plot_type == "wealth"
+    deferred = backtest_only and forecast_on
+    report_progress("Loading portfolio data...")
+    pf_object, pf_key = _build_cached_portfolio(
         assets,
         weights,
         ccy,
@@ -1100,20 +1186,23 @@ def _update_graf_portfolio_inner(
         inflation_on,
     )
 
+    report_progress("Building the chart...")
     fig, df_backtest, df_forecast, df_data = get_pf_figure(
         pf_object,
         plot_type,
         inflation_on,
         rolling_window,
-        n_monte_carlo,
+        0 if deferred else n_monte_carlo,
         years_monte_carlo,
         distribution_monte_carlo,
         show_backtest,
         log_on,
         cf_strategy,
         distribution_parameters_monte_carlo=distribution_parameters_monte_carlo,
+        pf_key=pf_key,
+        mc_all_paths=mc_all_paths,
     )
-    json_data = df_data.to_json(orient="split", default_handler=str)
+    chart_data = store_chart_data(df_data)
     if plot_type == "wealth":
         fig.update_yaxes(title_text="Wealth Indexes")
     elif plot_type == "cumulative_return":
@@ -1129,42 +1218,107 @@ def _update_graf_portfolio_inner(
     # Change layout for mobile screens
     fig, config = adopt_small_screens(fig, screen)
     # PF statistics
+    report_progress("Computing statistics...")
     if plot_type == "distribution":
         statistics_ag_grid = get_statistics_for_distribution(pf_object)
     else:
         statistics_ag_grid = get_pf_statistics_table(pf_object)
     # Monte Carlo statistics
-    if n_monte_carlo != 0 and plot_type == "wealth":
-        compact_tables = is_small_screen(screen)
-        forecast_survival_statistics_datatable = get_forecast_survival_statistics_section(
-            df_forecast,
-            df_backtest,
-            pf_object,
-            compact=compact_tables,
-            screen=screen,
-        )
-        forecast_wealth_statistics_datatable = get_forecast_wealth_statistics_section(
-            pf_object,
-            compact=compact_tables,
-            screen=screen,
+    if deferred:
+        forecast_sections = tuple(
+            _forecast_pending_section(title)
+            for title in ("Survival period statistics", "Wealth statistics", "CashFlow IRR")
         )
-        forecast_cashflow_irr_datatable = get_forecast_cashflow_irr_statistics_section(
+    elif forecast_on:
+        forecast_sections = _get_forecast_sections(
             pf_object,
-            compact=compact_tables,
-            screen=screen,
+            pf_key,
+            df_backtest,
+            df_forecast,
+            screen,
+            distribution_monte_carlo,
+            years_monte_carlo,
+            n_monte_carlo,
+            distribution_parameters_monte_carlo,
         )
     else:
-        forecast_survival_statistics_datatable = dag.AgGrid()
-        forecast_wealth_statistics_datatable = dag.AgGrid()
-        forecast_cashflow_irr_datatable = dag.AgGrid()
+        forecast_sections = (dag.AgGrid(), dag.AgGrid(), dag.AgGrid())
+    return (fig, config, statistics_ag_grid, *forecast_sections, chart_data)
+
+
+def _get_forecast_sections(
+    pf_object, pf_key, df_backtest, df_forecast, screen, distribution_mc, years_mc, n_mc, distribution_parameters_mc
+) -> tuple:
+    """Survival, wealth and cash flow IRR sections of the Monte Carlo forecast."""
+    compact_tables = is_small_screen(screen)
+    # Same arguments as the chart's lookup in _get_wealth_data: a cache hit, not a new simulation.
+    mc_results = (
+        None
+        if df_forecast.empty
+        else _get_forecast_mc_results(pf_object, pf_key, distribution_mc, years_mc, n_mc, distribution_parameters_mc)
+    )
     return (
-        fig,
-        config,
-        statistics_ag_grid,
-        forecast_survival_statistics_datatable,
-        forecast_wealth_statistics_datatable,
-        forecast_cashflow_irr_datatable,
-        json_data,
+        get_forecast_survival_statistics_section(
+            df_forecast, df_backtest, pf_object, compact=compact_tables, screen=screen, mc_results=mc_results
+        ),
+        get_forecast_wealth_statistics_section(pf_object, compact=compact_tables, screen=screen, mc_results=mc_results),
+        get_forecast_cashflow_irr_statistics_section(
+            pf_object, compact=compact_tables, screen=screen, mc_results=mc_results
+        ),
+    )
+
+
+def _update_pf_forecast_inner(request: dict, log_on: bool, mc_all_paths: bool) -> tuple:
+    """Chart, config, the three MC sections and the chart data of a deferred forecast.
+
+    The forecast part of _update_graf_portfolio_inner only: the portfolio is an
+    object cache hit, the simulation comes from mc_cache, and the statistics
+    grid of the first stage stays on the page.
+    """
+    pf_object, pf_key = _build_cached_portfolio(**{name: request[name] for name in _PORTFOLIO_PARAMETERS})
+    report_progress("Running Monte Carlo simulation...")
+    fig, df_backtest, df_forecast, df_data = get_pf_figure(
+        pf_object,
+        "wealth",
+        request["inflation_on"],
+        request["rolling_window"],
+        request["n_monte_carlo"],
+        request["years_monte_carlo"],
+        request["distribution_monte_carlo"],
+        request["show_backtest"],
+        log_on,
+        request["cf_strategy"],
+        distribution_parameters_monte_carlo=request["distribution_parameters_monte_carlo"],
+        pf_key=pf_key,
+        mc_all_paths=mc_all_paths,
+    )
+    fig.update_yaxes(title_text="Wealth Indexes")
+    fig, config = adopt_small_screens(fig, request["screen"])
+    forecast_sections = _get_forecast_sections(
+        pf_object,
+        pf_key,
+        df_backtest,
+        df_forecast,
+        request["screen"],
+        request["distribution_monte_carlo"],
+        request["years_monte_carlo"],
+        request["n_monte_carlo"],
+        request["distribution_parameters_monte_carlo"],
+    )
+    return (fig, config, *forecast_sections, store_chart_data(df_data, request.get("chart_data")))
+
+
+def _forecast_pending_section(title: str) -> html.Div:
+    """Placeholder for an MC section while update_pf_forecast computes it."""
+    return html.Div(
+        [
+            html.H5(children=title),
+            html.Div(
+                [dbc.Spinner(size="sm", color="primary"), html.Small("Running Monte Carlo simulation...")],
+                className="hstack gap-2",
+            ),
+        ],
+        className="vstack gap-2",
     )
 
 
@@ -1393,36 +1547,8 @@ def _format_find_result(strategy_type: str, result) -> str:
     return f"Withdrawal: {format_points(float(result.withdrawal_abs))} ({rel_pct:.1f}% of initial) · {accuracy}"
 
 
-def compute_distribution_stats(pf_object: ok.Portfolio) -> dict:
-    """Distribution moments and goodness-of-fit tests for the portfolio's monthly
-    rate of return, computed through okama's Frame helpers instead of scipy.stats
-    directly.
-
-    Frame wraps scipy in a version-safe way: kstest_series passes a frozen-distribution
-    CDF, sidestepping the scipy 1.18 ks_1samp/ndtr regression, and fits the lognormal
-    on gross returns (1 + r) with floc=0 so sign-mixed monthly returns are handled
-    correctly. Expanding skewness/kurtosis need >= 12 observations; for a shorter
-    series they are reported as NaN.
-    """
-    data = pf_object.ror.dropna()
-    skew_series = Frame.skewness(data)
-    kurt_series = Frame.kurtosis(data)
-    return {
-        "mean": data.mean(),
-        "std": data.std(),
-        "skewness": skew_series.iloc[-1] if not skew_series.empty else float("nan"),
-        "kurtosis": kurt_series.iloc[-1] if not kurt_series.empty else float("nan"),
-        "jarque_bera": Frame.jarque_bera_series(data),
-        "kstest": {
-            "Normal": Frame.kstest_series(data, distr="norm"),
-            "Lognormal": Frame.kstest_series(data, distr="lognorm"),
-            "Student's T": Frame.kstest_series(data, distr="t"),
-        },
-    }
-
-
 def get_statistics_for_distribution(pf_object: ok.Portfolio) -> html.Div:
-    stats = compute_distribution_stats(pf_object)
+    stats = get_distribution_fit(pf_object, "stats")
     ks = stats["kstest"]
     jb = stats["jarque_bera"]
 
@@ -1476,29 +1602,43 @@ def get_statistics_for_distribution(pf_object: ok.Portfolio) -> html.Div:
     return statistics_html
 
 
-def _mc_histogram_bins(series_list: list[pd.Series]) -> go.histogram.XBins | None:
-    """Shared adaptive bins for (overlaid) MC histograms.
+def _mc_histogram_bins(series_list: list[pd.Series]) -> np.ndarray:
+    """Shared adaptive bin edges for (overlaid) histograms.
 
     Same rule as the rate-of-return distribution figure: 50 bins for >=120
-    samples, else 10. A constant series (all paths identical) returns None
-    so plotly picks its own bin instead of a zero width."""
+    samples, else 10, over the combined range. A constant series (all paths
+    identical) gets a single unit-wide bin around its value instead of a zero
+    width."""
     combined_min = min(s.min() for s in series_list)
     combined_max = max(s.max() for s in series_list)
     if combined_max == combined_min:
-        return None
+        return np.array([combined_min - 0.5, combined_max + 0.5])
     samples = max(s.shape[0] for s in series_list)
     bins_number = 50 if samples >= 120 else 10
-    return go.histogram.XBins(size=(combined_max - combined_min) / bins_number)
+    return np.linspace(combined_min, combined_max, bins_number + 1)
+
+
+def _histogram_bar(values: pd.Series, edges: np.ndarray, **trace_kwargs) -> go.Bar:
+    """Histogram binned on the server: one bar per bin, heights are probabilities.
+
+    Replaces go.Histogram over the raw samples, so the figure size depends on
+    the number of bins only, not on the number of simulations or months."""
+    counts, _ = np.histogram(values, bins=edges)
+    return go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts / max(counts.sum(), 1),
+        width=np.diff(edges),
+        **trace_kwargs,
+    )
 
 
 def _get_survival_distribution_figure(fsp: pd.Series) -> go.Figure:
     """Histogram of MC survival periods (backtest offset already applied)."""
     fig = go.Figure(
-        go.Histogram(
-            x=fsp,
-            histnorm="probability",
-            xbins=_mc_histogram_bins([fsp]),
-            marker=go.histogram.Marker(color="lightgreen"),
+        _histogram_bar(
+            fsp,
+            _mc_histogram_bins([fsp]),
+            marker={"color": "lightgreen"},
             name="Survival period",
             showlegend=False,
         )
@@ -1513,8 +1653,8 @@ def _get_wealth_distribution_figure(wealth_fv: pd.Series, wealth_pv: pd.Series)
     """Overlaid FV/PV histograms of MC terminal wealth (shared bins)."""
     bins = _mc_histogram_bins([wealth_fv, wealth_pv])
     fig = go.Figure()
-    fig.add_trace(go.Histogram(x=wealth_fv, histnorm="probability", xbins=bins, name="FV", opacity=0.6))
-    fig.add_trace(go.Histogram(x=wealth_pv, histnorm="probability", xbins=bins, name="PV", opacity=0.6))
+    fig.add_trace(_histogram_bar(wealth_fv, bins, name="FV", opacity=0.6))
+    fig.add_trace(_histogram_bar(wealth_pv, bins, name="PV", opacity=0.6))
     fig.update_layout(
         barmode="overlay",
         title={"text": "Terminal wealth distribution", "x": 0.5, "xanchor": "center"},
@@ -1544,13 +1684,27 @@ def get_forecast_survival_statistics_section(
     pf_object: ok.Portfolio,
     compact: bool = False,
     screen: dict | None = None,
+    mc_results: dict | None = None,
 ):
     if not df_forecast.empty:
         backtest_survival_period = 0 if df_backtsest.empty else pf_object.dcf.survival_period_hist()
-        fsp = pf_object.dcf.monte_carlo_survival_period(threshold=0)
-        fsp += backtest_survival_period
-        percentiles = [(f"{q}{suffix} percentile", fsp.quantile(q / 100)) for q, suffix in PERCENTILES]
-        moments = [("Min", fsp.min()), ("Max", fsp.max()), ("Mean", fsp.mean()), ("Std", fsp.std())]
+        if mc_results:
+            fsp, stats = mc_results["survival_period"], mc_results["stats"]["survival_period"]
+        else:
+            fsp = pf_object.dcf.monte_carlo_survival_period(threshold=0)
+            stats = describe_mc_series({"survival_period": fsp})["survival_period"]
+        # The backtest offset shifts every location statistic; the spread is unchanged.
+        fsp = fsp + backtest_survival_period
+        percentiles = [
+            (label, value + backtest_survival_period)
+            for label, value in zip(percentile_labels(), stats["percentiles"], strict=True)
+        ]
+        moments = [
+            ("Min", stats["min"] + backtest_survival_period),
+            ("Max", stats["max"] + backtest_survival_period),
+            ("Mean", stats["mean"] + backtest_survival_period),
+            ("Std", stats["std"]),
+        ]
         guarded_decimal_formatter = {"function": "formatDecimalGuarded(params.value)"}
         if compact:
             # Mobile: one pair per row — the two-pane layout doesn't fit narrow screens.
@@ -1617,24 +1771,36 @@ def get_forecast_survival_statistics_section(
     )
 
 
-def get_forecast_wealth_statistics_section(pf_object, compact: bool = False, screen: dict | None = None):
+def get_forecast_wealth_statistics_section(
+    pf_object,
+    compact: bool = False,
+    screen: dict | None = None,
+    mc_results: dict | None = None,
+):
     # A depleted portfolio balance is 0, never negative: okama replaces
     # negatives with 0 (same flag the main MC chart uses).
-    wealth_fv = pf_object.dcf.monte_carlo_wealth(discounting="fv", include_negative_values=False)
-    if not wealth_fv.empty:
-        wealth = wealth_fv.iloc[-1, :]
-        wealth_pv = pf_object.dcf.monte_carlo_wealth(discounting="pv", include_negative_values=False).iloc[-1, :]
+    wealth = (
+        mc_results["wealth_fv"]
+        if mc_results
+        else pf_object.dcf.monte_carlo_wealth(discounting="fv", include_negative_values=False).iloc[-1, :]
+    )
+    if not wealth.empty:
+        wealth_pv = (
+            mc_results["wealth_pv"]
+            if mc_results
+            else pf_object.dcf.monte_carlo_wealth(discounting="pv", include_negative_values=False).iloc[-1, :]
+        )
+
+        stats = mc_results["stats"] if mc_results else describe_mc_series({"wealth_fv": wealth, "wealth_pv": wealth_pv})
+        fv, pv = stats["wealth_fv"], stats["wealth_pv"]
 
         rate = f"{pf_object.dcf.discount_rate * 100:.2f}%"
-        percentiles = [
-            (f"{q}{suffix} percentile", wealth.quantile(q / 100), wealth_pv.quantile(q / 100))
-            for q, suffix in PERCENTILES
-        ]
+        percentiles = list(zip(percentile_labels(), fv["percentiles"], pv["percentiles"], strict=True))
         moments = [
-            ("Min", wealth.min(), wealth_pv.min()),
-            ("Max", wealth.max(), wealth_pv.max()),
-            ("Mean", wealth.mean(), wealth_pv.mean()),
-            ("Std", wealth.std(), wealth_pv.std()),
+            ("Min", fv["min"], pv["min"]),
+            ("Max", fv["max"], pv["max"]),
+            ("Mean", fv["mean"], pv["mean"]),
+            ("Std", fv["std"], pv["std"]),
             ("Discount rate", None, rate),
         ]
         guarded_integer_formatter = {"function": "formatGroupedIntGuarded(params.value)"}
@@ -1719,11 +1885,10 @@ def get_forecast_wealth_statistics_section(pf_object, compact: bool = False, scr
 def _get_cashflow_irr_distribution_figure(irr_series: pd.Series) -> go.Figure:
     """Histogram of per-path money-weighted IRRs (NaN paths already dropped)."""
     fig = go.Figure(
-        go.Histogram(
-            x=irr_series,
-            histnorm="probability",
-            xbins=_mc_histogram_bins([irr_series]),
-            marker=go.histogram.Marker(color="lightgreen"),
+        _histogram_bar(
+            irr_series,
+            _mc_histogram_bins([irr_series]),
+            marker={"color": "lightgreen"},
             name="CashFlow IRR",
             showlegend=False,
         )
@@ -1734,14 +1899,19 @@ def _get_cashflow_irr_distribution_figure(irr_series: pd.Series) -> go.Figure:
     return fig
 
 
-def get_forecast_cashflow_irr_statistics_section(pf_object, compact: bool = False, screen: dict | None = None):
+def get_forecast_cashflow_irr_statistics_section(
+    pf_object,
+    compact: bool = False,
+    screen: dict | None = None,
+    mc_results: dict | None = None,
+):
     """CashFlow IRR MC section (issue #19): percentile table + distribution.
 
     monte_carlo_irr() returns NaN for paths whose cash flow has no sign change
     (e.g. contributions only); statistics use the non-NaN subset and the table
     surfaces the effective sample size instead of silently shrinking.
     """
-    irr_series = pf_object.dcf.monte_carlo_irr()
+    irr_series = mc_results["irr"] if mc_results else pf_object.dcf.monte_carlo_irr()
     valid = irr_series.dropna()
     if valid.empty:
         return html.Div(
@@ -1752,13 +1922,14 @@ def get_forecast_cashflow_irr_statistics_section(pf_object, compact: bool = Fals
             className="vstack gap-2",
         )
 
+    stats = mc_results["stats"]["irr"] if mc_results else describe_mc_series({"irr": valid})["irr"]
     historical_irr = pf_object.dcf.irr()
-    percentiles = [(f"{q}{suffix} percentile", valid.quantile(q / 100)) for q, suffix in PERCENTILES]
+    percentiles = list(zip(percentile_labels(), stats["percentiles"], strict=True))
     moments = [
-        ("Min", valid.min()),
-        ("Max", valid.max()),
-        ("Mean", valid.mean()),
-        ("Std", valid.std()),
+        ("Min", stats["min"]),
+        ("Max", stats["max"]),
+        ("Mean", stats["mean"]),
+        ("Std", stats["std"]),
         # NaN is not valid JSON; the guarded formatter renders None as a dash.
         ("Historical IRR", None if pd.isna(historical_irr) else historical_irr),
     ]
@@ -1850,35 +2021,31 @@ def _nullify_after_first_zero(df: pd.DataFrame, column: str) -> None:
 
 def _get_distribution_figure(pf_object: ok.Portfolio) -> go.Figure:
     data = pf_object.ror
-    df_t, loc, scale = t.fit(data)
-    mu, std = norm.fit(data)
-    # Fit the lognormal on gross returns (1 + r) with floc=0 — the same basis as the
-    # KS test (okama Frame.kstest_series). Monthly returns are sign-mixed, so fitting
+    fits = get_distribution_fit(pf_object, "pdf")
+    df_t, loc, scale = fits["t"]
+    mu, std = fits["norm"]
+    # The lognormal is fitted on gross returns (1 + r) with floc=0 — the same basis as
+    # the KS test (okama Frame.kstest_series). Monthly returns are sign-mixed, so fitting
     # lognorm on raw r explores invalid (negative) support ("invalid value in log").
     # The PDF is evaluated on the gross grid (x + 1) below; since r = R - 1 is a pure
     # location shift, the density plotted against r is unchanged.
-    std_ln, loc_ln, scale_ln = lognorm.fit(data + 1.0, floc=0)
+    std_ln, loc_ln, scale_ln = fits["lognorm"]
     xmin, xmax = data.min(), data.max()
     x = np.linspace(xmin, xmax, 100)
-    bins_number = 50 if data.shape[0] >= 120 else 10
-    bin_size = (xmax - xmin) / bins_number
+    edges = _mc_histogram_bins([data])
+    bin_size = edges[1] - edges[0]
+    # Density x bin width = probability of a bin centred at x, on the scale of the bars.
     pdf_df = pd.DataFrame(
         {
             "Student’s t": t.pdf(x, loc=loc, scale=scale, df=df_t) * bin_size,
             "Normal": norm.pdf(x, mu, std) * bin_size,
             "Lognormal": lognorm.pdf(x + 1.0, std_ln, loc_ln, scale_ln) * bin_size,
         },
-        index=x + bin_size / 2,
+        index=x,
     )
     fig = px.line(pdf_df)
     fig.add_trace(
-        go.Histogram(
-            x=data,
-            histnorm="probability",
-            xbins=go.histogram.XBins(size=bin_size),
-            marker=go.histogram.Marker(color="lightgreen"),
-            name="Historical distribution",
-        )
+        _histogram_bar(data, edges, marker={"color": "lightgreen"}, name="Historical distribution"),
     )
     fig.update_layout(
         title={"text": "Rate of return distribution", "x": 0.5, "xanchor": "center"},
@@ -1911,6 +2078,31 @@ def _prepare_dcf_forecast_state(
     return True
 
 
+def _get_forecast_mc_results(
+    pf_object, pf_key, distribution_mc, years_mc, n_mc, distribution_parameters_mc=None
+) -> dict | None:
+    """Monte Carlo result bundle (see mc_cache) for the state set by _prepare_dcf_forecast_state.
+
+    A portfolio from the object cache (pf_key) is looked up in the derived MC
+    results cache, so a repeat Submit skips the simulation. Returns None for
+    an uncached portfolio or a pickle swept meanwhile: callers then query
+    pf_object.dcf directly.
+    """
+    if pf_key is not None:
+        try:
+            return get_mc_results(
+                pf_key,
+                pf_object.dcf.cashflow_parameters.initial_investment,
+                distribution_mc,
+                distribution_parameters_mc,
+                years_mc,
+                n_mc,
+            )
+        except FileNotFoundError:
+            logging.info(f"MC results cache: {pf_key} is gone, simulating in place")
+    return None
+
+
 def _get_wealth_data(
     pf_object,
     has_cashflow,
@@ -1919,9 +2111,18 @@ def _get_wealth_data(
     distribution_mc,
     years_mc,
     distribution_parameters_mc=None,
+    pf_key=None,
+    mc_all_paths=False,
 ):
+    """Chart frame, backtest, forecast paths and the MC fan frame of the wealth chart.
+
+    The fan frame comes from the MC results cache, with the forecast holding
+    only its example paths; it is None when the paths are simulated in place
+    (uncached portfolio, or every path asked for by mc_all_paths).
+    """
     df_backtest = pd.DataFrame()
     df_forecast = pd.DataFrame()
+    mc_fan = None
     if n_monte_carlo == 0:
         df = (
             pf_object.dcf.wealth_index(discounting="fv", include_negative_values=False)
@@ -1950,13 +2151,24 @@ def _get_wealth_data(
     if _prepare_dcf_forecast_state(
         pf_object, last_backtest_value, distribution_mc, years_mc, n_monte_carlo, distribution_parameters_mc
     ):
-        df_forecast = pf_object.dcf.monte_carlo_wealth(discounting="fv", include_negative_values=False)
+        mc_results = (
+            None
+            if mc_all_paths
+            else _get_forecast_mc_results(
+                pf_object, pf_key, distribution_mc, years_mc, n_monte_carlo, distribution_parameters_mc
+            )
+        )
+        if mc_results:
+            # Copy: the cached frame is shared with the statistics sections.
+            df_forecast, mc_fan = mc_results["sample_paths"].copy(), mc_results["fan"]
+        else:
+            df_forecast = pf_object.dcf.monte_carlo_wealth(discounting="fv", include_negative_values=False)
         for scenario in df_forecast.columns:
             _nullify_after_first_zero(df_forecast, scenario)
         df = pd.concat([df_backtest, df_forecast], axis=0, join="outer", ignore_index=False)
     else:
         df = df_backtest
-    return df, df_backtest, df_forecast, None
+    return df, df_backtest, df_forecast, mc_fan
 
 
 def _build_timeseries_figure(
@@ -1997,6 +2209,71 @@ def _build_timeseries_figure(
     return fig
 
 
+# Fan chart: percentile bands of the MC wealth paths, outermost first, plus a few example paths.
+FAN_BANDS = [(1, 99), (5, 95), (25, 75)]
+FAN_BAND_OPACITY = [0.15, 0.25, 0.4]
+
+
+def _build_mc_fan_figure(
+    pf_object: ok.Portfolio,
+    df_backtest: pd.DataFrame,
+    df_forecast: pd.DataFrame,
+    title: str,
+    log_scale: bool,
+    fan: pd.DataFrame | None = None,
+) -> tuple[go.Figure, pd.DataFrame]:
+    """Fan chart of the MC forecast and the frame it is drawn from (the chart data).
+
+    Sends ~20 traces instead of one per simulated path; the "All MC paths"
+    switch brings the full px.line chart back. ``fan`` is the cached
+    percentile frame, with ``df_forecast`` holding only the example paths;
+    without it both come from the full ``df_forecast``.
+    """
+    if fan is None:
+        fan = mc_fan_frame(df_forecast)
+    labels = dict(zip((q for q, _ in PERCENTILES), fan.columns, strict=True))
+    ind = df_forecast.index.to_timestamp("D")
+    fig = go.Figure()
+    for (low, high), opacity in zip(FAN_BANDS, FAN_BAND_OPACITY, strict=True):
+        band_name = f"{low}-{high} percentile"
+        fig.add_scatter(
+            x=ind, y=fan[labels[high]], line={"width": 0}, legendgroup=band_name, showlegend=False, hoverinfo="skip"
+        )
+        fig.add_scatter(
+            x=ind,
+            y=fan[labels[low]],
+            line={"width": 0},
+            fill="tonexty",
+            fillcolor=f"rgba(31, 119, 180, {opacity})",
+            name=band_name,
+            legendgroup=band_name,
+            hoverinfo="skip",
+        )
+    sample_paths = mc_sample_paths(df_forecast)
+    for number, column in enumerate(sample_paths.columns):
+        fig.add_scatter(
+            x=ind,
+            y=sample_paths[column],
+            line={"width": 1, "color": "rgba(100, 100, 100, 0.5)"},
+            name="Example paths",
+            legendgroup="Example paths",
+            showlegend=number == 0,
+        )
+    fig.add_scatter(x=ind, y=fan[labels[50]], line={"width": 2, "color": "rgb(31, 119, 180)"}, name="Median")
+    first_date = ind[0]
+    if not df_backtest.empty:
+        backtest_ind = df_backtest.index.to_timestamp("D")
+        fig.add_scatter(x=backtest_ind, y=df_backtest[pf_object.symbol], line={"width": 3}, name=pf_object.symbol)
+        first_date = backtest_ind[0]
+    add_crisis_rectangles(fig, first_date, ind[-1])
+    fig.update_layout(title=title, height=800, xaxis_title=None, legend_title="Monte Carlo")
+    fig.update_xaxes(rangeslider_visible=True, showgrid=False, zeroline=False)
+    fig.update_yaxes(
+        type="log" if log_scale else "linear", zeroline=True, zerolinecolor="black", zerolinewidth=1, showgrid=False
+    )
+    return fig, pd.concat([df_backtest, fan], axis=0, join="outer")
+
+
 def get_pf_figure(
     pf_object: ok.Portfolio,
     plot_type: str,
@@ -2009,6 +2286,8 @@ def get_pf_figure(
     log_scale: bool,
     cf_strategy: str = "indexation",
     distribution_parameters_monte_carlo=None,
+    pf_key: str | None = None,
+    mc_all_paths: bool = False,
 ) -> typing.Tuple[plotly.graph_objects.Figure, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     if plot_type == "distribution":
         fig = _get_distribution_figure(pf_object)
@@ -2039,8 +2318,9 @@ def get_pf_figure(
     df_backtest = pd.DataFrame()
     df_forecast = pd.DataFrame()
     return_series = None
+    mc_fan = None
     if plot_type == "wealth":
-        df, df_backtest, df_forecast, return_series = _get_wealth_data(
+        df, df_backtest, df_forecast, mc_fan = _get_wealth_data(
             pf_object,
             has_cashflow,
             n_monte_carlo,
@@ -2048,6 +2328,8 @@ def get_pf_figure(
             distribution_monte_carlo,
             years_monte_carlo,
             distribution_parameters_monte_carlo,
+            pf_key,
+            mc_all_paths,
         )
     elif plot_type == "cumulative_return":
         df = pf_object.get_cumulative_return(real=False)
@@ -2059,6 +2341,9 @@ def get_pf_figure(
         df = pf_object.drawdowns.to_frame()
         return_series = df.iloc[-1, :]
 
+    if condition_monte_carlo and not mc_all_paths and not df_forecast.empty:
+        fig, df = _build_mc_fan_figure(pf_object, df_backtest, df_forecast, titles["wealth"], log_scale, mc_fan)
+        return fig, df_backtest, df_forecast, df
     fig = _build_timeseries_figure(
         pf_object,
         df,
@@ -0,0 +1,179 @@
+"""Batched common-random-number search for the largest sustainable withdrawal (Find button).
+
+okama's ``find_the_largest_withdrawals_size`` runs one Monte Carlo wealth
+simulation per solver step (up to 22). For the amount-based strategies
+(IndexationStrategy and its CutWithdrawalsIfDrawdown subclass) the forecast
+balance of every path is affine in the withdrawal amount,
+``W(amount) = W0 + amount * U``: indexation factors and CWD drawdown cuts
+depend on the return paths only, and okama keeps negative balances until the
+wealth is voided afterwards. Two simulations on the cached return draw
+(no withdrawal and the largest one) therefore give the wealth of any amount.
+A batch of candidate amounts is scored in one array operation, the batch
+brackets the largest amount that still meets the goal, and the next batch
+refines that bracket. The objective is evaluated on the same paths for every
+candidate, so it is deterministic for a given draw.
+
+Percentage strategies (withdrawal proportional to the balance) are not affine
+and keep okama's solver.
+
+The answer differs from okama's by design. okama stops at the first Brent
+step whose error is below the tolerance, on either side of the goal, so its
+withdrawal depends on the path the root finder takes. This search returns
+the largest candidate that meets the goal, and reports success when that
+candidate is within the tolerance. Both agree on success; the amounts differ
+by at most the tolerance band around the goal (see the fixed-draw comparison
+in the tests).
+"""
+
+import numpy as np
+import okama as ok
+import pandas as pd
+from okama.common.solver import Result
+
+AFFINE_STRATEGIES = frozenset({"fixed_amount", "CWD"})
+BATCH_SIZE = 33
+REFINE_ROUNDS = 4
+# okama's find_the_largest_withdrawals_size default.
+TOLERANCE_REL = 0.10
+# Candidate x month x path cells scored per array operation (bounds the temporary arrays).
+_MAX_CELLS = 2**22
+
+
+def supports_batched_search(cashflow_parameters) -> bool:
+    return getattr(cashflow_parameters, "NAME", None) in AFFINE_STRATEGIES
+
+
+class _AffineForecast:
+    """Wealth of every MC path as a function of the withdrawal amount."""
+
+    def __init__(self, pf_object: ok.Portfolio, max_amount: float):
+        dcf = pf_object.dcf
+        strategy = dcf.cashflow_parameters
+        backup_amount = strategy.amount
+        try:
+            strategy.amount = 0.0
+            base = dcf.monte_carlo_wealth(discounting="fv", include_negative_values=True)
+            strategy.amount = max_amount
+            loaded = dcf.monte_carlo_wealth(discounting="fv", include_negative_values=True)
+        finally:
+            strategy.amount = backup_amount
+        self.base = base.to_numpy(dtype=float)
+        self.unit = (loaded.to_numpy(dtype=float) - self.base) / max_amount
+        monthly_discount_rate = (1 + dcf.discount_rate) ** (1 / 12) - 1
+        self.pv_factor = (1.0 + monthly_discount_rate) ** (self.base.shape[0] - 1)
+        # Survival period (years from the portfolio last date) of a path voided at each row,
+        # as in DCF.monte_carlo_survival_period.
+        dates = base.index.to_timestamp(freq="M")
+        self.survival_years = np.round((dates - pf_object.last_date) / np.timedelta64(365, "D"), 1).to_numpy()
+
+    def terminal_wealth(self, amounts: np.ndarray) -> np.ndarray:
+        """(candidates, paths) FV balances at the forecast end, negatives kept."""
+        return self.base[-1] + amounts[:, None] * self.unit[-1]
+
+    def survival_periods(self, amounts: np.ndarray) -> np.ndarray:
+        """(candidates, paths) survival periods: the first row where the balance is not positive."""
+        n_rows, n_paths = self.base.shape
+        chunk = max(1, _MAX_CELLS // (n_rows * n_paths))
+        periods = np.empty((amounts.size, n_paths))
+        for start in range(0, amounts.size, chunk):
+            batch = amounts[start : start + chunk]
+            voided = self.base[None] + batch[:, None, None] * self.unit[None] <= 0
+            rows = np.where(voided.any(axis=1), voided.argmax(axis=1), n_rows - 1)
+            periods[start : start + chunk] = self.survival_years[rows]
+        return periods
+
+
+def _goal_metrics(
+    forecast: _AffineForecast,
+    amounts: np.ndarray,
+    goal: str,
+    percentile: int,
+    start_investment: float,
+    mc_period: int,
+    target_survival_period: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """(condition_met, error_rel) per candidate, with the goal semantics of okama's solver."""
+    sp_at_quantile = np.percentile(forecast.survival_periods(amounts), percentile, axis=1)
+    if goal == "survival_period":
+        condition = sp_at_quantile >= target_survival_period
+        error_rel = np.abs(sp_at_quantile - target_survival_period) / target_survival_period
+        return condition, error_rel
+    terminal = forecast.terminal_wealth(amounts)
+    if goal == "maintain_balance_pv":
+        terminal = terminal / forecast.pv_factor
+    wealth_at_quantile = np.percentile(terminal, percentile, axis=1)
+    condition = (wealth_at_quantile >= start_investment) & (sp_at_quantile == mc_period)
+    error_rel = np.abs(wealth_at_quantile - start_investment) / start_investment
+    return condition, error_rel
+
+
+def find_largest_withdrawal(
+    pf_object: ok.Portfolio,
+    goal: str,
+    percentile: int = 20,
+    target_survival_period: int = 25,
+) -> Result:
+    """Largest regular withdrawal (0-100% of the initial investment a year) that meets ``goal``.
+
+    Takes the arguments of ``DCF.find_the_largest_withdrawals_size`` with its
+    default range and tolerance, and returns the same Result fields. pf.dcf
+    must carry the forecast state and an amount-based strategy (see
+    supports_batched_search). Unlike okama, which accepts the first attempt
+    within the tolerance, the answer is the largest withdrawal that meets the
+    goal (module docstring).
+    """
+    if goal not in ("maintain_balance_pv", "maintain_balance_fv", "survival_period"):
+        raise ValueError("The goal can be: maintain_balance_fv, maintain_balance_pv or survival_period.")
+    if not 0 <= percentile <= 100:
+        raise ValueError("percentile must be between 0 and 100")
+    mc_period = pf_object.dcf.mc.period
+    if goal == "survival_period" and target_survival_period > mc_period * (1 - TOLERANCE_REL):
+        raise ValueError(f"target_survival_period must be less than Monte Carlo simulation period ({mc_period}).")
+
+    strategy = pf_object.dcf.cashflow_parameters
+    start_investment = strategy.initial_investment
+    periods_per_year = strategy.periods_per_year
+    max_withdrawal = -start_investment / periods_per_year
+    forecast = _AffineForecast(pf_object, max_withdrawal)
+
+    attempts = []
+    low, high = max_withdrawal, 0.0  # low: largest withdrawal (numerically smallest amount)
+    best = None  # (amount, error_rel) of the largest withdrawal meeting the goal
+    for _ in range(REFINE_ROUNDS):
+        amounts = np.linspace(low, high, BATCH_SIZE)
+        condition, error_rel = _goal_metrics(
+            forecast, amounts, goal, percentile, start_investment, mc_period, target_survival_period
+        )
+        attempts.append(pd.DataFrame({"withdrawal_abs": amounts, "error_rel": error_rel}))
+        met = np.flatnonzero(condition)
+        if met.size == 0 or met[0] == 0:
+            # Nothing in the bracket meets the goal, or even its largest withdrawal does:
+            # the answer lies outside the range (first round) or at this precision.
+            if met.size:
+                best = (amounts[0], error_rel[0])
+            break
+        first = met[0]
+        best = (amounts[first], error_rel[first])
+        low, high = amounts[first - 1], amounts[first]
+
+    solutions = pd.concat(attempts, ignore_index=True)
+    solutions["withdrawal_rel"] = np.abs(solutions["withdrawal_abs"] / start_investment * periods_per_year)
+    if best is None or best[0] == max_withdrawal or best[1] >= TOLERANCE_REL:
+        # No candidate meets the goal inside the range, or the goal is met at its very
+        # end, or not within tolerance: report the attempt closest to the goal.
+        closest = solutions.loc[solutions["error_rel"].idxmin()]
+        return Result(
+            success=False,
+            withdrawal_abs=float(closest["withdrawal_abs"]),
+            withdrawal_rel=float(closest["withdrawal_rel"]),
+            error_rel=float(closest["error_rel"]),
+            solutions=solutions,
+        )
+    amount, error_rel = best
+    return Result(
+        success=True,
+        withdrawal_abs=float(amount),
+        withdrawal_rel=float(abs(amount / start_investment * periods_per_year)),
+        error_rel=float(error_rel),
+        solutions=solutions,
+    )
@@ -22,7 +22,7 @@ _KS_DISTRIBUTIONS = [("Normal", "norm"), ("Lognormal", "lognorm"), ("Student's T
 
 
 def test_kstest_values_delegate_to_okama_frame():
-    from pages.portfolio.portfolio import compute_distribution_stats
+    from pages.portfolio.distribution_cache import compute_distribution_stats
 
     pf = make_mock_portfolio()
     ror = pf.ror.dropna()
@@ -35,7 +35,7 @@ def test_kstest_values_delegate_to_okama_frame():
 
 
 def test_moments_and_jarque_bera_delegate_to_okama_frame():
-    from pages.portfolio.portfolio import compute_distribution_stats
+    from pages.portfolio.distribution_cache import compute_distribution_stats
 
     pf = make_mock_portfolio()
     ror = pf.ror.dropna()
@@ -49,7 +49,7 @@ def test_moments_and_jarque_bera_delegate_to_okama_frame():
     assert stats["jarque_bera"]["p-value"] == pytest.approx(expected_jb["p-value"])
 
 
-def test_distribution_figure_lognormal_fit_on_gross_returns():
+def test_distribution_figure_lognormal_fit_on_gross_returns(null_cache):
     """The fitted-PDF overlay fits the lognormal on gross returns (1 + r) with
     floc=0 — the same way the KS test does (okama Frame.kstest_series) — instead of
     on raw sign-mixed returns. Keeps the plotted curve consistent with the test and
@@ -8,6 +8,21 @@ import dash.exceptions
 pytestmark = pytest.mark.component
 
 FRONTIER_MODULE = "pages.efficient_frontier.frontier"
+EF_CACHE_MODULE = "pages.efficient_frontier.ef_cache"
+
+
+@pytest.fixture(autouse=True)
+def simple_cache():
+    # A fresh cache per test: the EF metadata records (and the memoized Find
+    # optimizations) must not leak between tests sharing "file.pkl".
+    from flask import Flask
+
+    import common
+
+    app = Flask(__name__)
+    common.cache.init_app(app, config={"CACHE_TYPE": "SimpleCache"})
+    with app.app_context():
+        yield common.cache
 
 
 def _make_mock_ef_object(rebalancing_period: str = "month"):
@@ -141,6 +156,41 @@ class TestDisplayClickData:
         assert len(badges) == 1
         assert badges[0].children == "Monte-Carlo Simulation"
 
+    def test_cloud_point_weights_looked_up_by_point_number(self):
+        # Monte Carlo / grid points carry no customdata: the curve's weights
+        # handle and the point number resolve them server-side.
+        from pages.efficient_frontier.frontier import display_click_data
+
+        mock_ef = _make_mock_ef_object()
+        click_data = {"points": [{"x": 10.0, "y": 7.5, "curveNumber": 1, "pointNumber": 3}]}
+        source = {"kind": "mc", "args": ["ef-derived", "file.pkl", 1000, "Geometric"]}
+        cloud_weights = [None, source]
+
+        with (
+            patch(f"{FRONTIER_MODULE}.load_ef_object", return_value=mock_ef),
+            patch(f"{FRONTIER_MODULE}.lookup_cloud_weights", return_value=[60.0, 40.0]) as lookup,
+        ):
+            card, link = display_click_data(
+                click_data, 1, ["SPY.US", "BND.US"], "file.pkl", 0.0, ["EF", "MC"], cloud_weights
+            )
+
+        lookup.assert_called_once_with(source, 3)
+        assert len(_by_class(card, "pf-asset-row")) == 2
+        assert "weights=60.0,40.0" in link
+
+    def test_expired_cloud_weights_render_note_card(self):
+        from pages.efficient_frontier.frontier import display_click_data
+
+        click_data = {"points": [{"x": 10.0, "y": 7.5, "curveNumber": 1, "pointNumber": 3}]}
+
+        with patch(f"{FRONTIER_MODULE}.lookup_cloud_weights", return_value=None):
+            card, link = display_click_data(
+                click_data, 1, ["SPY.US", "BND.US"], "file.pkl", 0.0, ["EF", "MC"], [None, {"kind": "mc", "args": []}]
+            )
+
+        assert _by_class(card, "pf-note")[0].children == "Weights: unavailable for this point."
+        assert link is None
+
     def test_no_badge_when_curve_number_out_of_range(self):
         from pages.efficient_frontier.frontier import display_click_data
 
@@ -278,7 +328,7 @@ class TestFindPortfolio:
             find_portfolio(1, 8.0, None, 0.0)
 
     def test_optimized_portfolio_with_ticker_keys(self):
-        from pages.efficient_frontier.frontier import find_portfolio
+        from pages.efficient_frontier.frontier import refine_found_portfolio
 
         mock_ef = _make_mock_ef_object()
         optimized = {
@@ -293,7 +343,7 @@ class TestFindPortfolio:
             patch(f"{FRONTIER_MODULE}.load_ef_object", return_value=mock_ef),
             patch(f"{FRONTIER_MODULE}.get_minimized_risk_portfolio", return_value=optimized),
         ):
-            card, link = find_portfolio(1, 8.5, "file.pkl", 0.0)
+            card, link = refine_found_portfolio({"file_name": "file.pkl", "target": 0.085}, 0.0)
 
         texts = _texts(card)
         assert "Mean return" in texts
@@ -313,7 +363,7 @@ class TestFindPortfolio:
         assert "ccy=" not in link
 
     def test_sharpe_from_cagr_risk_and_rf_rate(self):
-        from pages.efficient_frontier.frontier import find_portfolio
+        from pages.efficient_frontier.frontier import refine_found_portfolio
 
         mock_ef = _make_mock_ef_object()
         optimized = {
@@ -328,14 +378,14 @@ class TestFindPortfolio:
             patch(f"{FRONTIER_MODULE}.load_ef_object", return_value=mock_ef),
             patch(f"{FRONTIER_MODULE}.get_minimized_risk_portfolio", return_value=optimized),
         ):
-            card, _ = find_portfolio(1, 8.5, "file.pkl", 2.0)
+            card, _ = refine_found_portfolio({"file_name": "file.pkl", "target": 0.085}, 2.0)
 
         texts = _texts(card)
         assert "Sharpe" in texts
         assert "0.50" in texts  # (8.00 - 2.0) / 12.00
 
     def test_optimized_portfolio_with_weights_list_key(self):
-        from pages.efficient_frontier.frontier import find_portfolio
+        from pages.efficient_frontier.frontier import refine_found_portfolio
 
         mock_ef = _make_mock_ef_object()
         optimized = {
@@ -349,7 +399,7 @@ class TestFindPortfolio:
             patch(f"{FRONTIER_MODULE}.load_ef_object", return_value=mock_ef),
             patch(f"{FRONTIER_MODULE}.get_minimized_risk_portfolio", return_value=optimized),
         ):
-            card, link = find_portfolio(1, 7.0, "file.pkl", 0.0)
+            card, link = refine_found_portfolio({"file_name": "file.pkl", "target": 0.07}, 0.0)
 
         texts = _texts(card)
         assert "7.00%" in texts
@@ -360,7 +410,7 @@ class TestFindPortfolio:
         assert link is not None
 
     def test_no_solution_when_no_weights_in_result(self):
-        from pages.efficient_frontier.frontier import find_portfolio
+        from pages.efficient_frontier.frontier import refine_found_portfolio
 
         mock_ef = _make_mock_ef_object()
         optimized = {
@@ -373,14 +423,14 @@ class TestFindPortfolio:
             patch(f"{FRONTIER_MODULE}.load_ef_object", return_value=mock_ef),
             patch(f"{FRONTIER_MODULE}.get_minimized_risk_portfolio", return_value=optimized),
         ):
-            children, link = find_portfolio(1, 7.0, "file.pkl", 0.0)
+            children, link = refine_found_portfolio({"file_name": "file.pkl", "target": 0.07}, 0.0)
 
         assert "No solution was found." in _texts(children)
         assert _by_class(children, "pf-card") == []
         assert link is None
 
     def test_recursion_error_returns_no_solution(self):
-        from pages.efficient_frontier.frontier import find_portfolio
+        from pages.efficient_frontier.frontier import refine_found_portfolio
 
         mock_ef = _make_mock_ef_object()
 
@@ -391,7 +441,7 @@ class TestFindPortfolio:
                 side_effect=RecursionError,
             ),
         ):
-            children, link = find_portfolio(1, 8.0, "file.pkl", 0.0)
+            children, link = refine_found_portfolio({"file_name": "file.pkl", "target": 0.08}, 0.0)
 
         assert "No solution was found." in _texts(children)
         assert link is None
@@ -399,7 +449,7 @@ class TestFindPortfolio:
     def test_runtime_error_returns_no_solution(self):
         # okama's minimize_risk raises RuntimeError when the target CAGR is
         # unreachable — must render "No solution", not crash with a 500.
-        from pages.efficient_frontier.frontier import find_portfolio
+        from pages.efficient_frontier.frontier import refine_found_portfolio
 
         mock_ef = _make_mock_ef_object()
 
@@ -410,13 +460,13 @@ class TestFindPortfolio:
                 side_effect=RuntimeError("No solution found for target CAGR value: 0.1395."),
             ),
         ):
-            children, link = find_portfolio(1, 13.95, "file.pkl", 0.0)
+            children, link = refine_found_portfolio({"file_name": "file.pkl", "target": 0.1395}, 0.0)
 
         assert "No solution was found." in _texts(children)
         assert link is None
 
     def test_none_stats_are_skipped(self):
-        from pages.efficient_frontier.frontier import find_portfolio
+        from pages.efficient_frontier.frontier import refine_found_portfolio
 
         mock_ef = _make_mock_ef_object()
         optimized = {
@@ -428,7 +478,7 @@ class TestFindPortfolio:
             patch(f"{FRONTIER_MODULE}.load_ef_object", return_value=mock_ef),
             patch(f"{FRONTIER_MODULE}.get_minimized_risk_portfolio", return_value=optimized),
         ):
-            card, link = find_portfolio(1, 8.0, "file.pkl", 0.0)
+            card, link = refine_found_portfolio({"file_name": "file.pkl", "target": 0.08}, 0.0)
 
         texts = _texts(card)
         assert "Mean return" not in texts
@@ -440,7 +490,7 @@ class TestFindPortfolio:
         assert link is not None
 
     def test_backtest_link_carries_rebalancing_period(self):
-        from pages.efficient_frontier.frontier import find_portfolio
+        from pages.efficient_frontier.frontier import refine_found_portfolio
 
         mock_ef = _make_mock_ef_object(rebalancing_period="quarter")
         optimized = {
@@ -455,26 +505,182 @@ class TestFindPortfolio:
             patch(f"{FRONTIER_MODULE}.load_ef_object", return_value=mock_ef),
             patch(f"{FRONTIER_MODULE}.get_minimized_risk_portfolio", return_value=optimized),
         ):
-            _, link = find_portfolio(1, 8.5, "file.pkl", 0.0)
+            _, link = refine_found_portfolio({"file_name": "file.pkl", "target": 0.085}, 0.0)
 
         assert "rebal=quarter" in link
 
-    def test_target_value_divided_by_100(self):
+    def test_target_value_divided_by_100_and_rounded_for_refinement(self):
+        # Targets are rounded to the card's 0.01% precision, so nearby targets
+        # share one cached optimization.
         from pages.efficient_frontier.frontier import find_portfolio
 
         mock_ef = _make_mock_ef_object()
-        optimized = {
-            "Mean return": 0.085,
-            "CAGR": 0.08,
-            "Risk": 0.12,
-            "SPY.US": 0.6,
-            "BND.US": 0.4,
-        }
+
+        with patch(f"{FRONTIER_MODULE}.load_ef_object", return_value=mock_ef):
+            *_, refine = find_portfolio(1, 8.50003, "file.pkl", 0.0)
+
+        assert refine == {"file_name": "file.pkl", "target": 0.085}
+
+    def test_refinement_runs_the_exact_optimization(self):
+        from pages.efficient_frontier.frontier import refine_found_portfolio
+
+        optimized = {"CAGR": 0.085, "Risk": 0.12, "SPY.US": 0.6, "BND.US": 0.4}
 
         with (
-            patch(f"{FRONTIER_MODULE}.load_ef_object", return_value=mock_ef),
+            patch(f"{FRONTIER_MODULE}.load_ef_object", return_value=_make_mock_ef_object()),
             patch(f"{FRONTIER_MODULE}.get_minimized_risk_portfolio", return_value=optimized) as mock_min,
         ):
-            find_portfolio(1, 8.5, "file.pkl", 0.0)
+            card, _ = refine_found_portfolio({"file_name": "file.pkl", "target": 0.085}, 0.0)
 
         mock_min.assert_called_once_with("file.pkl", 0.085)
+        assert _by_class(card, "pf-note") == []
+
+    def test_empty_refine_request_raises_prevent_update(self):
+        from pages.efficient_frontier.frontier import refine_found_portfolio
+
+        with pytest.raises(dash.exceptions.PreventUpdate):
+            refine_found_portfolio(None, 0.0)
+
+    @staticmethod
+    def _ef_with_frontier():
+        import pandas as pd
+
+        mock_ef = _make_mock_ef_object()
+        # Three minimize_risk points, then a maximized-risk point past the top CAGR
+        # (full_frontier) that must not be interpolated on.
+        mock_ef.ef_points = pd.DataFrame(
+            {
+                "Risk": [0.04, 0.08, 0.16, 0.30],
+                "CAGR": [0.04, 0.06, 0.10, 0.08],
+                "SPY.US": [0.0, 0.4, 1.0, 0.9],
+                "BND.US": [1.0, 0.6, 0.0, 0.1],
+            }
+        )
+        return mock_ef
+
+    def test_approximate_answer_interpolated_from_frontier_points(self):
+        from pages.efficient_frontier.frontier import APPROXIMATE_NOTE, find_portfolio
+
+        with (
+            patch(f"{FRONTIER_MODULE}.load_ef_object", return_value=self._ef_with_frontier()),
+            patch(f"{FRONTIER_MODULE}.get_minimized_risk_portfolio") as mock_min,
+        ):
+            card, link, refine = find_portfolio(1, 8.0, "file.pkl", 0.0)
+
+        mock_min.assert_not_called()
+        texts = _texts(card)
+        assert "8.00%" in texts  # CAGR
+        assert "12.00%" in texts  # Risk, halfway between 8% and 16%
+        assert "70.00%" in texts  # SPY.US
+        assert "30.00%" in texts  # BND.US
+        assert _by_class(card, "pf-note")[0].children == APPROXIMATE_NOTE
+        assert "weights=70.0,30.0" in link
+        assert refine is None  # no exact optimization unless asked for
+
+    def test_exact_switch_requests_the_refinement(self):
+        from pages.efficient_frontier.frontier import REFINING_NOTE, find_portfolio
+
+        with patch(f"{FRONTIER_MODULE}.load_ef_object", return_value=self._ef_with_frontier()):
+            card, _, refine = find_portfolio(1, 8.0, "file.pkl", 0.0, True)
+
+        assert _by_class(card, "pf-note")[0].children == REFINING_NOTE
+        assert refine == {"file_name": "file.pkl", "target": 0.08}
+
+    def test_target_on_a_frontier_point_is_exact_without_refinement(self):
+        from pages.efficient_frontier.frontier import find_portfolio
+
+        with patch(f"{FRONTIER_MODULE}.load_ef_object", return_value=self._ef_with_frontier()):
+            card, link, refine = find_portfolio(1, 6.004, "file.pkl", 0.0, True)
+
+        texts = _texts(card)
+        assert "6.00%" in texts
+        assert "8.00%" in texts  # the point's own risk
+        assert _by_class(card, "pf-note") == []
+        assert "weights=40.0,60.0" in link
+        assert refine is None
+
+    def test_target_outside_frontier_points_waits_for_the_optimizer(self):
+        import pandas as pd
+
+        from pages.efficient_frontier.frontier import find_portfolio
+
+        mock_ef = _make_mock_ef_object()
+        mock_ef.ef_points = pd.DataFrame(
+            {"Risk": [0.04, 0.16], "CAGR": [0.04, 0.10], "SPY.US": [0.0, 1.0], "BND.US": [1.0, 0.0]}
+        )
+
+        with patch(f"{FRONTIER_MODULE}.load_ef_object", return_value=mock_ef):
+            card, link, refine = find_portfolio(1, 12.0, "file.pkl", 0.0)
+
+        assert _texts(card) == ["Optimizing..."]
+        assert link is None
+        assert refine == {"file_name": "file.pkl", "target": 0.12}
+
+
+class TestEfMetadata:
+    @pytest.fixture
+    def pickle_version(self):
+        # "file.pkl" is not on disk: stand in for its object-cache entry version.
+        with patch(f"{EF_CACHE_MODULE}.entry_version", return_value=1) as version:
+            yield version
+
+    @staticmethod
+    def _ef_object():
+        import pandas as pd
+
+        ef = _make_mock_ef_object(rebalancing_period="year")
+        ef.ef_points = pd.DataFrame(
+            {"Risk": [0.05, 0.2], "CAGR": [0.031, 0.094], "SPY.US": [0.0, 1.0], "BND.US": [1.0, 0.0]}
+        )
+        return ef
+
+    def test_callbacks_read_the_record_without_loading_the_frontier(self, pickle_version):
+        from pages.efficient_frontier.ef_cache import store_ef_metadata
+        from pages.efficient_frontier.frontier import display_click_data, find_portfolio, show_max_min_return
+
+        store_ef_metadata("file.pkl", self._ef_object())
+        click_data = {"points": [{"x": 10.0, "y": 7.5, "customdata": [60.0, 40.0]}]}
+        with patch(f"{FRONTIER_MODULE}.load_ef_object", side_effect=AssertionError("frontier unpickled")):
+            _, click_link = display_click_data(click_data, 1, ["SPY.US", "BND.US"], "file.pkl", 0.0, [])
+            _, find_link, _ = find_portfolio(1, 8.0, "file.pkl", 0.0)
+            cagr_range = show_max_min_return(1, "file.pkl")
+
+        for link in (click_link, find_link):
+            assert "tickers=SPY.US,BND.US" in link
+            assert "first_date=2020-01" in link
+            assert "last_date=2024-12" in link
+            assert "rebal=year" in link
+        assert cagr_range == "Portfolios CAGR range: 3.10 - 9.40%"
+
+    def test_missing_record_is_rebuilt_from_the_pickle(self, pickle_version):
+        from pages.efficient_frontier.ef_cache import read_ef_metadata
+        from pages.efficient_frontier.frontier import show_max_min_return
+
+        with patch(f"{FRONTIER_MODULE}.load_ef_object", return_value=self._ef_object()) as load:
+            show_max_min_return(1, "file.pkl")
+            show_max_min_return(1, "file.pkl")
+
+        load.assert_called_once_with("file.pkl")
+        assert read_ef_metadata("file.pkl")["cagr_range"] == [0.031, 0.094]
+
+    def test_rebuilt_pickle_gets_a_new_record(self, pickle_version):
+        import pandas as pd
+
+        from pages.efficient_frontier.ef_cache import read_ef_metadata, store_ef_metadata
+        from pages.efficient_frontier.frontier import show_max_min_return
+
+        store_ef_metadata("file.pkl", self._ef_object())
+        pickle_version.return_value = 2  # rebuilt with a new month of data
+        rebuilt = self._ef_object()
+        rebuilt.ef_points = pd.DataFrame({"Risk": [0.05, 0.2], "CAGR": [0.02, 0.05]})
+
+        with patch(f"{FRONTIER_MODULE}.load_ef_object", return_value=rebuilt):
+            assert show_max_min_return(1, "file.pkl") == "Portfolios CAGR range: 2.00 - 5.00%"
+        assert read_ef_metadata("file.pkl")["cagr_range"] == [0.02, 0.05]
+
+    def test_no_record_without_the_pickle(self):
+        from pages.efficient_frontier.ef_cache import read_ef_metadata, store_ef_metadata
+
+        store_ef_metadata("file.pkl", self._ef_object())
+
+        assert read_ef_metadata("file.pkl") is None
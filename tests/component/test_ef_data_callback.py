@@ -46,7 +46,7 @@ class TestUpdateEfCards:
             patch(f"{FRONTIER_MODULE}.prepare_ef", return_value=fig1),
             patch(f"{FRONTIER_MODULE}.prepare_transition_map", return_value=fig2),
         ):
-            r_fig1, r_fig2, config1, config2, file_name, trace_names = update_ef_cards(
+            r_fig1, r_fig2, config1, config2, file_name, trace_names, cloud_weights = update_ef_cards(
                 screen=None,
                 n_clicks=1,
                 selected_symbols=["AAPL.US", "MSFT.US"],
@@ -66,6 +66,7 @@ class TestUpdateEfCards:
         assert isinstance(r_fig1, go.Figure)
         assert isinstance(r_fig2, go.Figure)
         assert file_name == "test.pkl"
+        assert cloud_weights == []
 
     def test_empty_symbols_raises_prevent_update(self):
         from pages.efficient_frontier.frontier import update_ef_cards
@@ -95,7 +96,7 @@ class TestUpdateEfCards:
             f"{FRONTIER_MODULE}.get_or_create_ef_object",
             side_effect=ValueError("EF failed"),
         ):
-            fig1, fig2, c1, c2, fname, trace_names = update_ef_cards(
+            fig1, fig2, c1, c2, fname, trace_names, cloud_weights = update_ef_cards(
                 screen=None,
                 n_clicks=1,
                 selected_symbols=["AAPL.US"],
@@ -115,6 +116,7 @@ class TestUpdateEfCards:
         assert isinstance(fig1, go.Figure)
         assert fname is None
         assert trace_names == []
+        assert cloud_weights == []
 
     def test_ef_points_multiplied_by_100(self):
         from pages.efficient_frontier.frontier import update_ef_cards
@@ -193,7 +195,7 @@ class TestUpdateEfCards:
             patch(f"{FRONTIER_MODULE}.prepare_ef", return_value=fig1),
             patch(f"{FRONTIER_MODULE}.prepare_transition_map", return_value=go.Figure()),
         ):
-            *_, trace_names = update_ef_cards(
+            *_, trace_names, _ = update_ef_cards(
                 screen=None,
                 n_clicks=1,
                 selected_symbols=["AAPL.US", "MSFT.US"],
@@ -226,7 +228,7 @@ def test_grid_trace_added_when_grid_step_set():
     )
     ef_object = MagicMock()
     ef_object.symbols = ["A.US", "B.US"]
-    ef_object.get_grid_portfolios.return_value = pd.DataFrame(
+    grid = pd.DataFrame(
         {
             "Risk": [0.06, 0.07, 0.08],
             "CAGR": [0.05, 0.06, 0.07],
@@ -242,12 +244,13 @@ def test_grid_trace_added_when_grid_step_set():
         "grid_step": 0.5,
     }
 
-    fig = _prepare_single_ef(ef, ef_object, ef_options, fig=go.Figure(), include_assets=False, ef_cache_key=None)
+    with patch("pages.efficient_frontier.point_cloud.get_grid_portfolios", return_value=grid) as get_grid:
+        fig = _prepare_single_ef(ef, ef_object, ef_options, fig=go.Figure(), include_assets=False, ef_cache_key=None)
 
     grid_traces = [trace for trace in fig.data if trace.name == "Grid portfolios"]
     assert len(grid_traces) == 1
     assert list(grid_traces[0].x) == pytest.approx([6.0, 7.0, 8.0])  # Risk * 100
-    ef_object.get_grid_portfolios.assert_called_once_with(step=0.5, max_points=_settings.GRID_POINT_BUDGET)
+    get_grid.assert_called_once_with(ef_object, step=0.5, max_points=_settings.GRID_POINT_BUDGET)
 
 
 def test_customdata_serializes_as_json_lists_for_clickdata():
@@ -400,3 +403,84 @@ def test_monte_carlo_mode_passes_n_and_no_grid_step():
 
     assert captured["ef_options"]["grid_step"] is None
     assert captured["ef_options"]["n_monte_carlo"] == 100
+
+
+def test_monte_carlo_cloud_is_webgl_with_weights_kept_server_side():
+    # Up to MC_EF_MAX points: no per-point customdata in the figure. The trace
+    # meta points at the memoized cloud data, which repeat Submits share and
+    # the click looks the weights up in.
+    from flask import Flask
+
+    import common
+    from pages.efficient_frontier.prepare_ef_plot import (
+        _prepare_single_ef,
+        cloud_weights_handle,
+        lookup_cloud_weights,
+    )
+
+    ef = pd.DataFrame({"Risk": [0.05, 0.10], "CAGR": [0.04, 0.08], "A.US": [1.0, 0.0], "B.US": [0.0, 1.0]})
+    ef_object = MagicMock()
+    ef_object.symbols = ["A.US", "B.US"]
+    mc = pd.DataFrame(
+        {
+            "Risk": [0.06, 0.07, 0.08],
+            "CAGR": [0.05, 0.06, 0.07],
+            "A.US": [0.5, 0.3, 0.2],
+            "B.US": [0.5, 0.7, 0.8],
+        }
+    )
+    ef_options = {"return_type": "Geometric", "mdp": "Off", "cml": "Off", "n_monte_carlo": 3, "grid_step": None}
+
+    app = Flask(__name__)
+    common.cache.init_app(app, config={"CACHE_TYPE": "SimpleCache"})
+    with (
+        app.app_context(),
+        patch("pages.efficient_frontier.prepare_ef_plot.load_ef_object", return_value=ef_object),
+        patch("pages.efficient_frontier.point_cloud.get_monte_carlo", return_value=mc) as get_monte_carlo,
+    ):
+        figures = [
+            _prepare_single_ef(ef, ef_object, ef_options, fig=go.Figure(), include_assets=False, ef_cache_key="ef.pkl")
+            for _ in range(2)
+        ]
+
+        get_monte_carlo.assert_called_once()
+        clouds = [trace for fig in figures for trace in fig.data if trace.name == "Monte-Carlo Simulation"]
+        assert all(isinstance(cloud, go.Scattergl) and cloud.customdata is None for cloud in clouds)
+        assert list(clouds[0].x) == pytest.approx([6.0, 7.0, 8.0])
+        handle = cloud_weights_handle(clouds[0])
+        assert cloud_weights_handle(clouds[1]) == handle
+        assert lookup_cloud_weights(handle, 1) == pytest.approx([30.0, 70.0])
+        assert lookup_cloud_weights(handle, 3) is None
+        assert [cloud_weights_handle(trace) for trace in figures[0].data if trace is not clouds[0]] == [None]
+
+        # Handle of a page rendered before the weights format changed.
+        assert lookup_cloud_weights({"kind": "mc", "args": ["v1", "ef.pkl", 3, "Geometric"]}, 1) is None
+
+        # Evicted: the weights are unavailable, not those of a new random draw.
+        common.cache.clear()
+        assert lookup_cloud_weights(handle, 1) is None
+        get_monte_carlo.assert_called_once()
+
+
+def test_cloud_weights_lookup_reads_one_chunk():
+    from flask import Flask
+
+    import common
+    from pages.efficient_frontier.prepare_ef_plot import (
+        CLOUD_WEIGHTS_CHUNK,
+        _store_cloud_weights,
+        lookup_cloud_weights,
+    )
+
+    weights = np.arange(2 * (CLOUD_WEIGHTS_CHUNK + 5), dtype=float).reshape(-1, 2)
+    app = Flask(__name__)
+    common.cache.init_app(app, config={"CACHE_TYPE": "SimpleCache"})
+    with app.app_context():
+        _store_cloud_weights("ef-cloud-weights:test", weights)
+        with patch.object(common.cache, "get", wraps=common.cache.get) as cache_get:
+            assert lookup_cloud_weights({"key": "ef-cloud-weights:test"}, CLOUD_WEIGHTS_CHUNK + 2) == list(
+                weights[CLOUD_WEIGHTS_CHUNK + 2]
+            )
+
+        cache_get.assert_called_once_with("ef-cloud-weights:test:1")
+        assert lookup_cloud_weights({"key": "ef-cloud-weights:test"}, len(weights)) is None
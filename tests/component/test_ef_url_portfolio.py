@@ -119,7 +119,7 @@ class TestGetPortfolioPoint:
         kwargs = mock_goc.call_args.kwargs
         assert kwargs["obj_type"] == "portfolio"
         assert kwargs["cache_key_params"]["weights"] == [0.6, 0.4]
-        assert kwargs["cache_key_params"]["purpose"] == "ef_point"
+        assert kwargs["cache_key_params"]["inflation"] is False
 
     def test_constructor_builds_portfolio_with_fraction_weights(self):
         from pages.efficient_frontier import ef_cache
@@ -78,7 +78,7 @@ def test_pf_statistics_grid_sorting_disabled():
     _assert_sorting_disabled([grid], expected_count=1)
 
 
-def test_distribution_ks_grid_sorting_disabled():
+def test_distribution_ks_grid_sorting_disabled(null_cache):
     from pages.portfolio.portfolio import get_statistics_for_distribution
 
     statistics_html = get_statistics_for_distribution(make_mock_portfolio())
@@ -0,0 +1,97 @@
+"""
+Heavy callbacks (Portfolio Submit, Find, EF Submit) run inline by default and as
+Dash background callbacks when OKAMA_JOB_QUEUE configures a manager.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from dash import Input, Output
+
+from common.job_queue import get_job_manager, heavy_callback, progress_output, report_progress
+
+pytestmark = pytest.mark.component
+
+
+def _register(manager, progress_spinner=None):
+    callback_map, callback_list = {}, []
+
+    def work(value):
+        report_progress("halfway")
+        return value * 2
+
+    with patch("common.job_queue.get_job_manager", return_value=manager):
+        decorated = heavy_callback(
+            Output("out", "children"),
+            Input("in", "value"),
+            progress_spinner=progress_spinner,
+            callback_map=callback_map,
+            callback_list=callback_list,
+        )(work)
+    return decorated, work, callback_map["out.children"], callback_list[0]
+
+
+def test_inline_mode_registers_a_plain_callback():
+    decorated, work, _, spec = _register(None, progress_spinner="pf-submit-spinner")
+
+    assert decorated is work
+    assert spec["background"] is None
+    assert decorated(3) == 6  # report_progress outside a job is a no-op
+
+
+def test_queue_mode_registers_a_background_callback_with_progress():
+    manager = MagicMock()
+    decorated, work, entry, spec = _register(manager, progress_spinner="pf-submit-spinner")
+
+    assert decorated is work
+    assert entry["manager"] is manager
+    assert spec["background"] == {"interval": 1000}
+    assert [str(o) for o in entry["background"]["progress"]] == [str(progress_output("pf-submit-spinner"))]
+
+
+def test_job_forwards_report_progress_to_dash():
+    manager = MagicMock()
+    callback_map = {}
+    captured = {}
+
+    def fake_register(*args, **kwargs):
+        def wrap(func):
+            captured["job"] = func
+            return func
+
+        return wrap
+
+    with (
+        patch("common.job_queue.get_job_manager", return_value=manager),
+        patch("common.job_queue.dash.callback", side_effect=fake_register),
+    ):
+        heavy_callback(
+            Output("out", "children"), Input("in", "value"), progress_spinner="s", callback_map=callback_map
+        )(lambda value: report_progress(f"step {value}") or value)
+
+    set_progress = MagicMock()
+    assert captured["job"](set_progress, 5) == 5
+    set_progress.assert_called_once_with("step 5")
+    report_progress("after the job")
+    set_progress.assert_called_once()
+
+
+def test_manager_is_disabled_under_tests(monkeypatch):
+    monkeypatch.setenv("OKAMA_JOB_QUEUE", "diskcache")
+    monkeypatch.setenv("TESTING", "1")
+    get_job_manager.cache_clear()
+    try:
+        assert get_job_manager() is None
+    finally:
+        get_job_manager.cache_clear()
+
+
+def test_unknown_mode_is_rejected(monkeypatch):
+    monkeypatch.setenv("OKAMA_JOB_QUEUE", "celery")
+    monkeypatch.delenv("TESTING", raising=False)
+    get_job_manager.cache_clear()
+    try:
+        with pytest.raises(ValueError, match="OKAMA_JOB_QUEUE"):
+            get_job_manager()
+    finally:
+        get_job_manager.cache_clear()
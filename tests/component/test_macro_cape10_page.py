@@ -94,7 +94,7 @@ class TestMainCallback:
             assert control in inputs
         assert "first-date" not in inputs and "last-date" not in inputs
         assert "submit" not in inputs
-        assert not spec["state"]
+        assert [s["id"] for s in spec["state"]] == ["store"]  # screen info only adapts the layout
 
     def test_error_renders_annotation(self, cape_page):
         with patch.object(cape_page.macro_objects, "get_indicator_object", side_effect=ValueError("nope")):
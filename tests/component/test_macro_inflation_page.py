@@ -143,7 +143,7 @@ class TestReactiveWiring:
 
     def test_every_control_is_an_input(self, infl_page):
         # Reactive page: changing any control recalculates immediately — all
-        # controls are Inputs (no Submit button, no States).
+        # controls are Inputs (no Submit button; the screen info is the only State).
         from dash._callback import GLOBAL_CALLBACK_LIST
 
         spec = next(s for s in GLOBAL_CALLBACK_LIST if "infl-chart.figure" in str(s["output"]))
@@ -151,7 +151,7 @@ class TestReactiveWiring:
         for control in ("infl-series", "infl-plot-type", "infl-rates-overlay", "infl-first-date", "infl-last-date"):
             assert control in inputs
         assert "submit" not in inputs
-        assert not spec["state"]
+        assert [s["id"] for s in spec["state"]] == ["store"]  # screen info only adapts the layout
 
 
 class TestLayout:
@@ -130,7 +130,7 @@ class TestMainCallback:
         assert "first-date" not in inputs and "last-date" not in inputs
         assert "submit" not in inputs
         assert "rates-group" not in inputs
-        assert not spec["state"]
+        assert [s["id"] for s in spec["state"]] == ["store"]  # screen info only adapts the layout
 
 
 class TestLayoutAndLink:
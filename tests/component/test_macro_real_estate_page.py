@@ -169,7 +169,7 @@ class TestReactiveWiring:
         for control in ("re-series", "re-plot-type", "re-ccy", "re-first-date", "re-last-date"):
             assert control in inputs
         assert "submit" not in inputs
-        assert not spec["state"]
+        assert [s["id"] for s in spec["state"]] == ["store"]  # screen info only adapts the layout
         assert not spec["prevent_initial_call"]
 
 
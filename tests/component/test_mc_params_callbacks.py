@@ -205,6 +205,7 @@ class TestCallbackRegistration:
         assert bound.__name__ == "auto_estimate_distribution_parameters"
 
 
+@pytest.mark.usefixtures("null_cache")
 class TestAutoEstimateDistributionParameters:
     def _form_state(self, **overrides):
         state = {
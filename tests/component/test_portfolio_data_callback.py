@@ -171,6 +171,11 @@ class TestUpdateGrafPortfolioInner:
         assert patched_pf_inner.dcf.discount_rate is None
 
 
+def _filled_bins(trace) -> list[float]:
+    """Centres of the non-empty bins of a pre-binned histogram bar trace."""
+    return [x for x, y in zip(trace.x, trace.y, strict=True) if y > 0]
+
+
 def _pf_with_mc_stats():
     pf = make_mock_portfolio()
     pf.dcf.monte_carlo_survival_period.return_value = pd.Series([20.0, 25.0, 30.0])
@@ -305,9 +310,9 @@ class TestMcStatisticsTabs:
         figure = _section_graph(result).figure
         assert len(figure.data) == 1
         trace = figure.data[0]
-        assert trace.type == "histogram"
-        assert trace.histnorm == "probability"
-        assert list(trace.x) == [45.0, 50.0, 55.0]
+        assert trace.type == "bar"
+        assert _filled_bins(trace) == pytest.approx([45.5, 50.5, 54.5])
+        assert sum(trace.y) == pytest.approx(1.0)
 
     def test_wealth_histogram_overlays_fv_and_pv(self):
         from pages.portfolio.portfolio import get_forecast_wealth_statistics_section
@@ -317,8 +322,10 @@ class TestMcStatisticsTabs:
         figure = _section_graph(result).figure
         assert figure.layout.barmode == "overlay"
         assert [trace.name for trace in figure.data] == ["FV", "PV"]
-        assert list(figure.data[0].x) == [200.0, 250.0]
-        assert list(figure.data[1].x) == [100.0, 125.0]
+        # Shared bins over 100..250: FV and PV land in their own bins.
+        assert _filled_bins(figure.data[0]) == pytest.approx([197.5, 242.5])
+        assert _filled_bins(figure.data[1]) == pytest.approx([107.5, 122.5])
+        assert list(figure.data[0].width) == list(figure.data[1].width)
 
     def test_wealth_series_exclude_negative_balances(self):
         # A depleted portfolio balance is 0, never negative: both FV and PV
@@ -342,7 +349,8 @@ class TestMcStatisticsTabs:
         result = get_forecast_survival_statistics_section(pd.DataFrame({"x": [1]}), pd.DataFrame(), pf)
 
         figure = _section_graph(result).figure
-        assert list(figure.data[0].x) == [25.0, 25.0, 25.0]
+        assert list(figure.data[0].x) == [25.0]
+        assert list(figure.data[0].y) == [1.0]
 
     def test_empty_forecast_renders_table_only(self):
         # Backtest-only branch has no MC series — nothing to plot, no tabs.
@@ -613,8 +621,8 @@ class TestCashflowIrrSection:
         section = self._build(_irr_pf([0.04, float("nan"), 0.06]))
 
         figure = _section_graph(section).figure
-        assert figure.data[0].histnorm == "probability"
-        assert list(figure.data[0].x) == [0.04, 0.06]
+        assert _filled_bins(figure.data[0]) == pytest.approx([0.041, 0.059])
+        assert sum(figure.data[0].y) == pytest.approx(1.0)
         assert figure.layout.xaxis.tickformat == ".1%"
 
     def test_compact_stacks_pairs_in_single_column(self):
@@ -650,7 +658,7 @@ class TestCashflowIrrSection:
 
 class TestUpdateGrafPortfolioOuter:
     # Outputs: fig, config, stats, survival, wealth, cashflow IRR, chart data,
-    # toast is_open, toast children — toast sits at positions 7/8.
+    # toast is_open, toast children, deferred forecast request — toast sits at positions 7/8.
     def test_exception_opens_toast_with_message(self):
         from pages.portfolio.portfolio import update_graf_portfolio
 
@@ -684,7 +692,7 @@ class TestUpdateGrafPortfolioOuter:
                 n_clicks=1,
             )
 
-        assert len(result) == 9
+        assert len(result) == 10
 
     def test_success_closes_toast(self, patched_pf_inner):
         from pages.portfolio.portfolio import update_graf_portfolio
@@ -699,7 +707,7 @@ class TestUpdateGrafPortfolioOuter:
             )
 
         assert result[7] is False
-        assert len(result) == 9
+        assert len(result) == 10
 
     def test_log_scale_toggle_no_update_toast(self):
         import dash
@@ -799,3 +807,183 @@ class TestMonteCarloForecastZeroTermination:
         alive = df_forecast[1]
         assert alive.notna().all()
         assert (alive > 0).all()
+
+
+class TestProgressiveForecast:
+    def test_backtest_stage_defers_monte_carlo(self, patched_pf_inner):
+        from pages.portfolio.portfolio import _update_graf_portfolio_inner
+
+        patched_pf_inner.dcf.monte_carlo_wealth = MagicMock()
+        args = _default_args()
+        args["n_monte_carlo"] = 100
+        with patch(
+            f"{PF_MODULE}.get_pf_figure", return_value=(go.Figure(), pd.DataFrame(), pd.DataFrame(), pd.DataFrame())
+        ) as figure:
+            result = _update_graf_portfolio_inner(**args, backtest_only=True)
+
+        assert figure.call_args.args[4] == 0  # n_monte_carlo: backtest chart only
+        patched_pf_inner.dcf.monte_carlo_wealth.assert_not_called()
+        for section in result[3:6]:
+            assert "Running Monte Carlo simulation" in str(section)
+
+    def test_submit_with_forecast_returns_request(self, patched_pf_inner):
+        from pages.portfolio.portfolio import update_graf_portfolio
+
+        args = _default_args()
+        args["n_monte_carlo"] = 100
+        with (
+            patch(f"{PF_MODULE}.dash.ctx") as mock_ctx,
+            patch(f"{PF_MODULE}._update_graf_portfolio_inner", return_value=(None,) * 6 + ("chart-data:1",)) as inner,
+        ):
+            mock_ctx.triggered_id = "pf-submit-button"
+            result = update_graf_portfolio(**args, n_clicks=1)
+
+        assert inner.call_args.kwargs["backtest_only"] is True
+        request = result[9]
+        assert request["n_monte_carlo"] == 100
+        assert request["assets"] == ["AAPL.US", "MSFT.US"]
+        assert request["chart_data"] == "chart-data:1"
+
+    def test_submit_without_forecast_clears_request(self, patched_pf_inner):
+        from pages.portfolio.portfolio import update_graf_portfolio
+
+        with patch(f"{PF_MODULE}.dash.ctx") as mock_ctx:
+            mock_ctx.triggered_id = "pf-submit-button"
+            result = update_graf_portfolio(**_default_args(), n_clicks=1)
+
+        assert result[9] is None
+
+    def test_forecast_stage_skips_the_statistics_grid(self, patched_pf_inner):
+        from pages.portfolio.portfolio import update_pf_forecast
+
+        request = {
+            **_default_args(),
+            "n_monte_carlo": 100,
+            "distribution_parameters_monte_carlo": None,
+            "chart_data": "chart-data:1",
+        }
+        with (
+            patch(f"{PF_MODULE}.get_pf_statistics_table") as statistics,
+            patch(f"{PF_MODULE}._get_forecast_sections", return_value=("survival", "wealth", "irr")) as sections,
+            patch(f"{PF_MODULE}.store_chart_data", return_value="chart-data:1") as store,
+        ):
+            result = update_pf_forecast(request, False, True)
+
+        statistics.assert_not_called()
+        sections.assert_called_once()
+        assert result[2:5] == ("survival", "wealth", "irr")
+        # The first stage's chart data is overwritten, not left behind.
+        assert store.call_args.args[1] == "chart-data:1"
+        assert result[5] == "chart-data:1"
+        assert result[6:] == (False, "")
+
+    def test_forecast_stage_draws_the_forecast_with_current_switches(self, patched_pf_inner):
+        from pages.portfolio.portfolio import get_pf_figure, update_pf_forecast
+
+        request = {**_default_args(), "n_monte_carlo": 100, "distribution_parameters_monte_carlo": None}
+        with patch(f"{PF_MODULE}._get_forecast_sections", return_value=(None,) * 3):
+            update_pf_forecast(request, True, True)
+
+        args, kwargs = get_pf_figure.call_args
+        assert args[1] == "wealth"
+        assert args[4] == 100  # n_monte_carlo: the forecast itself
+        assert args[8] is True  # log scale
+        assert kwargs["mc_all_paths"] is True
+        assert kwargs["pf_key"] == "test.pkl"
+
+    def test_forecast_stage_error_opens_toast(self):
+        from pages.portfolio.portfolio import update_pf_forecast
+
+        with patch(f"{PF_MODULE}._update_pf_forecast_inner", side_effect=ValueError("boom")):
+            result = update_pf_forecast({**_default_args(), "n_monte_carlo": 100}, False, False)
+
+        assert len(result) == 8
+        assert result[6] is True
+        assert "boom" in result[7]
+
+    def test_cleared_request_is_ignored(self):
+        import dash
+        from pages.portfolio.portfolio import update_pf_forecast
+
+        with pytest.raises(dash.exceptions.PreventUpdate):
+            update_pf_forecast(None, False, False)
+
+
+def _mc_frames(n_paths=200, months=24):
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    backtest = pd.DataFrame(
+        {"TestPF.PF": [1000.0, 1100.0, 1200.0]}, index=pd.period_range("2024-10", periods=3, freq="M")
+    )
+    forecast = pd.DataFrame(
+        1200.0 + rng.normal(0, 100, (months, n_paths)).cumsum(axis=0),
+        index=pd.period_range("2025-01", periods=months, freq="M"),
+    )
+    return backtest, forecast
+
+
+class TestMonteCarloFanChart:
+    def test_fan_frame_matches_pandas_quantiles(self):
+        from pages.portfolio.mc_cache import PERCENTILES, mc_fan_frame
+
+        _, forecast = _mc_frames()
+        forecast.iloc[10:, 3] = float("nan")  # depleted path: balance 0 from then on
+        fan = mc_fan_frame(forecast)
+
+        expected = forecast.fillna(0).quantile([q / 100 for q, _ in PERCENTILES], axis=1).T
+        assert list(fan.columns) == [f"{q}{suffix} percentile" for q, suffix in PERCENTILES]
+        assert fan.to_numpy() == pytest.approx(expected.to_numpy())
+
+    def test_fan_figure_sends_bands_and_sample_paths_only(self):
+        from pages.portfolio.portfolio import _build_mc_fan_figure
+
+        pf = make_mock_portfolio()
+        pf.symbol = "TestPF.PF"
+        backtest, forecast = _mc_frames()
+        fig, data = _build_mc_fan_figure(pf, backtest, forecast, "Portfolio Wealth Index", log_scale=True)
+
+        # 3 bands x 2 edges + 10 example paths + median + backtest
+        assert len(fig.data) == 18
+        assert fig.layout.yaxis.type == "log"
+        assert len(data) == len(backtest) + len(forecast)
+        assert "50th percentile" in data.columns
+
+    @pytest.mark.parametrize(("all_paths", "n_traces"), [(False, 18), (True, 201)])
+    def test_all_paths_switch_restores_full_chart(self, all_paths, n_traces):
+        from pages.portfolio.portfolio import get_pf_figure
+
+        pf = make_mock_portfolio()
+        pf.symbol = "TestPF.PF"
+        backtest, forecast = _mc_frames()
+        df = pd.concat([backtest, forecast])
+        with patch(f"{PF_MODULE}._get_wealth_data", return_value=(df, backtest, forecast, None)):
+            fig, _, _, _ = get_pf_figure(pf, "wealth", False, 2, 200, 2, "norm", "yes", False, mc_all_paths=all_paths)
+
+        assert len(fig.data) == n_traces
+
+
+class TestPreBinnedHistograms:
+    def test_payload_does_not_grow_with_the_sample(self):
+        import numpy as np
+
+        from pages.portfolio.portfolio import _get_survival_distribution_figure
+
+        fsp = pd.Series(np.random.default_rng(1).uniform(5, 40, 100_000))
+        trace = _get_survival_distribution_figure(fsp).data[0]
+
+        assert len(trace.x) == 50
+        assert sum(trace.y) == pytest.approx(1.0)
+
+    def test_bars_match_numpy_histogram(self):
+        import numpy as np
+
+        from pages.portfolio.portfolio import _histogram_bar, _mc_histogram_bins
+
+        values = pd.Series(np.random.default_rng(2).normal(0, 1, 500))
+        edges = _mc_histogram_bins([values])
+        bar = _histogram_bar(values, edges)
+
+        counts, _ = np.histogram(values, bins=edges)
+        assert list(bar.y) == pytest.approx(list(counts / 500))
+        assert list(bar.width) == pytest.approx(list(np.diff(edges)))
@@ -0,0 +1,126 @@
+"""
+Screen info (the app-wide "store") adapts chart layouts in the browser; it is
+State, not a trigger, of the data callbacks, so it never re-runs a computation.
+"""
+
+import importlib
+
+import dash._callback
+import pytest
+
+pytestmark = pytest.mark.component
+
+GRAPHS = [
+    "pf-wealth-indexes",
+    "al-wealth-indexes",
+    "benchmark-graph",
+    "ef-graf",
+    "ef-transition-map-graf",
+    "infl-chart",
+    "cape-chart",
+    "rates-chart",
+    "re-chart",
+]
+
+
+PAGES = [
+    "pages.portfolio.portfolio",
+    "pages.compare.compare",
+    "pages.benchmark.benchmark",
+    "pages.efficient_frontier.frontier",
+    "pages.macro.inflation",
+    "pages.macro.cape10",
+    "pages.macro.rates",
+    "pages.macro.real_estate",
+]
+
+
+@pytest.fixture(autouse=True, scope="module")
+def _pages_registered(_dash_app):
+    for module in PAGES:
+        importlib.import_module(module)
+
+
+def _callbacks_for(graph_id):
+    return [cb for cb in dash._callback.GLOBAL_CALLBACK_LIST if f"{graph_id}.figure" in cb["output"]]
+
+
+@pytest.mark.parametrize("graph_id", GRAPHS)
+def test_layout_is_adapted_client_side(graph_id):
+    adapters = [cb for cb in _callbacks_for(graph_id) if cb.get("clientside_function")]
+
+    assert len(adapters) == 1
+    assert [(i["id"], i["property"]) for i in adapters[0]["inputs"]] == [(graph_id, "figure"), ("store", "data")]
+    assert adapters[0]["prevent_initial_call"]
+
+
+@pytest.mark.parametrize("graph_id", GRAPHS)
+def test_screen_info_does_not_trigger_computation(graph_id):
+    data_callbacks = [cb for cb in _callbacks_for(graph_id) if not cb.get("clientside_function")]
+
+    assert data_callbacks
+    for cb in data_callbacks:
+        assert "store" not in [i["id"] for i in cb["inputs"]]
+
+
+def _run_adapt_js(figure, in_width):
+    """Run the client-side adapter in node: (figure, config), or None for no_update."""
+    import json
+    import shutil
+    import subprocess
+
+    import plotly.io as pio
+
+    from common.mobile_screens import _ADAPT_JS
+
+    if shutil.which("node") is None:
+        pytest.skip("node is not installed")
+    script = (
+        "var dash_clientside = {no_update: null};"
+        f"var adapt = ({_ADAPT_JS});"
+        f"console.log(JSON.stringify(adapt({pio.to_json(figure)}, {{in_width: {in_width}}})));"
+    )
+    figure_out, config = json.loads(subprocess.run(["node", "-e", script], capture_output=True, check=True).stdout)
+    return None if figure_out is None else (figure_out, config)
+
+
+def _layout(figure) -> dict:
+    import json
+
+    import plotly.io as pio
+
+    layout = json.loads(pio.to_json(figure))["layout"] if not isinstance(figure, dict) else dict(figure["layout"])
+    layout.pop("template", None)
+    return layout
+
+
+def _chart():
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Scatter(x=[1, 2], y=[3, 4], name="PF"))
+    fig.update_layout(legend={"title": {"text": "Assets"}}, yaxis_title="Wealth", margin={"l": 50})
+    return fig
+
+
+def test_client_side_mobile_layout_matches_the_server():
+    from common.mobile_screens import adopt_small_screens
+
+    mobile, config = adopt_small_screens(_chart(), {"in_width": 400})
+    figure_out, config_out = _run_adapt_js(_chart(), 400)
+
+    assert _layout(figure_out) == _layout(mobile)
+    assert config_out == config
+
+
+def test_back_to_desktop_restores_the_desktop_layout():
+    # Resize / rotation back to a wide screen: the server-built desktop layout
+    # (axis titles, margins, mode bar) comes back from the stash in layout.meta.
+    from common.mobile_screens import adopt_small_screens
+
+    mobile, _ = adopt_small_screens(_chart(), {"in_width": 400})
+    desktop, config = adopt_small_screens(_chart(), {"in_width": 1200})
+    figure_out, config_out = _run_adapt_js(mobile, 1200)
+
+    assert _layout(figure_out) == _layout(desktop)
+    assert config_out == config
+    assert _run_adapt_js(desktop, 1200) is None
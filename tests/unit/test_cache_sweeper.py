@@ -0,0 +1,84 @@
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+SWEEPER_MODULE = "common.cache_sweeper"
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    with patch("common.object_cache._cache_dir", tmp_path), patch("common.object_cache._shm_dir", None):
+        yield tmp_path
+
+
+def _expired_pickle(cache_dir):
+    from common.object_cache import CACHE_FORMAT_VERSION
+
+    path = cache_dir / f"rate-OLD-cv={CACHE_FORMAT_VERSION}.pkl"
+    path.write_bytes(b"x")
+    old_time = time.time() - 40 * 24 * 3600
+    os.utime(path, (old_time, old_time))
+    return path
+
+
+class TestSweepOnce:
+    def test_removes_expired_pickles(self, cache_dir):
+        from common.cache_sweeper import sweep_once
+
+        path = _expired_pickle(cache_dir)
+        sweep_once(force=True)
+        assert not path.exists()
+
+    def test_errors_are_logged_not_raised(self, cache_dir):
+        from common.cache_sweeper import sweep_once
+
+        with patch("common.object_cache.cleanup_expired_files", side_effect=OSError("disk gone")):
+            sweep_once()
+
+
+class TestCacheSweeper:
+    def test_thread_sweeps_until_stopped(self, cache_dir):
+        from common.cache_sweeper import CacheSweeper
+
+        path = _expired_pickle(cache_dir)
+        with patch(f"{SWEEPER_MODULE}.random.uniform", return_value=0):
+            sweeper = CacheSweeper(interval_seconds=0.05)
+            sweeper.start()
+            deadline = time.monotonic() + 5
+            while path.exists() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            sweeper.stop()
+            sweeper.join(timeout=5)
+
+        assert not path.exists()
+        assert not sweeper.is_alive()
+
+    def test_start_sweeper_disabled_by_env(self, monkeypatch):
+        from common.cache_sweeper import start_sweeper
+
+        monkeypatch.setenv("OKAMA_CACHE_SWEEPER", "off")
+        assert start_sweeper() is None
+
+    def test_start_sweeper_is_idempotent(self, monkeypatch):
+        import common.cache_sweeper as cache_sweeper
+
+        monkeypatch.delenv("OKAMA_CACHE_SWEEPER", raising=False)
+        monkeypatch.setattr(cache_sweeper, "_sweeper", None)
+        with patch.object(cache_sweeper.CacheSweeper, "run"):
+            first = cache_sweeper.start_sweeper()
+            first.join(timeout=5)
+            with patch.object(first, "is_alive", return_value=True):
+                assert cache_sweeper.start_sweeper() is first
+
+
+class TestCli:
+    def test_once_runs_single_forced_pass(self, cache_dir):
+        from common.cache_sweeper import main
+
+        path = _expired_pickle(cache_dir)
+        main(["--once", "--force"])
+        assert not path.exists()
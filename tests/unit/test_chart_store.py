@@ -0,0 +1,85 @@
+"""Chart data behind the Download buttons is kept server-side, the browser store holds a handle."""
+
+from unittest.mock import patch
+
+import dash
+import pandas as pd
+import pytest
+from flask import Flask
+
+import common
+from common.chart_store import HANDLE_PREFIX, load_chart_data, store_chart_data
+from common.xlsx import chart_data_to_download_xlsx_object
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def simple_cache():
+    app = Flask(__name__)
+    common.cache.init_app(app, config={"CACHE_TYPE": "SimpleCache"})
+    with app.app_context():
+        yield common.cache
+
+
+def _frame():
+    index = pd.period_range("2020-01", periods=3, freq="M")
+    return pd.DataFrame({"PF.PF": [1000.0, 1010.0, 1005.5], 0: [1000.0, 990.0, 1020.0]}, index=index)
+
+
+def test_store_returns_a_short_handle(simple_cache):
+    df = _frame()
+    handle = store_chart_data(df)
+
+    assert handle.startswith(HANDLE_PREFIX)
+    assert len(handle) < 64
+    loaded = load_chart_data(handle)
+    assert list(loaded.index) == ["2020-01", "2020-02", "2020-03"]
+    assert loaded.to_numpy().tolist() == df.to_numpy().tolist()
+
+
+def test_handles_are_unique_per_request(simple_cache):
+    assert store_chart_data(_frame()) != store_chart_data(_frame())
+
+
+def test_later_stage_overwrites_the_handle(simple_cache):
+    handle = store_chart_data(_frame())
+    forecast = _frame() * 2
+
+    assert store_chart_data(forecast, handle) == handle
+    assert load_chart_data(handle).to_numpy().tolist() == forecast.to_numpy().tolist()
+
+
+def test_legacy_json_store_is_still_read():
+    json_data = pd.DataFrame({"a": [1, 2]}).to_json(orient="split")
+
+    assert load_chart_data(json_data)["a"].tolist() == [1, 2]
+
+
+def test_unavailable_cache_falls_back_to_json():
+    with patch("common.chart_store.cache.set", side_effect=ConnectionError("redis is down")):
+        stored = store_chart_data(_frame())
+
+    assert not stored.startswith(HANDLE_PREFIX)
+    assert load_chart_data(stored)["PF.PF"].tolist() == [1000.0, 1010.0, 1005.5]
+
+
+def test_expired_handle_prevents_download(simple_cache):
+    handle = store_chart_data(_frame())
+    simple_cache.delete(handle)
+
+    assert load_chart_data(handle) is None
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        chart_data_to_download_xlsx_object(handle)
+
+
+def test_download_resolves_the_handle(simple_cache):
+    result = chart_data_to_download_xlsx_object(store_chart_data(_frame()))
+
+    assert result["filename"] == "okama.xlsx"
+    assert result["base64"]
+
+
+def test_empty_store_prevents_download():
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        chart_data_to_download_xlsx_object(None)
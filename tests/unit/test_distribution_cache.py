@@ -0,0 +1,82 @@
+from unittest.mock import MagicMock
+
+import pytest
+from flask import Flask
+
+import common
+
+pytestmark = pytest.mark.unit
+
+
+def _mock_pf(ror_values=(0.01, -0.02, 0.03), name="TEST.PF"):
+    import pandas as pd
+
+    pf = MagicMock()
+    pf.ror = pd.Series(ror_values, index=pd.period_range("2020-01", periods=len(ror_values), freq="M"), name=name)
+    pf.dcf.mc.get_parameters_for_distribution.return_value = (0.0071234567, 0.0412345678)
+    pf.dcf.mc.optimize_df_for_students.return_value = 4.25
+    return pf
+
+
+@pytest.fixture
+def distribution_cache():
+    from pages.portfolio import distribution_cache
+
+    app = Flask(__name__)
+    common.cache.init_app(app, config={"CACHE_TYPE": "SimpleCache"})
+    with app.app_context():
+        yield distribution_cache
+
+
+class TestDistributionFitCache:
+    def test_repeat_lookup_skips_the_fit(self, distribution_cache):
+        pf = _mock_pf()
+        first = distribution_cache.get_distribution_fit(pf, "mc_parameters", "norm")
+        second = distribution_cache.get_distribution_fit(pf, "mc_parameters", "norm")
+
+        assert first == second == (0.007123, 0.041235)
+        assert pf.dcf.mc.get_parameters_for_distribution.call_count == 1
+
+    def test_distribution_and_var_level_are_part_of_the_key(self, distribution_cache):
+        pf = _mock_pf()
+        distribution_cache.get_distribution_fit(pf, "mc_parameters", "norm")
+        distribution_cache.get_distribution_fit(pf, "mc_parameters", "t")
+        distribution_cache.get_distribution_fit(pf, "students_df", 5)
+        distribution_cache.get_distribution_fit(pf, "students_df", 1)
+        distribution_cache.get_distribution_fit(pf, "students_df", 5)
+
+        assert pf.dcf.mc.get_parameters_for_distribution.call_count == 2
+        assert pf.dcf.mc.optimize_df_for_students.call_count == 2
+
+    def test_portfolios_with_the_same_returns_share_fits(self, distribution_cache):
+        # e.g. two Submits that differ in cash flow or inflation only, and the form's ror-only portfolio
+        submit = _mock_pf(name="MY.PF")
+        form = _mock_pf(name="portfolio_1234.PF")
+        distribution_cache.get_distribution_fit(submit, "students_df", 5)
+        df = distribution_cache.get_distribution_fit(form, "students_df", 5)
+
+        assert df == 4.25
+        form.dcf.mc.optimize_df_for_students.assert_not_called()
+
+    def test_new_returns_are_refitted(self, distribution_cache):
+        pf = _mock_pf()
+        rebuilt = _mock_pf(ror_values=(0.01, -0.02, 0.03, 0.005))  # a new month of data
+        distribution_cache.get_distribution_fit(pf, "students_df", 5)
+        distribution_cache.get_distribution_fit(rebuilt, "students_df", 5)
+
+        rebuilt.dcf.mc.optimize_df_for_students.assert_called_once_with(5)
+        assert rebuilt.dcf.mc.distribution == "t"
+
+    def test_pdf_fits_use_gross_returns_for_lognormal(self):
+        import numpy as np
+        import pandas as pd
+        from scipy.stats import lognorm
+
+        from pages.portfolio.distribution_cache import fit_pdf_parameters
+
+        pf = MagicMock()
+        pf.ror = pd.Series(np.random.default_rng(3).normal(0.006, 0.04, 120))
+        fits = fit_pdf_parameters(pf)
+
+        assert set(fits) == {"t", "norm", "lognorm"}
+        assert fits["lognorm"] == pytest.approx(lognorm.fit(pf.ror + 1.0, floc=0))
@@ -0,0 +1,144 @@
+"""Pairwise plot: one cached two-asset frontier per pair, computed in a pool when pairs are missing."""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from flask import Flask
+
+import common
+
+pytestmark = pytest.mark.unit
+
+MODULE = "pages.efficient_frontier.prepare_ef_plot"
+
+
+class _FakePairEF:
+    """okama.EfficientFrontier stand-in: a 3-point frontier of the two assets."""
+
+    built = []
+
+    def __init__(self, assets, **kwargs):
+        self.symbols = [asset.symbol for asset in assets]
+        _FakePairEF.built.append(tuple(self.symbols))
+        first, second = self.symbols
+        self.ef_points = pd.DataFrame(
+            {
+                "Risk": [0.1, 0.15, 0.2],
+                "Mean return": [0.05, 0.06, 0.07],
+                "CAGR": [0.04, 0.05, 0.06],
+                first: [1.0, 0.5, 0.0],
+                second: [0.0, 0.5, 1.0],
+            }
+        )
+
+
+def _universe(symbols):
+    return SimpleNamespace(
+        symbols=symbols,
+        asset_obj_dict={symbol: SimpleNamespace(symbol=symbol) for symbol in symbols},
+        currency="USD",
+        first_date=pd.Timestamp("2015-01"),
+        last_date=pd.Timestamp("2024-12"),
+        n_points=3,
+    )
+
+
+@pytest.fixture
+def pairwise():
+    from pages.efficient_frontier import prepare_ef_plot
+
+    app = Flask(__name__)
+    common.cache.init_app(app, config={"CACHE_TYPE": "SimpleCache"})
+    _FakePairEF.built = []
+    with app.app_context(), patch(f"{MODULE}.okama.EfficientFrontier", _FakePairEF):
+        yield prepare_ef_plot
+
+
+def test_every_pair_is_expanded_to_the_universe(pairwise):
+    with patch(f"{MODULE}._pair_executor", return_value=nullcontext()):
+        frontiers = pairwise._build_pairwise_frontiers(_universe(["A.US", "B.US", "C.US"]))
+
+    assert [f["name"] for f in frontiers] == ["A.US / B.US", "A.US / C.US", "B.US / C.US"]
+    assert frontiers[1]["risk"] == pytest.approx([10.0, 15.0, 20.0])
+    assert frontiers[1]["cagr"] == pytest.approx([4.0, 5.0, 6.0])
+    np.testing.assert_allclose(frontiers[1]["weights"], [[100, 0, 0], [50, 0, 50], [0, 0, 100]])
+
+
+def test_pairs_are_reused_across_universes(pairwise):
+    with patch(f"{MODULE}._pair_executor", return_value=nullcontext()):
+        pairwise._build_pairwise_frontiers(_universe(["A.US", "B.US", "C.US"]))
+        frontiers = pairwise._build_pairwise_frontiers(_universe(["C.US", "A.US", "D.US"]))
+
+    # Only the pairs with the new asset are optimized; C/A is the cached A/C frontier.
+    assert _FakePairEF.built == [
+        ("A.US", "B.US"),
+        ("A.US", "C.US"),
+        ("B.US", "C.US"),
+        ("C.US", "D.US"),
+        ("A.US", "D.US"),
+    ]
+    assert frontiers[0]["name"] == "C.US / A.US"
+    np.testing.assert_allclose(frontiers[0]["weights"], [[0, 100, 0], [50, 50, 0], [100, 0, 0]])
+
+
+def test_pair_key_depends_on_the_settings(pairwise):
+    kwargs = pairwise._pair_ef_kwargs(_universe(["A.US", "B.US"]))
+    key = pairwise._pair_cache_key(["A.US", "B.US"], kwargs)
+
+    assert pairwise._pair_cache_key(["B.US", "A.US"], kwargs) == key
+    assert pairwise._pair_cache_key(["A.US", "B.US"], {**kwargs, "ccy": "EUR"}) != key
+    assert pairwise._pair_cache_key(["A.US", "B.US"], {**kwargs, "last_date": pd.Timestamp("2025-01")}) != key
+
+
+def test_missing_pairs_are_fanned_out_to_the_pool(pairwise):
+    with (
+        ThreadPoolExecutor(max_workers=2) as executor,
+        patch(f"{MODULE}._pair_executor", return_value=nullcontext(executor)),
+    ):
+        with patch.object(executor, "map", wraps=executor.map) as pool_map:
+            frontiers = pairwise._build_pairwise_frontiers(_universe(["A.US", "B.US", "C.US", "D.US"]))
+
+    pool_map.assert_called_once()
+    assert len(frontiers) == 6
+    assert sorted(_FakePairEF.built) == sorted(
+        [("A.US", "B.US"), ("A.US", "C.US"), ("A.US", "D.US"), ("B.US", "C.US"), ("B.US", "D.US"), ("C.US", "D.US")]
+    )
+
+
+def test_pool_is_opt_in(monkeypatch):
+    from pages.efficient_frontier.prepare_ef_plot import _pair_executor
+
+    monkeypatch.delenv("TESTING", raising=False)
+    monkeypatch.delenv("OKAMA_EF_PAIR_WORKERS", raising=False)
+    with _pair_executor(6) as executor:
+        assert executor is None
+
+
+def test_pool_is_shut_down_after_the_batch(monkeypatch):
+    from pages.efficient_frontier.prepare_ef_plot import _pair_executor
+
+    monkeypatch.delenv("TESTING", raising=False)
+    monkeypatch.setenv("OKAMA_EF_PAIR_WORKERS", "4")
+    with _pair_executor(2) as executor:
+        assert executor._max_workers == 2
+
+    assert executor._shutdown_thread
+
+
+def test_pool_is_not_used_when_the_app_is_main(monkeypatch):
+    import sys
+
+    import dash
+
+    from pages.efficient_frontier.prepare_ef_plot import _pair_executor
+
+    monkeypatch.delenv("TESTING", raising=False)
+    monkeypatch.setenv("OKAMA_EF_PAIR_WORKERS", "4")
+    monkeypatch.setitem(sys.modules, "__main__", SimpleNamespace(app=dash.Dash(__name__)))
+    with _pair_executor(6) as executor:
+        assert executor is None
@@ -0,0 +1,88 @@
+"""Vectorized EF Monte Carlo and grid clouds, checked against okama's per-portfolio loops."""
+
+from types import SimpleNamespace
+
+import numpy as np
+import okama as ok
+import pandas as pd
+import pytest
+
+from pages.efficient_frontier import point_cloud
+
+pytestmark = pytest.mark.unit
+
+SYMBOLS = ["A.US", "B.US", "C.US", "D.US"]
+
+
+def _ef_object(period: str, n_months: int = 155, bounds=None):
+    rng = np.random.default_rng(3)
+    index = pd.period_range("2010-03", periods=n_months, freq="M")
+    ror = pd.DataFrame(rng.normal(0.007, 0.04, (n_months, len(SYMBOLS))), index=index, columns=SYMBOLS)
+    return SimpleNamespace(
+        assets_ror=ror,
+        symbols=SYMBOLS,
+        bounds=bounds,
+        rebalancing_strategy=ok.Rebalance(period=period),
+        _labels_mode="tickers",
+        _asset_labels=lambda mode: SYMBOLS,
+    )
+
+
+@pytest.mark.parametrize("period", ["none", "month", "quarter", "half-year", "year"])
+def test_grid_matches_okama(period):
+    ef_object = _ef_object(period)
+
+    expected = ok.EfficientFrontier.get_grid_portfolios(ef_object, step=0.25, max_points=5000)
+    result = point_cloud.get_grid_portfolios(ef_object, step=0.25, max_points=5000)
+
+    assert list(result.columns) == list(expected.columns)
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=1e-10, atol=1e-12)
+
+
+def test_monte_carlo_matches_okama_on_the_same_draw():
+    ef_object = _ef_object("year")
+
+    np.random.seed(11)
+    expected = ok.EfficientFrontier.get_monte_carlo(ef_object, n=200)
+    np.random.seed(11)
+    result = point_cloud.get_monte_carlo(ef_object, n=200)
+
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=1e-10, atol=1e-12)
+
+
+def test_monte_carlo_respects_bounds():
+    ef_object = _ef_object("quarter", bounds=((0.0, 0.5), (0.1, 0.2), (0.0, 1.0), (0.0, 1.0)))
+
+    result = point_cloud.get_monte_carlo(ef_object, n=300)
+
+    assert len(result) == 300
+    assert result["A.US"].max() <= 0.5 + 1e-9
+    assert result["B.US"].between(0.1 - 1e-9, 0.2 + 1e-9).all()
+    np.testing.assert_allclose(result[SYMBOLS].sum(axis=1), 1.0)
+
+
+def test_large_clouds_are_scored_in_chunks(monkeypatch):
+    ef_object = _ef_object("month")
+    weights = np.random.default_rng(5).dirichlet(np.ones(len(SYMBOLS)), size=50)
+    whole = point_cloud.score_portfolios(ef_object, weights)
+
+    monkeypatch.setattr(point_cloud, "_MAX_CELLS", 155 * 7)
+    chunked = point_cloud.score_portfolios(ef_object, weights)
+
+    pd.testing.assert_frame_equal(chunked, whole)
+
+
+def test_cagr_is_undefined_below_a_year():
+    result = point_cloud.score_portfolios(_ef_object("month", n_months=10), np.full((2, 4), 0.25))
+
+    assert result["CAGR"].isna().all()
+    assert result["Risk"].notna().all()
+
+
+@pytest.mark.parametrize("deviation", [{"abs_deviation": 0.05}, {"rel_deviation": 0.1}])
+def test_threshold_rebalancing_is_rejected(deviation):
+    ef_object = _ef_object("year")
+    ef_object.rebalancing_strategy = ok.Rebalance(period="year", **deviation)
+
+    with pytest.raises(ValueError, match="calendar rebalancing"):
+        point_cloud.get_monte_carlo(ef_object, n=10)
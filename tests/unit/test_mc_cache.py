@@ -0,0 +1,207 @@
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+from flask import Flask
+
+import common
+
+pytestmark = pytest.mark.unit
+
+MC_MODULE = "pages.portfolio.mc_cache"
+
+
+def _mock_pf():
+    pf = MagicMock()
+    wealth_fv = pd.DataFrame({0: [100.0, 200.0], 1: [150.0, 0.0]})
+    pf.dcf.monte_carlo_wealth.side_effect = lambda discounting="fv", include_negative_values=True: (
+        wealth_fv if discounting == "fv" else wealth_fv / 2
+    )
+    pf.dcf.monte_carlo_survival_period.return_value = pd.Series([20.0, 1.5])
+    pf.dcf.monte_carlo_irr.return_value = pd.Series([0.05, -0.1])
+    pf.dcf.cashflow_parameters.initial_investment = 1000.0
+    # The cache simulates on a deep copy; keep it the mock itself so calls can be counted.
+    pf.__deepcopy__ = lambda memo: pf
+    return pf
+
+
+@pytest.fixture
+def mc_cache():
+    from pages.portfolio import mc_cache
+
+    app = Flask(__name__)
+    common.cache.init_app(app, config={"CACHE_TYPE": "SimpleCache"})
+    with app.app_context():
+        yield mc_cache
+
+
+def _args(**overrides):
+    args = {
+        "file_name": "portfolio_abc.pkl",
+        "initial_investment": 1000.0,
+        "distribution": "norm",
+        "distribution_parameters": None,
+        "years": 10,
+        "mc_number": 100,
+    }
+    return {**args, **overrides}
+
+
+class TestMonteCarloResultsCache:
+    def test_repeat_lookup_skips_simulation(self, mc_cache):
+        pf = _mock_pf()
+        with (
+            patch(f"{MC_MODULE}.load_cached", return_value=pf),
+            patch(f"{MC_MODULE}.entry_version", return_value=1),
+        ):
+            first = mc_cache.get_mc_results(**_args())
+            second = mc_cache.get_mc_results(**_args())
+
+        assert pf.dcf.set_mc_parameters.call_count == 1
+        assert pf.dcf.monte_carlo_irr.call_count == 1
+        pd.testing.assert_frame_equal(first["fan"], second["fan"])
+        assert list(second["wealth_fv"]) == [200.0, 0.0]
+        assert list(second["wealth_pv"]) == [100.0, 0.0]
+        assert list(second["survival_period"]) == [20.0, 1.5]
+
+    @pytest.mark.parametrize(
+        "change",
+        [
+            {"initial_investment": 2000.0},
+            {"distribution": "t"},
+            {"distribution_parameters": (0.01, 0.05)},
+            {"years": 20},
+            {"mc_number": 200},
+            {"seed": 42},
+        ],
+    )
+    def test_mc_parameters_are_part_of_the_key(self, mc_cache, change):
+        pf = _mock_pf()
+        with (
+            patch(f"{MC_MODULE}.load_cached", return_value=pf),
+            patch(f"{MC_MODULE}.entry_version", return_value=1),
+        ):
+            mc_cache.get_mc_results(**_args())
+            mc_cache.get_mc_results(**_args(**change))
+
+        assert pf.dcf.set_mc_parameters.call_count == 2
+
+    def test_rebuilt_portfolio_is_simulated_again(self, mc_cache):
+        pf = _mock_pf()
+        with patch(f"{MC_MODULE}.load_cached", return_value=pf):
+            with patch(f"{MC_MODULE}.entry_version", return_value=1):
+                mc_cache.get_mc_results(**_args())
+            with patch(f"{MC_MODULE}.entry_version", return_value=2):
+                mc_cache.get_mc_results(**_args())
+
+        assert pf.dcf.set_mc_parameters.call_count == 2
+
+    def test_forecast_state_is_applied_before_simulating(self, mc_cache):
+        pf = _mock_pf()
+        with (
+            patch(f"{MC_MODULE}.load_cached", return_value=pf),
+            patch(f"{MC_MODULE}.entry_version", return_value=1),
+        ):
+            mc_cache.get_mc_results(**_args(distribution_parameters=[0.01, 0.05], seed=7))
+
+        assert pf.dcf.cashflow_parameters.initial_investment == 1000.0
+        pf.dcf.set_mc_parameters.assert_called_once_with(
+            distribution="norm", distribution_parameters=(0.01, 0.05), period=10, mc_number=100, seed=7
+        )
+
+    def test_cached_portfolio_is_not_mutated(self, mc_cache):
+        shared, working = _mock_pf(), _mock_pf()
+        shared.__deepcopy__ = lambda memo: working
+        with (
+            patch(f"{MC_MODULE}.load_cached", return_value=shared),
+            patch(f"{MC_MODULE}.entry_version", return_value=1),
+        ):
+            mc_cache.get_mc_results(**_args(initial_investment=5000.0))
+
+        shared.dcf.set_mc_parameters.assert_not_called()
+        assert shared.dcf.cashflow_parameters.initial_investment == 1000.0
+        working.dcf.set_mc_parameters.assert_called_once()
+        assert working.dcf.cashflow_parameters.initial_investment == 5000.0
+
+
+class TestWealthDataUsesCachedResults:
+    def test_forecast_comes_from_cache(self):
+        from pages.portfolio.portfolio import _get_wealth_data
+
+        pf = _mock_pf()
+        index = pd.period_range("2030-01", periods=2, freq="M")
+        cached = {"sample_paths": pd.DataFrame({0: [5.0, 6.0]}, index=index), "fan": pd.DataFrame(index=index)}
+        with patch("pages.portfolio.portfolio.get_mc_results", return_value=cached) as lookup:
+            _, _, df_forecast, fan = _get_wealth_data(
+                pf, False, 100, False, "norm", 10, distribution_parameters_mc=None, pf_key="portfolio_abc.pkl"
+            )
+
+        lookup.assert_called_once()
+        pf.dcf.monte_carlo_wealth.assert_not_called()
+        assert list(df_forecast[0]) == [5.0, 6.0]
+        assert df_forecast is not cached["sample_paths"]
+        assert fan is cached["fan"]
+
+    def test_all_paths_are_simulated_in_place(self):
+        from pages.portfolio.portfolio import _get_wealth_data
+
+        pf = _mock_pf()
+        with patch("pages.portfolio.portfolio.get_mc_results") as lookup:
+            _, _, df_forecast, fan = _get_wealth_data(
+                pf, False, 100, False, "norm", 10, pf_key="portfolio_abc.pkl", mc_all_paths=True
+            )
+
+        lookup.assert_not_called()
+        assert df_forecast.shape == (2, 2)
+        assert fan is None
+
+    def test_swept_pickle_falls_back_to_simulation(self):
+        from pages.portfolio.portfolio import _get_wealth_data
+
+        pf = _mock_pf()
+        with patch("pages.portfolio.portfolio.get_mc_results", side_effect=FileNotFoundError):
+            _, _, df_forecast, _ = _get_wealth_data(pf, False, 100, False, "norm", 10, pf_key="portfolio_abc.pkl")
+
+        assert pf.dcf.monte_carlo_wealth.called
+        assert len(df_forecast) == 2
+
+
+class TestDescribeMcSeries:
+    def test_matches_pandas_statistics(self):
+        from pages.portfolio.mc_cache import PERCENTILES, describe_mc_series
+
+        survival = pd.Series([12.5, 30.0, 18.0, 25.5, 40.0])
+        irr = pd.Series([0.05, float("nan"), -0.02, 0.07, float("nan")])
+        stats = describe_mc_series({"survival_period": survival, "irr": irr})
+
+        for name, series in (("survival_period", survival), ("irr", irr.dropna())):
+            expected = [series.quantile(q / 100) for q, _ in PERCENTILES]
+            assert stats[name]["percentiles"] == pytest.approx(expected)
+            assert stats[name]["min"] == pytest.approx(series.min())
+            assert stats[name]["max"] == pytest.approx(series.max())
+            assert stats[name]["mean"] == pytest.approx(series.mean())
+            assert stats[name]["std"] == pytest.approx(series.std())
+        assert stats["irr"]["count"] == 3
+
+    def test_undefined_series_yields_nan(self):
+        import math
+
+        from pages.portfolio.mc_cache import describe_mc_series
+
+        stats = describe_mc_series({"irr": pd.Series([float("nan"), float("nan")])})
+
+        assert stats["irr"]["count"] == 0
+        assert math.isnan(stats["irr"]["mean"])
+
+    def test_bundle_carries_statistics_for_every_section(self):
+        from pages.portfolio.mc_cache import compute_mc_results
+
+        results = compute_mc_results(_mock_pf())
+
+        assert set(results["stats"]) == {"survival_period", "wealth_fv", "wealth_pv", "irr"}
+        # One value per path and the fan chart frames: no path matrix is kept.
+        assert set(results) == {"fan", "sample_paths", "wealth_fv", "wealth_pv", "survival_period", "irr", "stats"}
+        assert results["fan"].shape == (2, 7)
+        assert list(results["wealth_fv"]) == [200.0, 0.0]
+        assert results["stats"]["wealth_fv"]["max"] == 200.0
+        assert results["stats"]["wealth_pv"]["min"] == 0.0
@@ -1,5 +1,8 @@
+import fcntl
+import math
 import os
 import pickle
+import threading
 import time
 from unittest.mock import patch
 
@@ -12,10 +15,26 @@ CACHE_MODULE = "common.object_cache"
 
 @pytest.fixture
 def cache_dir(tmp_path):
-    with patch(f"{CACHE_MODULE}._cache_dir", tmp_path):
+    with patch(f"{CACHE_MODULE}._cache_dir", tmp_path), patch(f"{CACHE_MODULE}._shm_dir", None):
         yield tmp_path
 
 
+@pytest.fixture
+def shm_dir(tmp_path, cache_dir):
+    shm = tmp_path / "shm"
+    with patch(f"{CACHE_MODULE}._shm_dir", shm):
+        yield shm
+
+
+@pytest.fixture(autouse=True)
+def _clear_lru():
+    from common.object_cache import _lru_load
+
+    _lru_load.cache_clear()
+    yield
+    _lru_load.cache_clear()
+
+
 @pytest.fixture
 def _no_cleanup():
     with patch(f"{CACHE_MODULE}.cleanup_expired_files"):
@@ -77,6 +96,83 @@ class TestBuildCacheKey:
         assert key.endswith(".pkl")
 
 
+class TestCanonicalCacheKey:
+    def test_weights_quantized(self, cache_dir):
+        from common.object_cache import _build_cache_key
+
+        params = {"symbols": ["A.US", "B.US", "C.US"], "ccy": "USD"}
+        key1 = _build_cache_key("portfolio", {**params, "weights": [0.3333333, 0.3333333, 0.3333334]})
+        key2 = _build_cache_key("portfolio", {**params, "weights": [0.33333334, 0.33333333, 0.33333333]})
+
+        assert key1 == key2
+
+    def test_distinct_weights_keep_distinct_keys(self, cache_dir):
+        from common.object_cache import _build_cache_key
+
+        params = {"symbols": ["A.US", "B.US"]}
+        key1 = _build_cache_key("portfolio", {**params, "weights": [0.5, 0.5]})
+        key2 = _build_cache_key("portfolio", {**params, "weights": [0.51, 0.49]})
+
+        assert key1 != key2
+
+    def test_dates_reduced_to_months(self, cache_dir):
+        from common.object_cache import _build_cache_key
+
+        key1 = _build_cache_key("assetlist", {"symbols": ["A.US"], "first_date": "2015-01-31", "last_date": "2020-12"})
+        key2 = _build_cache_key("assetlist", {"symbols": ["A.US"], "first_date": "2015-01", "last_date": "2020-12-31"})
+
+        assert key1 == key2
+
+    def test_open_ended_last_date_is_current_month(self, cache_dir):
+        from common.object_cache import _build_cache_key
+
+        with patch(f"{CACHE_MODULE}.time.time", return_value=_utc(2026, 4, 15)):
+            key1 = _build_cache_key("ef", {"symbols": ["A.US"], "last_date": None})
+        key2 = _build_cache_key("ef", {"symbols": ["A.US"], "last_date": "2026-04"})
+
+        assert key1 == key2
+
+    def test_open_ended_key_rolls_over_at_publication(self, cache_dir):
+        from common.object_cache import _build_cache_key
+
+        params = {"symbols": ["A.US"], "last_date": None}
+        keys = []
+        for moment in (_utc(2026, 3, 31, 12), _utc(2026, 4, 2, 23), _utc(2026, 4, 3, 1)):
+            with patch(f"{CACHE_MODULE}.time.time", return_value=moment):
+                keys.append(_build_cache_key("ef", params))
+
+        # Same key until the March bar is published on April 3, with the calendar expiry.
+        assert keys[0] == keys[1] != keys[2]
+
+    def test_constructor_defaults_dropped(self, cache_dir):
+        from common.object_cache import _build_cache_key
+
+        params = {"symbols": ["A.US"], "weights": [1.0], "ccy": "USD"}
+        key = _build_cache_key("portfolio", params)
+
+        assert _build_cache_key("portfolio", {**params, "inflation": True, "rebal": "month"}) == key
+        assert _build_cache_key("portfolio", {**params, "inflation": False}) != key
+        assert _build_cache_key("portfolio", {**params, "rebal": "year"}) != key
+
+    def test_empty_and_zero_deviations_mean_none(self, cache_dir):
+        from common.object_cache import _build_cache_key
+
+        params = {"symbols": ["A.US"], "weights": [1.0], "rebal": "year"}
+        key = _build_cache_key("portfolio", {**params, "abs_dev": None, "rel_dev": None})
+
+        assert _build_cache_key("portfolio", {**params, "abs_dev": "", "rel_dev": 0}) == key
+        assert _build_cache_key("portfolio", {**params, "abs_dev": 5, "rel_dev": None}) != key
+
+    def test_integral_floats_match_ints(self, cache_dir):
+        from common.object_cache import _build_cache_key
+
+        params = {"symbols": ["A.US"], "weights": [1.0]}
+
+        assert _build_cache_key("portfolio", {**params, "initial_amount": 1000.0}) == _build_cache_key(
+            "portfolio", {**params, "initial_amount": 1000}
+        )
+
+
 # Filesystem NAME_MAX: a single path component may not exceed 255 bytes.
 _LONG_PORTFOLIO_PARAMS = {
     "symbols": ["OKID10.INDX", "MCFTR.INDX", "RUCBTRNS.INDX", "GC.COMM"],
@@ -183,7 +279,10 @@ class TestGetOrCreate:
         old_time = time.time() - 10
         os.utime(file_path, (old_time, old_time))
 
-        with patch(f"{CACHE_MODULE}._lru_load") as mock_lru:
+        with (
+            patch(f"{CACHE_MODULE}._lru_load") as mock_lru,
+            patch.dict(f"{CACHE_MODULE}.STALE_WHILE_REVALIDATE", clear=True),
+        ):
             mock_lru.side_effect = lambda k, m: pickle.loads((cache_dir / k).read_bytes())
             obj, _ = get_or_create("assetlist", constructor, params, ttl_seconds=1)
 
@@ -238,6 +337,235 @@ class TestGetOrCreate:
         assert key.endswith(".pkl")
 
 
+class TestSingleFlight:
+    def test_concurrent_misses_build_once(self, cache_dir, _no_cleanup):
+        from common.object_cache import get_or_create
+
+        calls = []
+        results = []
+
+        def constructor():
+            calls.append(1)
+            time.sleep(0.3)
+            return {"data": "built"}
+
+        def request():
+            obj, _ = get_or_create("portfolio", constructor, {"symbols": ["SPY.US"]}, ttl_seconds=3600)
+            results.append(obj)
+
+        threads = [threading.Thread(target=request) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == [{"data": "built"}] * 5
+
+    def test_waiter_builds_after_timeout(self, cache_dir, _no_cleanup):
+        from common.object_cache import _build_cache_key, _key_digest, get_or_create
+
+        params = {"symbols": ["SPY.US"]}
+        lock_path = cache_dir / f".{_key_digest(_build_cache_key('portfolio', params))}.building"
+        with open(lock_path, "w") as held, patch(f"{CACHE_MODULE}._BUILD_WAIT_SECONDS", 0.2):
+            fcntl.flock(held.fileno(), fcntl.LOCK_EX)
+            obj, _ = get_or_create("portfolio", lambda: "fallback", params, ttl_seconds=3600)
+
+        assert obj == "fallback"
+
+    def test_waiter_builds_when_builder_failed(self, cache_dir, _no_cleanup):
+        from common.object_cache import get_or_create
+
+        started = threading.Event()
+        errors = []
+
+        def failing_constructor():
+            started.set()
+            time.sleep(0.2)
+            raise RuntimeError("okama down")
+
+        def builder():
+            try:
+                get_or_create("portfolio", failing_constructor, {"symbols": ["SPY.US"]}, ttl_seconds=3600)
+            except RuntimeError as exc:
+                errors.append(exc)
+
+        thread = threading.Thread(target=builder)
+        thread.start()
+        started.wait()
+        obj, _ = get_or_create("portfolio", lambda: "retry", {"symbols": ["SPY.US"]}, ttl_seconds=3600)
+        thread.join()
+
+        assert obj == "retry"
+        assert len(errors) == 1
+
+    def test_cleanup_sweeps_old_lock_sidecars(self, cache_dir):
+        from common.object_cache import cleanup_expired_files
+
+        sidecar = cache_dir / ".abc.building"
+        sidecar.touch()
+        old_time = time.time() - 2 * 24 * 3600
+        os.utime(sidecar, (old_time, old_time))
+
+        cleanup_expired_files(max_ttl_seconds=30 * 24 * 3600, _force=True)
+
+        assert not sidecar.exists()
+
+
+class _InlineExecutor:
+    """Runs background refreshes synchronously so tests can assert on them."""
+
+    def __init__(self):
+        self.submitted = 0
+
+    def submit(self, fn, *args):
+        self.submitted += 1
+        fn(*args)
+
+
+@pytest.fixture
+def inline_refresh():
+    executor = _InlineExecutor()
+    with patch(f"{CACHE_MODULE}._refresh_executor", executor):
+        yield executor
+
+
+def _age_entry(cache_dir, key, seconds):
+    old_time = time.time() - seconds
+    os.utime(cache_dir / key, (old_time, old_time))
+
+
+class TestStaleWhileRevalidate:
+    def test_stale_entry_served_and_refreshed(self, cache_dir, _no_cleanup, inline_refresh):
+        from common.object_cache import get_or_create, load_cached
+
+        versions = iter(["v1", "v2"])
+        params = {"symbols": ["SPY.US"]}
+        _, key = get_or_create("portfolio", lambda: next(versions), params, ttl_seconds=60)
+        _age_entry(cache_dir, key, 120)
+
+        with patch.dict(f"{CACHE_MODULE}.STALE_WHILE_REVALIDATE", {"portfolio": 3600}):
+            obj, _ = get_or_create("portfolio", lambda: next(versions), params, ttl_seconds=60)
+
+        assert obj == "v1"
+        assert inline_refresh.submitted == 1
+        assert load_cached(key) == "v2"
+
+    def test_past_grace_window_blocks_on_rebuild(self, cache_dir, _no_cleanup, inline_refresh):
+        from common.object_cache import get_or_create
+
+        versions = iter(["v1", "v2"])
+        params = {"symbols": ["SPY.US"]}
+        _, key = get_or_create("portfolio", lambda: next(versions), params, ttl_seconds=60)
+        _age_entry(cache_dir, key, 7200)
+
+        with patch.dict(f"{CACHE_MODULE}.STALE_WHILE_REVALIDATE", {"portfolio": 3600}):
+            obj, _ = get_or_create("portfolio", lambda: next(versions), params, ttl_seconds=60)
+
+        assert obj == "v2"
+        assert inline_refresh.submitted == 0
+
+    def test_types_without_policy_block_on_rebuild(self, cache_dir, _no_cleanup, inline_refresh):
+        from common.object_cache import get_or_create
+
+        versions = iter(["v1", "v2"])
+        params = {"symbols": ["SPY.US"]}
+        _, key = get_or_create("ef", lambda: next(versions), params, ttl_seconds=60)
+        _age_entry(cache_dir, key, 120)
+
+        with patch.dict(f"{CACHE_MODULE}.STALE_WHILE_REVALIDATE", {"portfolio": 3600}, clear=True):
+            obj, _ = get_or_create("ef", lambda: next(versions), params, ttl_seconds=60)
+
+        assert obj == "v2"
+        assert inline_refresh.submitted == 0
+
+    def test_refresh_scheduled_once_per_key(self, cache_dir, _no_cleanup):
+        from common.object_cache import _refreshing, _schedule_refresh
+
+        executor = _InlineExecutor()
+        executor.submit = lambda fn, *args: None  # leave the refresh queued
+        with patch(f"{CACHE_MODULE}._refresh_executor", executor):
+            try:
+                assert _schedule_refresh("portfolio", "k.pkl", lambda: "v", lambda created: created + 60) is True
+                assert _schedule_refresh("portfolio", "k.pkl", lambda: "v", lambda created: created + 60) is False
+            finally:
+                _refreshing.discard("k.pkl")
+
+    def test_failed_refresh_keeps_stale_entry(self, cache_dir, _no_cleanup, inline_refresh):
+        from common.object_cache import _refreshing, get_or_create, load_cached
+
+        params = {"symbols": ["SPY.US"]}
+        _, key = get_or_create("portfolio", lambda: "v1", params, ttl_seconds=60)
+        _age_entry(cache_dir, key, 120)
+
+        def failing():
+            raise RuntimeError("okama down")
+
+        with patch.dict(f"{CACHE_MODULE}.STALE_WHILE_REVALIDATE", {"portfolio": 3600}):
+            obj, _ = get_or_create("portfolio", failing, params, ttl_seconds=60)
+
+        assert obj == "v1"
+        assert load_cached(key) == "v1"
+        assert key not in _refreshing
+
+
+class TestSerialization:
+    def test_array_buffers_stored_out_of_band(self, cache_dir, _no_cleanup):
+        import numpy as np
+        import pandas as pd
+
+        from common.object_cache import _OOB_MAGIC, get_or_create
+
+        df = pd.DataFrame(np.arange(24.0).reshape(12, 2), index=pd.period_range("2020-01", periods=12, freq="M"))
+        _, key = get_or_create("portfolio", lambda: df, {"symbols": ["A.US"]}, ttl_seconds=3600)
+
+        assert (cache_dir / key).read_bytes().startswith(_OOB_MAGIC)
+        _clear_lru_cache()
+        loaded, _ = get_or_create("portfolio", lambda: None, {"symbols": ["A.US"]}, ttl_seconds=3600)
+        pd.testing.assert_frame_equal(loaded, df)
+
+    def test_loaded_arrays_are_writable_copy_on_write(self, cache_dir, _no_cleanup):
+        import numpy as np
+
+        from common.object_cache import load_cached, get_or_create
+
+        _, key = get_or_create("ef", lambda: np.zeros(1000), {"symbols": ["A.US"]}, ttl_seconds=3600)
+        on_disk = (cache_dir / key).read_bytes()
+        _clear_lru_cache()
+
+        arr = load_cached(key)
+        arr[:] = 1.0
+
+        assert (cache_dir / key).read_bytes() == on_disk
+
+    def test_objects_without_arrays_stay_plain_pickles(self, cache_dir, _no_cleanup):
+        from common.object_cache import get_or_create
+
+        _, key = get_or_create("rate", lambda: {"value": 1}, {"symbols": ["A.US"]}, ttl_seconds=3600)
+
+        assert pickle.loads((cache_dir / key).read_bytes()) == {"value": 1}
+
+    def test_truncated_entry_reconstructs(self, cache_dir, _no_cleanup):
+        import numpy as np
+
+        from common.object_cache import get_or_create
+
+        _, key = get_or_create("ef", lambda: np.ones(1000), {"symbols": ["A.US"]}, ttl_seconds=3600)
+        path = cache_dir / key
+        path.write_bytes(path.read_bytes()[:-100])
+        _clear_lru_cache()
+
+        obj, _ = get_or_create("ef", lambda: np.full(3, 2.0), {"symbols": ["A.US"]}, ttl_seconds=3600)
+
+        assert obj.tolist() == [2.0, 2.0, 2.0]
+
+
+def _clear_lru_cache():
+    from common.object_cache import _lru_load
+
+    _lru_load.cache_clear()
+
+
 class TestLoadCached:
     def test_loads_existing_file(self, cache_dir, _no_cleanup):
         from common.object_cache import get_or_create, load_cached
@@ -257,6 +585,136 @@ class TestLoadCached:
         with pytest.raises(FileNotFoundError):
             load_cached("nonexistent.pkl")
 
+    def test_unreadable_entry_is_removed(self, cache_dir, _no_cleanup):
+        from common.object_cache import get_or_create, load_cached
+
+        _, key = get_or_create("rate", lambda: {"value": 1}, {"symbols": ["A.US"]}, ttl_seconds=3600)
+        (cache_dir / key).write_bytes(b"\x80\x09N.")  # ValueError: unsupported pickle protocol
+        _clear_lru_cache()
+
+        # Derived caches treat FileNotFoundError as a swept entry and rebuild in place.
+        with pytest.raises(FileNotFoundError):
+            load_cached(key)
+        assert not (cache_dir / key).exists()
+
+
+class TestSharedTier:
+    def test_first_load_publishes_bytes(self, shm_dir, _no_cleanup):
+        from common.object_cache import get_or_create, load_cached
+
+        _, key = get_or_create("assetlist", lambda: {"value": 1}, {"symbols": ["SPY.US"]}, ttl_seconds=3600)
+        load_cached(key)
+
+        published = list(shm_dir.iterdir())
+        assert len(published) == 1
+        assert pickle.loads(published[0].read_bytes()) == {"value": 1}
+
+    def test_cold_worker_skips_disk_read(self, shm_dir, _no_cleanup):
+        from common.object_cache import _lru_load, get_or_create, load_cached
+
+        _, key = get_or_create("assetlist", lambda: {"value": 1}, {"symbols": ["SPY.US"]}, ttl_seconds=3600)
+        load_cached(key)
+        # A second worker starts with an empty per-process LRU.
+        _lru_load.cache_clear()
+
+        with patch(f"{CACHE_MODULE}._read_locked", side_effect=AssertionError("disk read")):
+            assert load_cached(key) == {"value": 1}
+
+    def test_new_disk_version_replaces_published_entry(self, shm_dir, cache_dir, _no_cleanup):
+        from common.object_cache import _atomic_write, _lru_load, load_cached
+
+        key = "assetlist-SPY.US.pkl"
+        _atomic_write(cache_dir / key, "v1")
+        load_cached(key)
+        _lru_load.cache_clear()
+        _atomic_write(cache_dir / key, "v2")
+        new_time = time.time() + 5
+        os.utime(cache_dir / key, (new_time, new_time))
+
+        assert load_cached(key) == "v2"
+        published = list(shm_dir.iterdir())
+        assert len(published) == 1
+        assert pickle.loads(published[0].read_bytes()) == "v2"
+
+    def test_corrupt_shared_entry_falls_back_to_disk(self, shm_dir, cache_dir, _no_cleanup):
+        from common.object_cache import _atomic_write, _shm_entry_path, load_cached
+
+        key = "assetlist-SPY.US.pkl"
+        _atomic_write(cache_dir / key, "disk")
+        shm_path = _shm_entry_path(key, (cache_dir / key).stat().st_mtime_ns)
+        shm_path.parent.mkdir(parents=True)
+        shm_path.write_bytes(b"not a pickle")
+
+        assert load_cached(key) == "disk"
+        assert pickle.loads(shm_path.read_bytes()) == "disk"
+
+    def test_disabled_tier_reads_disk(self, cache_dir, _no_cleanup):
+        from common.object_cache import get_or_create, load_cached
+
+        _, key = get_or_create("assetlist", lambda: "obj", {"symbols": ["SPY.US"]}, ttl_seconds=3600)
+        assert load_cached(key) == "obj"
+
+    def test_cleanup_sweeps_stale_shared_entries(self, shm_dir):
+        from common.object_cache import cleanup_expired_files
+
+        shm_dir.mkdir()
+        stale = shm_dir / "deadbeef.1"
+        stale.write_bytes(pickle.dumps("old"))
+        old_time = time.time() - 40 * 24 * 3600
+        os.utime(stale, (old_time, old_time))
+
+        cleanup_expired_files(max_ttl_seconds=30 * 24 * 3600, _force=True)
+
+        assert not stale.exists()
+
+    def test_cleanup_discards_shared_copies_of_expired_entries(self, shm_dir, cache_dir):
+        from common.object_cache import CACHE_FORMAT_VERSION, _atomic_write, cleanup_expired_files, load_cached
+
+        key = f"assetlist-SPY.US-cv={CACHE_FORMAT_VERSION}.pkl"
+        _atomic_write(cache_dir / key, "old")
+        old_time = time.time() - 40 * 24 * 3600
+        os.utime(cache_dir / key, (old_time, old_time))
+        load_cached(key)
+        assert list(shm_dir.iterdir())
+
+        cleanup_expired_files(max_ttl_seconds=30 * 24 * 3600, _force=True)
+
+        assert not (cache_dir / key).exists()
+        assert not list(shm_dir.iterdir())
+
+
+class TestSharedTierDirectory:
+    def test_created_private(self, tmp_path):
+        from common.object_cache import _private_dir
+
+        path = _private_dir(tmp_path / "shm")
+
+        assert path == tmp_path / "shm"
+        assert path.stat().st_mode & 0o777 == 0o700
+
+    def test_writable_by_others_is_rejected(self, tmp_path):
+        from common.object_cache import _private_dir
+
+        planted = tmp_path / "shm"
+        planted.mkdir()
+        planted.chmod(0o777)
+
+        assert _private_dir(planted) is None
+
+    def test_owned_by_another_user_is_rejected(self, tmp_path):
+        from common.object_cache import _private_dir
+
+        with patch(f"{CACHE_MODULE}.os.getuid", return_value=os.getuid() + 1):
+            assert _private_dir(tmp_path / "shm") is None
+
+    def test_symlink_is_rejected(self, tmp_path):
+        from common.object_cache import _private_dir
+
+        (tmp_path / "target").mkdir(mode=0o700)
+        (tmp_path / "shm").symlink_to(tmp_path / "target")
+
+        assert _private_dir(tmp_path / "shm") is None
+
 
 class TestCleanup:
     def test_removes_expired_files(self, cache_dir):
@@ -294,6 +752,307 @@ class TestCleanup:
         assert legacy.exists()
 
 
+def _write_entry(cache_dir, name, size, accessed_ago):
+    from common.object_cache import CACHE_FORMAT_VERSION
+
+    path = cache_dir / f"{name}-cv={CACHE_FORMAT_VERSION}.pkl"
+    path.write_bytes(b"x" * size)
+    accessed = time.time() - accessed_ago
+    os.utime(path, (accessed, accessed))
+    return path
+
+
+class TestIncrementalSweep:
+    def test_scan_pauses_between_batches(self, cache_dir):
+        from common.object_cache import _scan_entries
+
+        for i in range(5):
+            _write_entry(cache_dir, f"rate-{i}", 10, accessed_ago=i)
+
+        with patch(f"{CACHE_MODULE}._SWEEP_BATCH_SIZE", 2), patch(f"{CACHE_MODULE}.time.sleep") as sleep:
+            entries = _scan_entries(pause_seconds=0.01)
+
+        assert len(entries) == 5
+        assert sleep.call_count == 2
+
+    def test_scan_orders_by_last_access(self, cache_dir):
+        from common.object_cache import _scan_entries
+
+        newer = _write_entry(cache_dir, "rate-new", 10, accessed_ago=10)
+        older = _write_entry(cache_dir, "rate-old", 10, accessed_ago=100)
+
+        assert [entry[2] for entry in _scan_entries()] == [older.name, newer.name]
+
+    def test_sweep_runs_once_per_interval(self, cache_dir):
+        from common.object_cache import cleanup_expired_files
+
+        cleanup_expired_files()
+        expired = _write_entry(cache_dir, "rate-A", 10, accessed_ago=40 * 24 * 3600)
+        cleanup_expired_files()
+
+        assert expired.exists()
+
+
+class TestDiskBudget:
+    @pytest.mark.parametrize(("value", "expected"), [(None, 123), ("2048", 2048), ("4GB", 123), ("", 123)])
+    def test_max_bytes_from_env(self, monkeypatch, value, expected):
+        from common.object_cache import _env_bytes
+
+        if value is None:
+            monkeypatch.delenv("OKAMA_OBJECT_CACHE_MAX_BYTES", raising=False)
+        else:
+            monkeypatch.setenv("OKAMA_OBJECT_CACHE_MAX_BYTES", value)
+
+        assert _env_bytes("OKAMA_OBJECT_CACHE_MAX_BYTES", 123) == expected
+
+    def test_evicts_least_recently_accessed_first(self, cache_dir):
+        from common.object_cache import enforce_disk_budget
+
+        old = _write_entry(cache_dir, "rate-A", 400, accessed_ago=300)
+        recent = _write_entry(cache_dir, "rate-B", 400, accessed_ago=10)
+
+        with patch.dict(f"{CACHE_MODULE}.CACHE_TYPE_QUOTAS", clear=True):
+            usage = enforce_disk_budget(max_bytes=500)
+
+        assert not old.exists()
+        assert recent.exists()
+        assert usage == {"rate": 400}
+
+    def test_type_quota_protects_other_types(self, cache_dir):
+        from common.object_cache import enforce_disk_budget
+
+        cheap = _write_entry(cache_dir, "assetlist-SPY.US", 100, accessed_ago=1000)
+        ef_old = _write_entry(cache_dir, "ef-A-B", 400, accessed_ago=500)
+        ef_new = _write_entry(cache_dir, "ef-C-D", 400, accessed_ago=10)
+
+        with patch.dict(f"{CACHE_MODULE}.CACHE_TYPE_QUOTAS", {"ef": 0.5}, clear=True):
+            enforce_disk_budget(max_bytes=1000)
+
+        # The EF quota (500) evicts the older EF pickle, though the AssetList was accessed even earlier.
+        assert cheap.exists()
+        assert not ef_old.exists()
+        assert ef_new.exists()
+
+    def test_within_budget_keeps_everything(self, cache_dir):
+        from common.object_cache import enforce_disk_budget
+
+        paths = [_write_entry(cache_dir, f"portfolio-{i}", 100, accessed_ago=i) for i in range(3)]
+
+        usage = enforce_disk_budget(max_bytes=1000)
+
+        assert all(path.exists() for path in paths)
+        assert usage == {"portfolio": 300}
+
+    def test_cache_hit_refreshes_last_access(self, cache_dir, _no_cleanup):
+        from common.object_cache import _manifest, get_or_create
+
+        params = {"symbols": ["SPY.US"]}
+        _, key = get_or_create("rate", lambda: "obj", params, ttl_seconds=3600)
+        stored = _manifest().get(key)
+
+        with patch(f"{CACHE_MODULE}.time.time", return_value=stored["last_access"] + 100):
+            get_or_create("rate", lambda: "obj", params, ttl_seconds=3600)
+        _manifest().flush_hits()
+
+        assert _manifest().get(key)["last_access"] >= stored["last_access"] + 100
+
+    def test_store_does_not_sweep(self, cache_dir):
+        from common.object_cache import get_or_create
+
+        old = _write_entry(cache_dir, "rate-OLD", 10_000, accessed_ago=40 * 24 * 3600)
+
+        with patch(f"{CACHE_MODULE}.CACHE_MAX_BYTES", 5_000):
+            _, key = get_or_create("rate", lambda: "new", {"symbols": ["SPY.US"]}, ttl_seconds=3600)
+
+        # Expiry and eviction belong to the background sweeper, not the callback.
+        assert old.exists()
+        assert (cache_dir / key).exists()
+
+    def test_sweep_enforces_budget(self, cache_dir):
+        from common.object_cache import cleanup_expired_files
+
+        old = _write_entry(cache_dir, "rate-OLD", 10_000, accessed_ago=300)
+        new = _write_entry(cache_dir, "rate-NEW", 1_000, accessed_ago=10)
+
+        with (
+            patch(f"{CACHE_MODULE}.CACHE_MAX_BYTES", 5_000),
+            patch.dict(f"{CACHE_MODULE}.CACHE_TYPE_QUOTAS", clear=True),
+        ):
+            cleanup_expired_files(_force=True)
+
+        assert not old.exists()
+        assert new.exists()
+
+
+def _utc(*args):
+    from datetime import datetime, timezone
+
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+class TestCalendarExpiry:
+    def test_closed_range_never_expires(self):
+        from common.object_cache import _expires_at
+
+        created = _utc(2026, 3, 15)
+
+        assert _expires_at("portfolio", {"last_date": "2025-12"}, 3600, created) == math.inf
+        assert _expires_at("ef", {"last_date": "2026-02-28"}, 3600, created) == math.inf
+
+    def test_open_ended_expires_at_next_publication(self):
+        from common.object_cache import _expires_at
+
+        expiry = _expires_at("portfolio", {"last_date": None}, 7 * 24 * 3600, _utc(2026, 3, 15))
+
+        assert expiry == _utc(2026, 4, 3)
+
+    def test_built_before_previous_month_published(self):
+        from common.object_cache import _expires_at
+
+        # On April 1st the March bar is not out yet: the entry lives until it is.
+        created = _utc(2026, 4, 1, 12)
+
+        assert _expires_at("assetlist", {"last_date": None}, 3600, created) == _utc(2026, 4, 3)
+        assert _expires_at("assetlist", {"last_date": "2026-03"}, 3600, created) == _utc(2026, 4, 3)
+
+    def test_december_rolls_over_the_year(self):
+        from common.object_cache import _expires_at
+
+        assert _expires_at("portfolio", {"last_date": None}, 3600, _utc(2026, 12, 20)) == _utc(2027, 1, 3)
+
+    def test_other_types_keep_ttl(self):
+        from common.object_cache import _expires_at
+
+        created = _utc(2026, 3, 15)
+
+        assert _expires_at("rate", {"last_date": "2020-01"}, 3600, created) == created + 3600
+        assert _expires_at("portfolio", {"symbols": ["A.US"]}, 3600, created) == created + 3600
+
+    def test_closed_range_served_past_ttl(self, cache_dir, _no_cleanup):
+        from common.object_cache import get_or_create
+
+        params = {"symbols": ["A.US"], "first_date": "2010-01", "last_date": "2020-12"}
+        _, key = get_or_create("ef", lambda: "v1", params, ttl_seconds=3600)
+        _age_entry(cache_dir, key, 90 * 24 * 3600)
+
+        obj, _ = get_or_create("ef", lambda: "v2", params, ttl_seconds=3600)
+
+        assert obj == "v1"
+
+    def test_open_ended_rebuilt_after_publication(self, cache_dir, _no_cleanup):
+        from common.object_cache import get_or_create
+
+        params = {"symbols": ["A.US"], "first_date": "2010-01", "last_date": None}
+        _, key = get_or_create("ef", lambda: "v1", params, ttl_seconds=90 * 24 * 3600)
+        _age_entry(cache_dir, key, 40 * 24 * 3600)
+
+        obj, _ = get_or_create("ef", lambda: "v2", params, ttl_seconds=90 * 24 * 3600)
+
+        assert obj == "v2"
+
+    def test_sweep_keeps_closed_ranges(self, cache_dir):
+        from common.object_cache import cleanup_expired_files, get_or_create
+
+        params = {"symbols": ["A.US"], "last_date": "2020-12"}
+        _, key = get_or_create("portfolio", lambda: "v", params, ttl_seconds=3600)
+        _age_entry(cache_dir, key, 90 * 24 * 3600)
+
+        cleanup_expired_files(max_ttl_seconds=30 * 24 * 3600, _force=True)
+
+        assert (cache_dir / key).exists()
+
+
+class TestManifest:
+    def test_store_records_entry(self, cache_dir, _no_cleanup):
+        from common.object_cache import _manifest, get_or_create
+
+        params = {"symbols": ["SPY.US"], "ccy": "USD"}
+        _, key = get_or_create("portfolio", lambda: "obj", params, ttl_seconds=3600)
+
+        entry = _manifest().get(key)
+        assert entry["obj_type"] == "portfolio"
+        assert entry["params"] == params
+        assert entry["bytes"] == (cache_dir / key).stat().st_size
+        assert entry["build_ms"] >= 0
+        assert entry["hits"] == 0
+
+    def test_hits_are_buffered_then_flushed(self, cache_dir, _no_cleanup):
+        from common.object_cache import _manifest, get_or_create
+
+        params = {"symbols": ["SPY.US"]}
+        _, key = get_or_create("rate", lambda: "obj", params, ttl_seconds=3600)
+        for _ in range(3):
+            get_or_create("rate", lambda: "obj", params, ttl_seconds=3600)
+
+        assert _manifest().get(key)["hits"] == 0
+        _manifest().flush_hits()
+        assert _manifest().get(key)["hits"] == 3
+
+    def test_sweep_expires_from_manifest_without_scanning(self, cache_dir):
+        from common.object_cache import _manifest, cleanup_expired_files, get_or_create
+
+        _, key = get_or_create("rate", lambda: "obj", {"symbols": ["SPY.US"]}, ttl_seconds=3600)
+        _age_entry(cache_dir, key, 40 * 24 * 3600)
+        _manifest().record_store(key, "rate", None, 10, None, time.time() - 40 * 24 * 3600)
+        (cache_dir / ".object-cache-reconcile").touch()
+
+        with patch(f"{CACHE_MODULE}._scan_entries") as scan:
+            cleanup_expired_files(max_ttl_seconds=30 * 24 * 3600)
+
+        scan.assert_not_called()
+        assert not (cache_dir / key).exists()
+        assert _manifest().get(key) is None
+
+    def test_rescan_adopts_unknown_files_and_drops_missing(self, cache_dir):
+        from common.object_cache import _manifest, cache_stats, enforce_disk_budget, get_or_create
+
+        _, key = get_or_create("rate", lambda: "obj", {"symbols": ["SPY.US"]}, ttl_seconds=3600)
+        (cache_dir / key).unlink()
+        orphan = _write_entry(cache_dir, "assetlist-QQQ.US", 100, accessed_ago=10)
+
+        enforce_disk_budget(max_bytes=10_000)
+
+        assert _manifest().get(key) is None
+        assert _manifest().get(orphan.name)["bytes"] == 100
+        assert cache_stats() == {"assetlist": {"files": 1, "bytes": 100, "hits": 0, "avg_build_ms": None}}
+
+    def test_rescan_keeps_rows_created_during_the_scan(self, cache_dir):
+        from common.object_cache import _manifest
+
+        scan_started = time.time()
+        _manifest().record_store("rate-A", "rate", None, 10, None, scan_started + 1)
+        _manifest().record_store("rate-B", "rate", None, 10, None, scan_started - 1)
+
+        # Neither file was seen by the scan; only the row older than the scan is stale.
+        assert _manifest().reconcile([], scan_started) == (0, 1)
+        assert _manifest().get("rate-A") is not None
+        assert _manifest().get("rate-B") is None
+
+    def test_buffered_hits_are_written_at_exit(self, cache_dir, _no_cleanup):
+        from common.object_cache import _manifest, get_or_create
+
+        params = {"symbols": ["SPY.US"]}
+        with patch("common.cache_manifest.atexit.register") as register:
+            _, key = get_or_create("rate", lambda: "obj", params, ttl_seconds=3600)
+            get_or_create("rate", lambda: "obj", params, ttl_seconds=3600)
+
+        register.assert_called_once_with(_manifest()._flush_hits_at_exit)
+        _manifest()._flush_hits_at_exit()
+        assert _manifest().get(key)["hits"] == 1
+
+    def test_unusable_manifest_falls_back_to_scan(self, cache_dir):
+        import sqlite3
+
+        from common.object_cache import cleanup_expired_files
+
+        expired = _write_entry(cache_dir, "rate-A", 10, accessed_ago=40 * 24 * 3600)
+
+        with patch(f"{CACHE_MODULE}._manifest", side_effect=sqlite3.OperationalError("locked")):
+            cleanup_expired_files(max_ttl_seconds=30 * 24 * 3600, _force=True)
+
+        assert not expired.exists()
+
+
 class TestCacheIsolation:
     """
     Cache-isolation tests for object_cache pickles.
@@ -0,0 +1,151 @@
+import time
+from unittest.mock import patch
+
+import pytest
+import requests
+from okama.api import api_methods
+
+pytestmark = pytest.mark.unit
+
+CSV = "date,SPY.US\n2020-01-31,0.01\n2020-02-29,-0.02\n"
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    with patch("common.object_cache._cache_dir", tmp_path):
+        yield tmp_path
+
+
+@pytest.fixture
+def fetch(cache_dir):
+    """Install the store over a fake network fetch; restores okama's API.connect afterwards."""
+    from common.series_store import install_series_store
+
+    original = api_methods.API.__dict__["connect"]
+    calls = []
+
+    def fake_connect(cls, endpoint="/api/ts/ror/", symbol="SPY.US", first_date=None, last_date=None, period="d"):
+        calls.append((endpoint, symbol, first_date, last_date, period))
+        if symbol == "MISSING.US":
+            raise requests.exceptions.HTTPError(f"{symbol} is not found in the database.", 404)
+        return f"{symbol}:{CSV}"
+
+    api_methods.API.connect = classmethod(fake_connect)
+    try:
+        install_series_store()
+        yield calls
+    finally:
+        api_methods.API.connect = original
+
+
+class TestSeriesStore:
+    def test_symbol_fetched_once_across_queries(self, fetch):
+        api_methods.API.get_ror("SPY.US", first_date="1913-01-01", last_date="2100-01-01")
+        body = api_methods.API.get_ror("SPY.US", first_date="1913-01-01", last_date="2100-01-01")
+
+        assert body == f"SPY.US:{CSV}"
+        assert len(fetch) == 1
+
+    def test_new_combination_fetches_only_unseen_symbols(self, fetch):
+        for symbol in ("SPY.US", "BND.US"):
+            api_methods.API.get_ror(symbol)
+        for symbol in ("SPY.US", "BND.US", "GLD.US"):
+            api_methods.API.get_ror(symbol)
+
+        assert [call[1] for call in fetch] == ["SPY.US", "BND.US", "GLD.US"]
+
+    def test_key_includes_endpoint_dates_and_period(self, fetch):
+        import pandas as pd
+
+        api_methods.API.get_close("SPY.US", period="M")
+        api_methods.API.get_close("SPY.US", period="D")
+        api_methods.API.get_ror("SPY.US", period="M")
+        api_methods.API.get_macro("USD.INFL", first_date=pd.Timestamp("2020-01-01"))
+        api_methods.API.get_macro("USD.INFL", first_date="2020-01-01")
+
+        assert len(fetch) == 4
+
+    def test_expired_responses_are_refetched(self, fetch):
+        from common.series_store import SERIES_TTL_SECONDS
+
+        api_methods.API.get_ror("SPY.US")
+        with patch("common.series_store.time.time", return_value=time.time() + SERIES_TTL_SECONDS + 1):
+            api_methods.API.get_ror("SPY.US")
+
+        assert len(fetch) == 2
+
+    def test_uncached_endpoints_go_to_the_api(self, fetch):
+        api_methods.API.get_namespaces()
+        api_methods.API.get_namespaces()
+
+        assert len(fetch) == 2
+
+    def test_errors_are_not_stored(self, fetch):
+        for _ in range(2):
+            with pytest.raises(requests.exceptions.HTTPError):
+                api_methods.API.get_ror("MISSING.US")
+
+        assert len(fetch) == 2
+
+    def test_unusable_store_falls_back_to_api(self, fetch):
+        import sqlite3
+
+        with patch("common.series_store.SeriesStore.get", side_effect=sqlite3.OperationalError("locked")):
+            body = api_methods.API.get_ror("SPY.US")
+
+        assert body == f"SPY.US:{CSV}"
+        assert len(fetch) == 1
+
+    def test_install_is_idempotent(self, fetch):
+        from common.series_store import install_series_store
+
+        install_series_store()
+        api_methods.API.get_ror("SPY.US")
+        api_methods.API.get_ror("SPY.US")
+
+        assert len(fetch) == 1
+
+    def test_disabled_by_env(self, monkeypatch):
+        from common.series_store import install_series_store
+
+        monkeypatch.setenv("OKAMA_SERIES_STORE", "off")
+
+        assert install_series_store() is False
+
+    def test_purge_drops_old_responses(self, fetch):
+        from common.series_store import SERIES_TTL_SECONDS, get_series_store
+
+        api_methods.API.get_ror("SPY.US")
+        with patch("common.series_store.time.time", return_value=time.time() + SERIES_TTL_SECONDS + 1):
+            assert get_series_store().purge() == 1
+
+    def test_open_ended_response_from_before_publication_is_refetched(self, fetch):
+        from common.object_cache import _last_publication
+
+        boundary = _last_publication(time.time())
+        for now in (boundary - 3600, boundary + 3600):
+            with patch("common.series_store.time.time", return_value=now):
+                api_methods.API.get_ror("SPY.US")
+                api_methods.API.get_ror("SPY.US", first_date="2020-01-01", last_date="2100-01-01")
+                api_methods.API.get_ror("SPY.US", first_date="2020-01-01", last_date="2020-02-29")
+
+        assert [call[3] for call in fetch] == [None, "2100-01-01", "2020-02-29", None, "2100-01-01"]
+
+    def test_rebuild_across_publication_boundary_sees_new_series(self, fetch, cache_dir):
+        import os
+
+        from common.object_cache import _last_publication, get_or_create
+
+        boundary = _last_publication(time.time())
+        params = {"symbols": ["SPY.US"], "first_date": "2020-01", "last_date": None}
+
+        def build():
+            return api_methods.API.get_ror("SPY.US")
+
+        with patch("time.time", return_value=boundary - 3600):
+            _, key = get_or_create("ef", build, params, ttl_seconds=3600)
+        os.utime(cache_dir / key, (boundary - 3600, boundary - 3600))
+        with patch("time.time", return_value=boundary + 3600):
+            get_or_create("ef", build, params, ttl_seconds=3600)
+
+        assert len(fetch) == 2
@@ -169,7 +169,7 @@ class TestGetOrCreateUrlPortfolio:
         # Sanitized single discriminator — raw URL strings must not reach the
         # pickle filename (see pf_cache_token).
         assert key["pf"] == "AAPL.US:60,MSFT.US:40;year;MyPF.PF"
-        assert key["purpose"] == "url_portfolio"
+        assert key["inflation"] is False
         assert "symbols" not in key
         assert "symbol" not in key
         assert "weights" not in key
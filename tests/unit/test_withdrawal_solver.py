@@ -0,0 +1,181 @@
+"""Batched Find-max-withdrawal solver, checked against okama's own MC engine and goal metrics."""
+
+from types import SimpleNamespace
+
+import numpy as np
+import okama as ok
+import pandas as pd
+import pytest
+from okama.common.helpers import helpers
+from okama.portfolios import dcf_calculations
+from okama.portfolios.dcf import PortfolioDCF
+
+pytestmark = pytest.mark.unit
+
+INITIAL = 10_000
+MC_YEARS = 20
+
+
+class _EngineDCF:
+    """pf.dcf stand-in running okama's vectorized MC engine on a fixed return draw."""
+
+    def __init__(self, parent, ror):
+        self.parent = parent
+        self.ror = ror
+        self.discount_rate = 0.05
+        self.mc = SimpleNamespace(period=MC_YEARS)
+        self.cashflow_parameters = None
+        self.simulations = 0
+
+    def monte_carlo_wealth(self, discounting, include_negative_values=False):
+        self.simulations += 1
+        wealth = dcf_calculations.get_wealth_indexes_fv_with_cashflow_mc(
+            self.ror, self.cashflow_parameters, self.discount_rate
+        )
+        if not include_negative_values:
+            wealth = dcf_calculations.zero_wealth_after_first_void(wealth)
+        return (
+            wealth if discounting == "fv" else dcf_calculations.discount_monthly_cash_flow(wealth, self.discount_rate)
+        )
+
+    def monte_carlo_survival_period(self, threshold=0):
+        wealth = self.monte_carlo_wealth("fv", include_negative_values=False)
+        dates = helpers.Frame.get_survival_date(wealth, self.discount_rate, threshold)
+        return dates.apply(helpers.Date.get_period_length, args=(self.parent.last_date,))
+
+
+def _portfolio(strategy: str):
+    rng = np.random.default_rng(7)
+    index = pd.period_range("2025-01", periods=MC_YEARS * 12, freq="M")
+    ror = pd.DataFrame(rng.normal(0.005, 0.04, (len(index), 200)), index=index)
+    pf = SimpleNamespace(last_date=pd.Timestamp("2024-12-31"), symbol="TEST.PF")
+    pf.dcf = _EngineDCF(pf, ror)
+    if strategy == "cwd":
+        pf.dcf.cashflow_parameters = ok.CutWithdrawalsIfDrawdown(
+            parent=pf,
+            frequency="month",
+            initial_investment=INITIAL,
+            amount=-30,
+            indexation=0.02,
+            crash_threshold_reduction=[(0.1, 0.3), (0.2, 0.6)],
+        )
+    else:
+        pf.dcf.cashflow_parameters = ok.IndexationStrategy(
+            parent=pf, frequency="year", initial_investment=INITIAL, amount=-300, indexation=0.02
+        )
+    return pf
+
+
+def _okama_goal(pf, goal, percentile, target_sp):
+    """okama's _calculate_goal_metrics for the strategy's current amount."""
+    sp = pf.dcf.monte_carlo_survival_period().quantile(percentile / 100)
+    if goal == "survival_period":
+        return sp >= target_sp, abs(sp - target_sp) / target_sp
+    discounting = "pv" if goal == "maintain_balance_pv" else "fv"
+    wealth = pf.dcf.monte_carlo_wealth(discounting, include_negative_values=True).iloc[-1].quantile(percentile / 100)
+    return (wealth >= INITIAL) and sp == MC_YEARS, abs(wealth - INITIAL) / INITIAL
+
+
+GOALS = ["maintain_balance_pv", "maintain_balance_fv", "survival_period"]
+
+
+class _SolverDCF(_EngineDCF):
+    """_EngineDCF with okama's own find_the_largest_withdrawals_size and its helpers."""
+
+    find_the_largest_withdrawals_size = PortfolioDCF.find_the_largest_withdrawals_size
+    _validate_parameters = PortfolioDCF._validate_parameters
+    _get_main_parameter = PortfolioDCF._get_main_parameter
+    _get_withdrawal_bounds = PortfolioDCF._get_withdrawal_bounds
+    _set_main_parameter = PortfolioDCF._set_main_parameter
+    _calculate_goal_metrics = PortfolioDCF._calculate_goal_metrics
+    _calculate_withdrawal_metrics = PortfolioDCF._calculate_withdrawal_metrics
+    _best_attempt_result = PortfolioDCF._best_attempt_result
+    _restore_cashflow_parameters_from_backup = PortfolioDCF._restore_cashflow_parameters_from_backup
+
+
+class TestBatchedWithdrawalSolver:
+    @pytest.mark.parametrize("strategy", ["indexation", "cwd"])
+    @pytest.mark.parametrize("goal", GOALS)
+    def test_affine_metrics_match_okama(self, strategy, goal):
+        from pages.portfolio.withdrawal_solver import _AffineForecast, _goal_metrics
+
+        pf = _portfolio(strategy)
+        strategy_obj = pf.dcf.cashflow_parameters
+        max_withdrawal = -INITIAL / strategy_obj.periods_per_year
+        forecast = _AffineForecast(pf, max_withdrawal)
+        amounts = max_withdrawal * np.array([0.8, 0.3, 0.05, 0.01])
+        condition, error_rel = _goal_metrics(forecast, amounts, goal, 20, INITIAL, MC_YEARS, 15)
+
+        for amount, met, error in zip(amounts, condition, error_rel, strict=True):
+            strategy_obj.amount = amount
+            expected_met, expected_error = _okama_goal(pf, goal, 20, 15)
+            assert met == expected_met
+            assert error == pytest.approx(expected_error, abs=1e-9)
+
+    @pytest.mark.parametrize("goal", GOALS)
+    def test_answer_sits_on_the_goal_boundary(self, goal):
+        from pages.portfolio.withdrawal_solver import find_largest_withdrawal
+
+        pf = _portfolio("indexation")
+        result = find_largest_withdrawal(pf, goal, percentile=50, target_survival_period=15)
+
+        assert result.success
+        assert result.error_rel < 0.10
+        assert result.withdrawal_rel == pytest.approx(abs(result.withdrawal_abs) / INITIAL)
+        strategy_obj = pf.dcf.cashflow_parameters
+        strategy_obj.amount = result.withdrawal_abs
+        assert _okama_goal(pf, goal, 50, 15)[0]
+        strategy_obj.amount = result.withdrawal_abs * 1.01
+        assert not _okama_goal(pf, goal, 50, 15)[0]
+
+    @pytest.mark.parametrize("strategy", ["indexation", "cwd"])
+    @pytest.mark.parametrize("goal", GOALS)
+    @pytest.mark.parametrize("percentile", [20, 50])
+    def test_agrees_with_okama_solver_on_a_fixed_draw(self, strategy, goal, percentile):
+        from pages.portfolio.withdrawal_solver import TOLERANCE_REL, find_largest_withdrawal
+
+        okama_pf = _portfolio(strategy)
+        okama_pf.dcf.__class__ = _SolverDCF
+        expected = okama_pf.dcf.find_the_largest_withdrawals_size(
+            goal=goal, percentile=percentile, target_survival_period=15
+        )
+        result = find_largest_withdrawal(_portfolio(strategy), goal, percentile=percentile, target_survival_period=15)
+
+        assert result.success == expected.success
+        if expected.success:
+            assert result.error_rel <= expected.error_rel < TOLERANCE_REL
+            assert result.withdrawal_rel == pytest.approx(expected.withdrawal_rel, abs=0.005)
+
+    def test_two_simulations_and_amount_restored(self):
+        from pages.portfolio.withdrawal_solver import find_largest_withdrawal
+
+        pf = _portfolio("indexation")
+        first = find_largest_withdrawal(pf, "maintain_balance_fv", percentile=20)
+        second = find_largest_withdrawal(pf, "maintain_balance_fv", percentile=20)
+
+        assert pf.dcf.simulations == 4
+        assert pf.dcf.cashflow_parameters.amount == -300
+        assert first.withdrawal_abs == second.withdrawal_abs
+
+    def test_goal_out_of_reach_is_not_a_success(self):
+        from pages.portfolio.withdrawal_solver import find_largest_withdrawal
+
+        pf = _portfolio("indexation")
+        result = find_largest_withdrawal(pf, "maintain_balance_pv", percentile=1)
+
+        assert not result.success
+        assert not result.solutions.empty
+
+    def test_target_beyond_mc_period_is_rejected(self):
+        from pages.portfolio.withdrawal_solver import find_largest_withdrawal
+
+        with pytest.raises(ValueError, match="target_survival_period"):
+            find_largest_withdrawal(_portfolio("indexation"), "survival_period", target_survival_period=MC_YEARS)
+
+    @pytest.mark.parametrize(
+        ("name", "expected"), [("fixed_amount", True), ("CWD", True), ("fixed_percentage", False), ("VDS", False)]
+    )
+    def test_only_amount_strategies_are_batched(self, name, expected):
+        from pages.portfolio.withdrawal_solver import supports_batched_search
+
+        assert supports_batched_search(SimpleNamespace(NAME=name)) is expected